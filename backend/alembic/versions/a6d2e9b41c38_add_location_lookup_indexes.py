@@ -0,0 +1,35 @@
+"""Add indexes for resolved location predicates (city/district lookups, postcode ranges)
+
+Revision ID: a6d2e9b41c38
+Revises: f18a4c6d2b70
+Create Date: 2026-10-19 13:48:20.660134
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2e9b41c38'
+down_revision: Union[str, None] = 'f18a4c6d2b70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # text_pattern_ops serves both lower(city) = 'x' and lower(city) LIKE 'x%'
+    # regardless of the database collation
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_businesses_city_lower_pattern "
+        "ON businesses (lower(city) text_pattern_ops)"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_businesses_district_lower ON businesses (lower(district))")
+    # Postcode equality and BETWEEN ranges (may already exist from optimize_search_performance.sql)
+    op.execute("CREATE INDEX IF NOT EXISTS idx_businesses_postal_code ON businesses (postal_code)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_businesses_district_lower")
+    op.execute("DROP INDEX IF EXISTS idx_businesses_city_lower_pattern")
@@ -0,0 +1,27 @@
+"""Record the source file mtime in import_checkpoints
+
+Revision ID: a83d5e0c7f19
+Revises: d4a9c2f17b85
+Create Date: 2026-10-19 19:12:40.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a83d5e0c7f19'
+down_revision: Union[str, None] = 'd4a9c2f17b85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL for existing checkpoints: they cannot be resumed, see app/services/import_checkpoint.py
+    op.add_column('import_checkpoints', sa.Column('source_mtime_ns', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('import_checkpoints', 'source_mtime_ns')
@@ -0,0 +1,28 @@
+"""Drop the lower(district) lookup index
+
+Revision ID: b2f7c81e4d05
+Revises: a83d5e0c7f19
+Create Date: 2026-10-19 19:31:06.882450
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2f7c81e4d05'
+down_revision: Union[str, None] = 'a83d5e0c7f19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # district holds the KGS code, not a place name, so the location
+    # resolver no longer looks it up
+    op.execute("DROP INDEX IF EXISTS idx_businesses_district_lower")
+
+
+def downgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS idx_businesses_district_lower ON businesses (lower(district))")
@@ -0,0 +1,39 @@
+"""Add branch_keywords dictionary and a GIN index for branch filters
+
+Revision ID: b90e3f7c5a12
+Revises: a6d2e9b41c38
+Create Date: 2026-10-19 14:21:37.284519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b90e3f7c5a12'
+down_revision: Union[str, None] = 'a6d2e9b41c38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'branch_keywords',
+        sa.Column('keyword', sa.String(), nullable=False),
+        sa.Column('branch_id', sa.String(), nullable=False),
+        sa.Column('business_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('keyword', 'branch_id')
+    )
+    # categories holds a JSON array of branch ids as text; the expression
+    # index lets (categories::jsonb) ?| ARRAY[...] use an index lookup
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_businesses_categories_jsonb "
+        "ON businesses USING gin ((categories::jsonb))"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_businesses_categories_jsonb")
+    op.drop_table('branch_keywords')
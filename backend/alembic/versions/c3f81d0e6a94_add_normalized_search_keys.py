@@ -0,0 +1,65 @@
+"""Add normalized search key columns (name_key, city_key, street_key) with indexes
+
+Revision ID: c3f81d0e6a94
+Revises: b90e3f7c5a12
+Create Date: 2026-10-19 15:05:12.931742
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f81d0e6a94'
+down_revision: Union[str, None] = 'b90e3f7c5a12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable without default: adding the columns does not rewrite the table.
+    # Fill them with scripts/backfill_search_keys.py.
+    op.add_column('businesses', sa.Column('name_key', sa.String(), nullable=True))
+    op.add_column('businesses', sa.Column('city_key', sa.String(), nullable=True))
+    op.add_column('businesses', sa.Column('street_key', sa.String(), nullable=True))
+
+    # CONCURRENTLY: businesses stays writable while the indexes build
+    with op.get_context().autocommit_block():
+        # name_key: substring LIKE and nearest-name ordering (<->) from one
+        # GiST trigram index, which replaces any trigram index on the raw name
+        op.create_index(
+            'idx_businesses_name_key_trgm', 'businesses', ['name_key'],
+            postgresql_using='gist', postgresql_ops={'name_key': 'gist_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index('idx_businesses_name_trgm_gist', table_name='businesses',
+                      postgresql_concurrently=True, if_exists=True)
+        # city_key: equality and prefix (location filter, autocomplete)
+        op.create_index(
+            'idx_businesses_city_key', 'businesses', ['city_key'],
+            postgresql_ops={'city_key': 'text_pattern_ops'},
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index('idx_businesses_city_lower_pattern', table_name='businesses',
+                      postgresql_concurrently=True, if_exists=True)
+        # street_key: substring matches
+        op.create_index(
+            'idx_businesses_street_key_trgm', 'businesses', ['street_key'],
+            postgresql_using='gin', postgresql_ops={'street_key': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_businesses_city_lower_pattern "
+            "ON businesses (lower(city) text_pattern_ops)"
+        )
+        for index in ('idx_businesses_street_key_trgm', 'idx_businesses_city_key', 'idx_businesses_name_key_trgm'):
+            op.drop_index(index, table_name='businesses', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('businesses', 'street_key')
+    op.drop_column('businesses', 'city_key')
+    op.drop_column('businesses', 'name_key')
@@ -0,0 +1,39 @@
+"""Add import_checkpoints table for resumable imports
+
+Revision ID: c41a7e2f9d10
+Revises: b3e6d6d71b9d
+Create Date: 2026-10-19 09:12:31.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a7e2f9d10'
+down_revision: Union[str, None] = 'b3e6d6d71b9d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'import_checkpoints',
+        sa.Column('job_name', sa.String(), nullable=False),
+        sa.Column('source_file', sa.String(), nullable=False),
+        sa.Column('source_size', sa.BigInteger(), nullable=False),
+        sa.Column('byte_offset', sa.BigInteger(), nullable=False),
+        sa.Column('line_number', sa.Integer(), nullable=False),
+        sa.Column('batch_number', sa.Integer(), nullable=False),
+        sa.Column('counters', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('completed', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('job_name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('import_checkpoints')
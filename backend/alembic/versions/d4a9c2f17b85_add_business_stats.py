@@ -0,0 +1,39 @@
+"""Add business_stats summary row for the /stats endpoints
+
+Revision ID: d4a9c2f17b85
+Revises: c3f81d0e6a94
+Create Date: 2026-10-19 17:42:08.516203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a9c2f17b85'
+down_revision: Union[str, None] = 'c3f81d0e6a94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by the first refresh (API background thread or the next import),
+    # see app/services/business_stats.py
+    op.create_table(
+        'business_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('total_businesses', sa.BigInteger(), nullable=False),
+        sa.Column('active_businesses', sa.BigInteger(), nullable=False),
+        sa.Column('businesses_with_location', sa.BigInteger(), nullable=False),
+        sa.Column('businesses_with_phone', sa.BigInteger(), nullable=False),
+        sa.Column('unique_cities', sa.BigInteger(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.CheckConstraint('id = 1', name='business_stats_single_row')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('business_stats')
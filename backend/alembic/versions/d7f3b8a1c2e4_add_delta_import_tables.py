@@ -0,0 +1,35 @@
+"""Add business_content_hashes and delta_import_seen_ids for delta imports
+
+Revision ID: d7f3b8a1c2e4
+Revises: c41a7e2f9d10
+Create Date: 2026-10-19 10:03:52.771940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7f3b8a1c2e4'
+down_revision: Union[str, None] = 'c41a7e2f9d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'business_content_hashes',
+        sa.Column('business_id', sa.BigInteger(), nullable=False),
+        sa.Column('content_hash', sa.String(length=32), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('business_id')
+    )
+    # Scratch list of ids seen by the running delta import; no WAL needed
+    op.execute("CREATE UNLOGGED TABLE delta_import_seen_ids (business_id BIGINT PRIMARY KEY)")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS delta_import_seen_ids")
+    op.drop_table('business_content_hashes')
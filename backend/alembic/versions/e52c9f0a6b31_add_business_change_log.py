@@ -0,0 +1,76 @@
+"""Add business_changes log with triggers for Elasticsearch change sync
+
+Revision ID: e52c9f0a6b31
+Revises: d7f3b8a1c2e4
+Create Date: 2026-10-19 11:26:07.093512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e52c9f0a6b31'
+down_revision: Union[str, None] = 'd7f3b8a1c2e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'business_changes',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column('business_id', sa.BigInteger(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # The worker only ever scans unprocessed entries
+    op.create_index(
+        'idx_business_changes_pending', 'business_changes', ['id'],
+        postgresql_where=sa.text('processed_at IS NULL')
+    )
+    op.create_index('idx_business_changes_changed_at', 'business_changes', ['changed_at'])
+
+    # Statement-level triggers with transition tables: one INSERT ... SELECT
+    # per statement instead of one per row, and one NOTIFY per transaction
+    op.execute("""
+        CREATE OR REPLACE FUNCTION log_business_changes() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                INSERT INTO business_changes (business_id) SELECT id FROM old_rows;
+            ELSE
+                INSERT INTO business_changes (business_id) SELECT id FROM new_rows;
+            END IF;
+            PERFORM pg_notify('business_changes', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER businesses_log_insert AFTER INSERT ON businesses
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION log_business_changes()
+    """)
+    op.execute("""
+        CREATE TRIGGER businesses_log_update AFTER UPDATE ON businesses
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION log_business_changes()
+    """)
+    op.execute("""
+        CREATE TRIGGER businesses_log_delete AFTER DELETE ON businesses
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION log_business_changes()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS businesses_log_delete ON businesses")
+    op.execute("DROP TRIGGER IF EXISTS businesses_log_update ON businesses")
+    op.execute("DROP TRIGGER IF EXISTS businesses_log_insert ON businesses")
+    op.execute("DROP FUNCTION IF EXISTS log_business_changes()")
+    op.drop_index('idx_business_changes_changed_at', table_name='business_changes')
+    op.drop_index('idx_business_changes_pending', table_name='business_changes')
+    op.drop_table('business_changes')
@@ -0,0 +1,30 @@
+"""Add retry state to business_changes
+
+Revision ID: e9c4b7a2d318
+Revises: b2f7c81e4d05
+Create Date: 2026-10-19 21:04:52.317604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9c4b7a2d318'
+down_revision: Union[str, None] = 'b2f7c81e4d05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Entries Elasticsearch rejected wait for next_attempt_at; after the
+    # worker's --max-attempts they stay pending as dead letters
+    op.add_column('business_changes', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('business_changes', sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('business_changes', 'next_attempt_at')
+    op.drop_column('business_changes', 'attempts')
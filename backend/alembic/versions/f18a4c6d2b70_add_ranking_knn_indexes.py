@@ -0,0 +1,37 @@
+"""Add the GiST geometry index for relevance candidate scans (KNN)
+
+Revision ID: f18a4c6d2b70
+Revises: e52c9f0a6b31
+Create Date: 2026-10-19 13:02:51.417210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f18a4c6d2b70'
+down_revision: Union[str, None] = 'e52c9f0a6b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ORDER BY geometry <-> point ... LIMIT k walks this index nearest-first
+    # instead of sorting every match. It may already exist from fix_schema.sql.
+    # The nearest-name scan orders by name_key, whose GiST trigram index comes
+    # with the column (c3f81d0e6a94); an index on the raw name would not be used.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY: no write lock on businesses while the index builds
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_businesses_geometry', 'businesses', ['geometry'],
+            postgresql_using='gist', postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    # idx_businesses_geometry predates this revision (fix_schema.sql)
+    pass
@@ -0,0 +1,42 @@
+"""Add spelling_vocabulary for the query spelling dictionary
+
+Revision ID: f3a1d6c8e207
+Revises: e9c4b7a2d318
+Create Date: 2026-10-19 21:38:14.660927
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a1d6c8e207'
+down_revision: Union[str, None] = 'e9c4b7a2d318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by the first refresh (one API worker or the next import), see
+    # app/services/spelling.py; workers only read it
+    op.create_table(
+        'spelling_vocabulary',
+        sa.Column('word', sa.Text(), nullable=False),
+        sa.Column('frequency', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('word')
+    )
+    op.create_table(
+        'spelling_vocabulary_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('source_signature', sa.Text(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.CheckConstraint('id = 1', name='spelling_vocabulary_state_single_row')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('spelling_vocabulary_state')
+    op.drop_table('spelling_vocabulary')
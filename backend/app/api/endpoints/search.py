@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Query, HTTPException
 from typing import Optional
-from app.models.business import SearchResponse, BusinessSearchResult, Business
+from app.models.business import SearchResponse, Business
 from app.services.business_service import BusinessService
+from app.services.ndjson_index import IndexNotReadyError
+from app.serialization import search_response
 import os
 
 router = APIRouter()
@@ -18,9 +20,10 @@ business_service = BusinessService(DATA_FILE)
 
 
 @router.get("/search", response_model=SearchResponse)
-async def search_businesses(
+def search_businesses(
     keyword: Optional[str] = Query(None, description="Search keyword (business name, category, etc.)"),
     location: Optional[str] = Query(None, description="City name or postcode"),
+    branch: Optional[str] = Query(None, description="Branch id"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Results per page")
 ):
@@ -29,35 +32,46 @@ async def search_businesses(
     
     - **keyword**: Search term for business name or category
     - **location**: City name or postal code
+    - **branch**: Only businesses listed under this branch id
     - **page**: Page number (starts at 1)
     - **page_size**: Number of results per page (max 100)
+    
+    Runs in the threadpool (column scans); answers 503 while the snapshot is built.
     """
     try:
         results, total = business_service.search_businesses(
             keyword=keyword,
             location=location,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            branch=branch
         )
         
-        return SearchResponse(
+        return search_response(
             total=total,
             results=results,
             page=page,
             page_size=page_size
         )
+    except IndexNotReadyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
 
 
 @router.get("/business/{business_id}", response_model=Business)
-async def get_business(business_id: str):
+def get_business(business_id: str):
     """
     Get detailed business information by ID
     
     - **business_id**: Unique business identifier
+    
+    Runs in the threadpool (file reads); answers 503 while the offset index is built.
     """
-    business = business_service.get_business_by_id(business_id)
+    try:
+        business = business_service.get_business_by_id(business_id)
+    except IndexNotReadyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
@@ -5,10 +5,12 @@ Enhanced Search API Endpoints using PostgreSQL + Elasticsearch
 from fastapi import APIRouter, Query, HTTPException, Depends
 from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from app.models.business import SearchResponse
-from app.services.search_service_v2 import SearchServiceV2
-from app.database import get_db, Business
+from app.serialization import search_response
+from app.services.search_service_v2 import SearchServiceV2, CursorMismatchError, CursorUnavailableError
+from app.services.business_stats import business_stats
+from app.elasticsearch_client import decode_cursor
+from app.database import get_read_db
 from app.config import get_settings
 import json
 import re
@@ -42,26 +44,39 @@ async def search_businesses(
     location: Optional[str] = Query(None, description="City or postcode"),
     lat: Optional[float] = Query(None, description="Latitude for geo-search"),
     lon: Optional[float] = Query(None, description="Longitude for geo-search"),
-    radius: Optional[float] = Query(50, description="Search radius in km"),
+    radius: Optional[float] = Query(50, description="Maximum search radius in km (widened up to this as needed)"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=50),
     sort_by: str = Query("relevance", description="Sort by: relevance, distance, name"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (deep paging)"),
+    db: Session = Depends(get_read_db)
 ):
     """
     Advanced business search with PostgreSQL + Elasticsearch
     
     Features:
     - Full-text search with German stemming
-    - Fuzzy matching for typos
+    - Fuzzy matching for typos (`did_you_mean` suggestion; the query is only
+      replaced by it when the input finds nothing, see `query_corrected`)
     - Geo-distance search
     - Multiple sort options
-    - Fast pagination
+    - Fast pagination (`page`, or `cursor` for stable deep paging; a cursor
+      only continues the query it came from (409 otherwise) and answers 503
+      while Elasticsearch is unavailable)
+    - Adaptive radius: on page 1 near-me searches widen only until the page
+      is full; `next_cursor` keeps that radius, with `page` > 1 pass
+      `effective_radius_km` back as `radius` to stay on the same result set
     """
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
     try:
         service = SearchServiceV2(db, use_elasticsearch=settings.USE_ELASTICSEARCH)
         
-        results, total = service.search_businesses(
+        results, total, meta = await service.search_businesses(
             keyword=keyword,
             location=location,
             lat=lat,
@@ -69,15 +84,25 @@ async def search_businesses(
             radius_km=radius,
             page=page,
             page_size=page_size,
-            sort_by=sort_by
+            sort_by=sort_by,
+            cursor=cursor
         )
         
-        return SearchResponse(
+        return search_response(
             total=total,
             results=results,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            total_exact=meta["total_exact"],
+            next_cursor=meta["next_cursor"],
+            effective_radius_km=meta["effective_radius_km"],
+            did_you_mean=meta["did_you_mean"],
+            query_corrected=meta["query_corrected"]
         )
+    except CursorMismatchError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except CursorUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
 
@@ -86,7 +111,7 @@ async def search_businesses(
 async def autocomplete_cities(
     prefix: str = Query(..., min_length=2, description="City name prefix"),
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     City name autocomplete
@@ -95,7 +120,7 @@ async def autocomplete_cities(
     """
     try:
         service = SearchServiceV2(db, use_elasticsearch=settings.USE_ELASTICSEARCH)
-        cities = service.autocomplete_cities(prefix, limit)
+        cities = await service.autocomplete_cities(prefix, limit)
         
         return {
             "prefix": prefix,
@@ -108,7 +133,7 @@ async def autocomplete_cities(
 @router.get("/business/{business_id}")
 async def get_business(
     business_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get detailed business information by ID
@@ -186,28 +211,24 @@ async def get_business(
 
 
 @router.get("/stats")
-async def get_stats(db: Session = Depends(get_db)):
+async def get_stats():
     """
     Get database statistics
     
-    Returns counts and information about the database
+    Returns counts and information about the database, served from the
+    precomputed business_stats row (`refreshed_at`, `age_seconds`)
     """
-    total_businesses = db.query(Business).count()
-    businesses_with_location = db.query(Business).filter(
-        Business.latitude.isnot(None),
-        Business.longitude.isnot(None)
-    ).count()
-    businesses_with_phone = db.query(Business).filter(Business.phone.isnot(None)).count()
-    businesses_active = db.query(Business).filter(Business.is_active == True).count()
-    
-    # Get cities count
-    cities_count = db.query(func.count(func.distinct(Business.city))).scalar()
+    stats = business_stats.current()
+    if stats is None:
+        raise HTTPException(status_code=503, detail="Statistics are being computed, try again shortly")
     
     return {
-        "total_businesses": total_businesses,
-        "active_businesses": businesses_active,
-        "businesses_with_location": businesses_with_location,
-        "businesses_with_phone": businesses_with_phone,
-        "unique_cities": cities_count,
-        "geocoding_coverage": round((businesses_with_location / total_businesses * 100), 2) if total_businesses > 0 else 0
+        "total_businesses": stats["total_businesses"],
+        "active_businesses": stats["active_businesses"],
+        "businesses_with_location": stats["businesses_with_location"],
+        "businesses_with_phone": stats["businesses_with_phone"],
+        "unique_cities": stats["unique_cities"],
+        "geocoding_coverage": stats["geocoding_coverage"],
+        "refreshed_at": stats["refreshed_at"],
+        "age_seconds": stats["age_seconds"]
     }
@@ -0,0 +1,120 @@
+"""
+Circuit breaker for optional backends (Elasticsearch)
+
+Closed:    requests go to the backend; consecutive failures are counted
+Open:      requests skip the backend immediately (callers use their fallback)
+           while a background task probes it at a fixed interval
+Half-open: a probe succeeded; the next real request decides whether the
+           breaker closes again or re-opens
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stop routing to a failing backend and probe it until it recovers"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        probe_interval: float = 5.0,
+        probe: Optional[Callable[[], Awaitable[bool]]] = None
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.probe = probe
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.trips = 0
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def allow_request(self) -> bool:
+        """Whether a request should be sent to the backend right now"""
+        return self.state != OPEN
+
+    def record_success(self):
+        if self.state != CLOSED:
+            logger.info(f"Circuit '{self.name}' closed - backend recovered")
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self, error: Optional[BaseException] = None):
+        self.consecutive_failures += 1
+        if error is not None:
+            self.last_error = f"{type(error).__name__}: {error}"[:200]
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self):
+        """Open the breaker and start probing in the background"""
+        if self.state != OPEN:
+            self.trips += 1
+            logger.warning(f"Circuit '{self.name}' opened after {self.consecutive_failures} failures: {self.last_error}")
+        self.state = OPEN
+        self.opened_at = time.time()
+        self._start_probing()
+
+    def _start_probing(self):
+        if self.probe is None or (self._probe_task and not self._probe_task.done()):
+            return
+        try:
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
+        except RuntimeError:
+            # No running loop (e.g. called from a script); requests stay blocked until a probe runs
+            self._probe_task = None
+
+    async def _probe_loop(self):
+        while self.state == OPEN:
+            await asyncio.sleep(self.probe_interval)
+            try:
+                healthy = await self.probe()
+            except Exception as e:
+                healthy = False
+                self.last_error = f"{type(e).__name__}: {e}"[:200]
+            if healthy:
+                self.state = HALF_OPEN
+                logger.info(f"Circuit '{self.name}' half-open - probe succeeded")
+
+    async def check(self) -> bool:
+        """Probe once now (used at startup); trips the breaker if the backend is down"""
+        if self.probe is None:
+            return True
+        try:
+            healthy = await self.probe()
+        except Exception as e:
+            healthy = False
+            self.last_error = f"{type(e).__name__}: {e}"[:200]
+        if healthy:
+            self.record_success()
+        else:
+            self.last_error = self.last_error or "health probe failed"
+            self.trip()
+        return healthy
+
+    async def close(self):
+        if self._probe_task and not self._probe_task.done():
+            self._probe_task.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Breaker state for /health"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "open_for_seconds": round(time.time() - self.opened_at, 1) if self.opened_at else None,
+            "trips": self.trips,
+            "last_error": self.last_error
+        }
@@ -4,7 +4,7 @@ Best practices for AWS deployment
 """
 import os
 import json
-from typing import Union, List
+from typing import Dict, Optional, Union, List
 from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from functools import lru_cache
@@ -28,11 +28,76 @@ class Settings(BaseSettings):
     DB_MAX_OVERFLOW: int = 40
     DB_POOL_TIMEOUT: int = 30
     DB_POOL_RECYCLE: int = 3600
+    DB_POOL_PRE_PING: bool = True
+    # Read replicas for search/detail/autocomplete/stats (app/replicas.py);
+    # JSON array or comma-separated, empty = everything on the primary
+    DATABASE_REPLICA_URLS: Union[str, List[str]] = []
+    DB_REPLICA_MAX_LAG_SECONDS: float = 30.0
+    DB_REPLICA_CHECK_INTERVAL: float = 10.0
+    DB_PGBOUNCER: Optional[bool] = None  # Transaction-mode pooler; None = detect (Supabase pooler, port 6543)
+    # Statement timeouts for API requests (app/db_pool.py); scripts run without one
+    DB_STATEMENT_TIMEOUT_MS: int = 5000
+    DB_ROUTE_STATEMENT_TIMEOUTS_MS: Dict[str, int] = {
+        "/api/v2/autocomplete": 500,
+        "/api/v2/business": 1000,
+        "/api/v2/search": 3000,
+        "/api/v2/stats": 15000,
+        "/health": 1000
+    }
     
     # Elasticsearch (optional)
     ELASTICSEARCH_HOST: str = "localhost"
     ELASTICSEARCH_PORT: int = 9200
+    ELASTICSEARCH_INDEX: str = "businesses"  # Alias the API searches; see scripts/reindex_elasticsearch.py
     USE_ELASTICSEARCH: bool = False
+    ELASTICSEARCH_CONNECT_TIMEOUT: float = 1.0  # Health probes
+    ELASTICSEARCH_REQUEST_TIMEOUT: float = 2.0  # Searches; PostgreSQL answers if exceeded
+    ELASTICSEARCH_MAX_CONNECTIONS: int = 25
+    ELASTICSEARCH_BREAKER_THRESHOLD: int = 3  # Consecutive failures before skipping ES
+    ELASTICSEARCH_BREAKER_PROBE_INTERVAL: float = 5.0
+    ELASTICSEARCH_TRACK_TOTAL_HITS: int = 10000  # Totals above this are reported as a lower bound
+    ELASTICSEARCH_PIT_KEEP_ALIVE: str = "2m"  # Point-in-time lifetime between cursor pages
+    
+    # Hedged search: if ES has not answered within its recent p-th percentile
+    # latency, the same query also goes to PostgreSQL and the first answer wins
+    SEARCH_HEDGING_ENABLED: bool = False
+    SEARCH_HEDGE_PERCENTILE: float = 95.0
+    SEARCH_HEDGE_MIN_DELAY_MS: int = 50  # Floor, so fast clusters do not hedge every request
+    SEARCH_HEDGE_MAX_DELAY_MS: int = 1000  # Also used until enough samples are collected
+    SEARCH_HEDGE_MIN_SAMPLES: int = 50
+    
+    # Relevance ranking (see app/services/ranking.py)
+    RANKING_DISTANCE_WEIGHT: float = 1.0
+    RANKING_COMPLETENESS_WEIGHT: float = 0.2
+    RANKING_DECAY_SCALE_KM: float = 5.0
+    RANKING_DECAY_OFFSET_KM: float = 0.5
+    RANKING_DECAY: float = 0.5  # Proximity boost left at offset + scale
+    RANKING_CANDIDATES: int = 500  # PostgreSQL rows re-ranked per relevance search
+    
+    # Near-me searches try these radii (km) in order, up to the requested radius,
+    # and stop at the first one that fills the page
+    SEARCH_RADIUS_STEPS_KM: List[float] = [2, 5, 10, 25]
+    
+    # Keyword → branch dictionary (scripts/build_branch_keywords.py), reloaded in memory
+    BRANCH_KEYWORDS_REFRESH_SECONDS: int = 600
+    
+    # Query spelling correction (app/services/spelling.py)
+    SPELLING_ENABLED: bool = True
+    SPELLING_MAX_EDIT_DISTANCE: int = 2
+    SPELLING_PREFIX_LENGTH: int = 6
+    SPELLING_MIN_COUNT: int = 3  # Words rarer than this are not suggested
+    SPELLING_MAX_TERMS: int = 50000  # Bounds the delete table (~20 entries per word)
+    SPELLING_CHECK_INTERVAL: int = 300  # Seconds between data-change checks
+    
+    # Precomputed /stats counts (app/services/business_stats.py)
+    BUSINESS_STATS_REFRESH_SECONDS: int = 3600  # Recompute when older (imports also refresh)
+    BUSINESS_STATS_RELOAD_SECONDS: int = 30  # How often workers re-read the stored row
+    
+    # Startup warmup and health checks (app/health.py)
+    WARMUP_ENABLED: bool = True
+    WARMUP_CONNECTIONS: int = 5  # Pooled connections opened per engine before serving
+    WARMUP_STATEMENT_TIMEOUT_MS: int = 5000  # Per-statement budget for warmup queries (readiness waits on them)
+    HEALTH_CHECK_INTERVAL: float = 5.0  # Seconds between background database checks
     
     # Redis (optional)
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -47,10 +112,10 @@ class Settings(BaseSettings):
     # CORS - can be JSON array string or comma-separated string
     CORS_ORIGINS: Union[str, List[str]] = "http://localhost:3000,http://localhost:3001,http://192.168.12.214:3000,http://192.168.12.214:3001,http://localhost:8000,http://127.0.0.1:8000"
     
-    @field_validator('CORS_ORIGINS', mode='before')
+    @field_validator('CORS_ORIGINS', 'DATABASE_REPLICA_URLS', mode='before')
     @classmethod
     def parse_cors_origins(cls, v):
-        """Parse CORS_ORIGINS from string or list"""
+        """Parse CORS_ORIGINS / DATABASE_REPLICA_URLS from string or list"""
         if isinstance(v, str):
             # Try to parse as JSON first
             try:
@@ -68,8 +133,16 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
-    # Rate Limiting
+    # Rate Limiting (see app/rate_limit.py); budget units per client and minute
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_BACKEND: str = "memory"  # "redis" shares the budget across workers (uses REDIS_URL)
+    RATE_LIMIT_MAX_CLIENTS: int = 100000  # In-process table size; idle clients are evicted first
+    # Budget units per request by path prefix (longest match); everything else costs 1
+    RATE_LIMIT_ROUTE_COSTS: Dict[str, float] = {
+        "/api/v1/search": 2.0,
+        "/api/v2/search": 2.0,
+        "/api/v2/autocomplete": 0.5
+    }
     
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -82,6 +155,10 @@ class Settings(BaseSettings):
     # Geocoding
     GEOCODING_PROVIDER: str = "nominatim"
     GEOCODING_RATE_LIMIT: int = 1
+    GEOCODING_CACHE_MAX_ENTRIES: int = 50000  # Geocoded v1 postcode/city pairs kept on disk
+    GEOCODING_RETRY_SECONDS: int = 86400  # Pairs the geocoder could not find are retried after this
+    GEOCODING_QUEUE_SIZE: int = 1000  # Pending background lookups; further misses wait for a later request
+    GEOCODING_RELOAD_SECONDS: int = 60  # How often each worker picks up pairs geocoded by others
     
     class Config:
         env_file = ".env"
@@ -1,9 +1,13 @@
-from sqlalchemy import create_engine, Column, String, Boolean, DateTime, Table, ForeignKey, Text, Integer, Float
+from sqlalchemy import event, create_engine, Column, String, Boolean, DateTime, Table, ForeignKey, Text, Integer, BigInteger, Float
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from geoalchemy2 import Geometry
 from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, JSONB
 from datetime import datetime
+from app.services.normalization import search_keys
+from app.db_pool import apply_statement_timeout, engine_options
+from app.replicas import ReplicaRouter
+from app.config import settings
 import os
 
 # Database URL from environment or default
@@ -17,11 +21,15 @@ DATABASE_URL = os.getenv(
     )
 )
 
-# Create engine
-engine = create_engine(DATABASE_URL, echo=False)
+# Create engine (pool sized by the DB_POOL_* settings, see app/db_pool.py)
+engine = create_engine(DATABASE_URL, echo=False, **engine_options(DATABASE_URL))
 
 # Create session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+event.listen(SessionLocal, "after_begin", apply_statement_timeout)
+
+# Read-only sessions: healthy replicas, falling back to the primary
+replica_router = ReplicaRouter(settings.DATABASE_REPLICA_URLS, SessionLocal)
 
 # Base class for models
 Base = declarative_base()
@@ -55,6 +63,11 @@ class Business(Base):
     embedding = Column(ARRAY(Float))
     opening_hours = Column(JSONB)  # Opening hours in JSON format
     
+    # Folded search keys (app/services/normalization.py), kept in sync on insert/update
+    name_key = Column(String)
+    city_key = Column(String)
+    street_key = Column(String)
+    
     # Properties for backward compatibility
     @property
     def street(self):
@@ -75,6 +88,92 @@ class Business(Base):
     # branches = relationship("Branch", secondary=business_branches, back_populates="businesses")
 
 
+@event.listens_for(Business, "before_insert")
+@event.listens_for(Business, "before_update")
+def _set_search_keys(mapper, connection, business):
+    """Recompute the search keys whenever a business is written through the ORM"""
+    keys = search_keys(business.name, business.city, business.street_address)
+    for column, value in keys.items():
+        if getattr(business, column) != value:
+            setattr(business, column, value)
+
+
+class BusinessContentHash(Base):
+    """Content hash of the source record each business was last imported from"""
+    __tablename__ = 'business_content_hashes'
+    
+    business_id = Column(BigInteger, primary_key=True)
+    content_hash = Column(String(32), nullable=False)  # md5 hex of the hashed import fields
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class BusinessChange(Base):
+    """Change-log entry written by triggers on businesses, consumed by the ES sync worker"""
+    __tablename__ = 'business_changes'
+    
+    id = Column(BigInteger, primary_key=True)
+    business_id = Column(BigInteger, nullable=False)
+    changed_at = Column(DateTime(timezone=True), nullable=False)
+    processed_at = Column(DateTime(timezone=True))  # NULL until synced to Elasticsearch
+    attempts = Column(Integer, nullable=False, default=0)  # Times Elasticsearch rejected the document
+    next_attempt_at = Column(DateTime(timezone=True))  # Not claimed again before this
+
+
+class ImportCheckpoint(Base):
+    """Progress of a resumable NDJSON import, committed together with each batch"""
+    __tablename__ = 'import_checkpoints'
+    
+    job_name = Column(String, primary_key=True)
+    source_file = Column(String, nullable=False)
+    source_size = Column(BigInteger, nullable=False)
+    source_mtime_ns = Column(BigInteger)  # Source file mtime; resume refuses a file modified since
+    byte_offset = Column(BigInteger, nullable=False, default=0)  # File position after the last committed line
+    line_number = Column(Integer, nullable=False, default=0)
+    batch_number = Column(Integer, nullable=False, default=0)
+    counters = Column(JSONB)  # Processed/inserted/skipped totals at the checkpoint
+    completed = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class BranchKeyword(Base):
+    """Search keyword → branch id, learned from the suche keyword lists (scripts/build_branch_keywords.py)"""
+    __tablename__ = 'branch_keywords'
+    
+    keyword = Column(String, primary_key=True)  # Normalized keyword
+    branch_id = Column(String, primary_key=True)
+    business_count = Column(Integer, nullable=False)  # Records listing both the keyword and the branch
+
+
+class BusinessStats(Base):
+    """Precomputed business counts, one row (app/services/business_stats.py)"""
+    __tablename__ = 'business_stats'
+    
+    id = Column(Integer, primary_key=True)
+    total_businesses = Column(BigInteger, nullable=False)
+    active_businesses = Column(BigInteger, nullable=False)
+    businesses_with_location = Column(BigInteger, nullable=False)
+    businesses_with_phone = Column(BigInteger, nullable=False)
+    unique_cities = Column(BigInteger, nullable=False)
+    refreshed_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class SpellingVocabulary(Base):
+    """Words and frequencies behind the spelling dictionary (app/services/spelling.py)"""
+    __tablename__ = 'spelling_vocabulary'
+    
+    word = Column(Text, primary_key=True)
+    frequency = Column(BigInteger, nullable=False)
+
+
+class SpellingVocabularyState(Base):
+    """When spelling_vocabulary was refreshed and from which table write counters, one row"""
+    __tablename__ = 'spelling_vocabulary_state'
+    
+    id = Column(Integer, primary_key=True)
+    source_signature = Column(Text, nullable=False)
+    refreshed_at = Column(DateTime(timezone=True), nullable=False)
+
+
 # Note: Branch table not used with existing events_db schema
 # Categories are stored as JSON in the businesses.categories field
 # class Branch(Base):
@@ -92,6 +191,15 @@ def get_db():
         db.close()
 
 
+# Dependency for read-only endpoints (replica when one is healthy)
+def get_read_db():
+    db = replica_router.session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 # Create all tables
 def init_db():
     """Initialize database tables"""
@@ -0,0 +1,108 @@
+"""
+Connection pool setup and per-request statement timeouts
+
+engine_options() turns the DB_POOL_* settings into create_engine arguments:
+a QueuePool of DB_POOL_SIZE + DB_MAX_OVERFLOW connections, pre-ping on
+checkout (drops connections the server or a pooler closed), recycling after
+DB_POOL_RECYCLE seconds, and checkout wait times recorded as the
+`db.pool.checkout_wait` latency (timeouts as `db.pool.timeouts`).
+
+PgBouncer transaction mode (Supabase's pooler on port 6543, detected from
+the URL unless DB_PGBOUNCER is set) hands every transaction to a possibly
+different server connection, so:
+
+- nothing may rely on session state: the statement timeout is applied with
+  SET LOCAL at the start of each transaction, never with a session SET or
+  a startup option (which the pooler rejects)
+- server-side prepared statements are disabled for drivers that use them
+  (psycopg 3); psycopg2 never prepares
+
+Statement timeouts are budgets per route (DB_ROUTE_STATEMENT_TIMEOUTS_MS,
+longest path prefix wins, DB_STATEMENT_TIMEOUT_MS otherwise): tight for
+autocomplete, looser for stats. StatementTimeoutMiddleware puts the budget
+into a context variable that the session's after_begin hook reads; it is
+inherited by threadpool calls of the request. The startup warmup sets its
+own budget (WARMUP_STATEMENT_TIMEOUT_MS); other work outside requests
+(scripts, exports, background rebuilds) has no budget and runs unlimited.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+from app.config import settings
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Statement timeout (ms) for database work of the current request; None = no limit
+statement_timeout_ms: ContextVar[Optional[int]] = ContextVar("statement_timeout_ms", default=None)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a free connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            metrics.increment("db.pool.timeouts")
+            raise
+        finally:
+            metrics.observe("db.pool.checkout_wait", time.perf_counter() - started)
+
+
+def uses_pgbouncer(url: str) -> bool:
+    if settings.DB_PGBOUNCER is not None:
+        return settings.DB_PGBOUNCER
+    parsed = make_url(url)
+    return parsed.port == 6543 or "pooler.supabase.com" in (parsed.host or "")
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """create_engine keyword arguments for the configured pool"""
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING
+    }
+    if uses_pgbouncer(url):
+        logger.info("PgBouncer transaction mode: prepared statements off, timeouts per transaction")
+        if make_url(url).get_driver_name() == "psycopg":
+            options["connect_args"] = {"prepare_threshold": None}
+    return options
+
+
+def route_statement_timeout(path: str) -> int:
+    """Statement timeout budget (ms) for a request path"""
+    best = None
+    for prefix, timeout in settings.DB_ROUTE_STATEMENT_TIMEOUTS_MS.items():
+        if path.startswith(prefix) and (best is None or len(prefix) > len(best[0])):
+            best = (prefix, timeout)
+    return best[1] if best else settings.DB_STATEMENT_TIMEOUT_MS
+
+
+def apply_statement_timeout(session, transaction, connection):
+    """Session after_begin hook: SET LOCAL the current request's budget"""
+    timeout = statement_timeout_ms.get()
+    if timeout:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
+
+def pool_status(engine) -> Dict[str, Any]:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "idle": pool.checkedin()
+    }
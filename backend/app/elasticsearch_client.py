@@ -1,22 +1,69 @@
-from elasticsearch import Elasticsearch
-from typing import List, Dict, Any
-import os
+from elasticsearch import Elasticsearch, ApiError, TransportError, NotFoundError
+from typing import List, Dict, Any, Iterable, Optional
+from app.circuit_breaker import CircuitBreaker
+from app.config import settings
+from app.services.ranking import es_function_score
+from app.services.normalization import normalize_key, search_keys
+import base64
+import json
 
 # Elasticsearch connection
-ES_HOST = os.getenv("ELASTICSEARCH_HOST", "localhost")
-ES_PORT = int(os.getenv("ELASTICSEARCH_PORT", "9200"))
+ES_HOST = settings.ELASTICSEARCH_HOST
+ES_PORT = settings.ELASTICSEARCH_PORT
+ES_URL = f"http://{ES_HOST}:{ES_PORT}"
 
-es_client = Elasticsearch([f"http://{ES_HOST}:{ES_PORT}"])
+# Synchronous client for scripts (imports, reindex, sync worker)
+es_client = Elasticsearch([ES_URL])
 
-# Index name
-BUSINESS_INDEX = "businesses"
+# Async client for the request path: bounded pool, no transport retries
+# (a failed search falls back to PostgreSQL instead of retrying)
+try:
+    from elasticsearch import AsyncElasticsearch
+    async_es_client = AsyncElasticsearch(
+        [ES_URL],
+        request_timeout=settings.ELASTICSEARCH_REQUEST_TIMEOUT,
+        connections_per_node=settings.ELASTICSEARCH_MAX_CONNECTIONS,
+        max_retries=0,
+        retry_on_timeout=False
+    )
+except Exception as e:  # aiohttp not installed
+    print(f"⚠️  Async Elasticsearch client unavailable: {e}")
+    async_es_client = None
 
+# Name searched by the API. Reindexing builds versioned indices
+# (businesses_v<timestamp>) and points this name at them as an alias.
+BUSINESS_INDEX = settings.ELASTICSEARCH_INDEX
 
-def init_elasticsearch():
-    """Initialize Elasticsearch index with mappings"""
-    
-    # Index settings and mappings
-    index_body = {
+
+async def _probe_elasticsearch() -> bool:
+    """Cheap availability check with the short connect timeout"""
+    if async_es_client is None:
+        return False
+    return await async_es_client.options(request_timeout=settings.ELASTICSEARCH_CONNECT_TIMEOUT).ping()
+
+
+# Shared breaker: after repeated failures searches skip Elasticsearch
+# entirely until a background probe sees it healthy again
+es_breaker = CircuitBreaker(
+    "elasticsearch",
+    failure_threshold=settings.ELASTICSEARCH_BREAKER_THRESHOLD,
+    probe_interval=settings.ELASTICSEARCH_BREAKER_PROBE_INTERVAL,
+    probe=_probe_elasticsearch
+)
+
+
+def is_availability_error(error: BaseException) -> bool:
+    """Whether an error means Elasticsearch is unavailable (vs. a bad query)"""
+    if isinstance(error, TransportError):  # connection refused, timeouts
+        return True
+    if isinstance(error, ApiError):
+        return error.meta.status >= 500 or error.meta.status == 429
+    return async_es_client is None
+
+
+def build_index_body() -> Dict[str, Any]:
+    """Settings and mappings for a businesses index"""
+    return {
         "settings": {
             "analysis": {
                 "analyzer": {
@@ -72,16 +119,24 @@ def init_elasticsearch():
                     "analyzer": "german_analyzer"
                 },
                 "branch_ids": {"type": "keyword"},
+                # Folded keys (app/services/normalization.py); queries are folded the same way
+                "name_key": {"type": "text", "analyzer": "whitespace"},
+                "city_key": {"type": "keyword"},
+                "street_key": {"type": "keyword"},
                 "verlag": {"type": "keyword"},
                 "created_at": {"type": "date"},
                 "updated_at": {"type": "date"}
             }
         }
     }
+
+
+def init_elasticsearch():
+    """Initialize Elasticsearch index with mappings"""
     
     # Create index if it doesn't exist
     if not es_client.indices.exists(index=BUSINESS_INDEX):
-        es_client.indices.create(index=BUSINESS_INDEX, body=index_body)
+        es_client.indices.create(index=BUSINESS_INDEX, body=build_index_body())
         print(f"✅ Elasticsearch index '{BUSINESS_INDEX}' created successfully!")
     else:
         print(f"ℹ️  Elasticsearch index '{BUSINESS_INDEX}' already exists")
@@ -101,32 +156,115 @@ def index_business(business_data: Dict[str, Any]):
         return False
 
 
-def bulk_index_businesses(businesses: List[Dict[str, Any]]):
-    """Bulk index multiple businesses"""
+def bulk_index_businesses(businesses: Iterable[Dict[str, Any]], index: str = None):
+    """Bulk index multiple businesses (actions are generated lazily, not built in memory)"""
     from elasticsearch.helpers import bulk
     
-    actions = [
+    target_index = index or BUSINESS_INDEX
+    actions = (
         {
-            "_index": BUSINESS_INDEX,
+            "_index": target_index,
             "_id": business['id'],
             "_source": business
         }
         for business in businesses
-    ]
+    )
     
     success, failed = bulk(es_client, actions, stats_only=True)
     print(f"✅ Indexed {success} businesses, {failed} failed")
     return success, failed
 
 
-def search_businesses_es(
+def business_to_document(business) -> Dict[str, Any]:
+    """Build the Elasticsearch document for a PostgreSQL Business row"""
+    branch_ids = []
+    if business.categories:
+        try:
+            branch_ids = json.loads(business.categories) if isinstance(business.categories, str) else business.categories
+        except ValueError:
+            branch_ids = []
+    
+    document = {
+        "id": str(business.id),
+        "name": business.name,
+        "street": business.street_address,
+        "postcode": business.postal_code,
+        "city": business.city,
+        "phone": business.phone,
+        "email": business.email,
+        "website": business.website,
+        "branch_ids": branch_ids if isinstance(branch_ids, list) else [],
+        **search_keys(business.name, business.city, business.street_address)
+    }
+    
+    if business.latitude and business.longitude:
+        document["location"] = {"lat": business.latitude, "lon": business.longitude}
+    
+    return document
+
+
+# Fields rendered by the result list; everything else stays on the shard
+LIST_SOURCE_FIELDS = ["id", "name", "street", "postcode", "city", "phone", "website", "branch_ids", "location"]
+
+
+def encode_cursor(pit_id: Optional[str], search_after: List[Any], context: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Opaque cursor for the next page: point-in-time id plus the last sort values
+    
+    `context` is carried along unchanged for the caller (the search service
+    binds the query the cursor belongs to there).
+    """
+    payload = json.dumps({"pit": pit_id, "after": search_after, "ctx": context}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(payload, dict) or not isinstance(payload.get("after"), list):
+        raise ValueError("Invalid cursor")
+    return payload
+
+
+def _location_filter(location: str) -> Dict[str, Any]:
+    """
+    Exact (non-fuzzy) city/postcode constraint for filter context
+    
+    Fuzzy clauses are expanded per query and cannot be cached, so the
+    filter only matches city terms as typed or by their folded city_key
+    ("Muenchen" → "munchen"), and postcodes by prefix.
+    """
+    location = location.strip()
+    if location.isdigit():
+        if len(location) == 5:
+            return {"term": {"postcode": location}}
+        return {"prefix": {"postcode": location}}
+    return {
+        "bool": {
+            "should": [
+                {"match": {"city": {"query": location, "operator": "and"}}},
+                {"term": {"city_key": normalize_key(location)}}
+            ],
+            "minimum_should_match": 1
+        }
+    }
+
+
+async def search_businesses_es(
     keyword: str = None,
     location: str = None,
     lat: float = None,
     lon: float = None,
     radius_km: float = 50,
     page: int = 1,
-    page_size: int = 20
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+    sort_by: str = "relevance",
+    branch_ids: Optional[List[str]] = None,
+    cursor_context: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     Search businesses using Elasticsearch
@@ -135,35 +273,44 @@ def search_businesses_es(
     - Full-text search with German stemming
     - Fuzzy matching for typos
     - Geo-distance filtering
-    - Pagination
+    - Blended relevance (text, distance decay, completeness) or
+      distance/name sorting
+    - Pagination: `page` (from/size) for shallow pages, or the returned
+      `next_cursor` (search_after on a point-in-time) for stable deep paging
+    
+    The total is exact up to ELASTICSEARCH_TRACK_TOTAL_HITS; beyond that
+    `total_exact` is False and `total` is a lower bound.
     """
     
     must_queries = []
     filter_queries = []
     
-    # Keyword search (fuzzy)
-    if keyword:
+    # Category keyword resolved to branches: exact, cacheable filter
+    if branch_ids:
+        filter_queries.append({"terms": {"branch_ids": branch_ids}})
+    # Keyword search (fuzzy), plus the folded name so "muenchner" finds "Münchner"
+    elif keyword:
         must_queries.append({
-            "multi_match": {
-                "query": keyword,
-                "fields": ["name^2", "branches"],
-                "fuzziness": "AUTO",
-                "analyzer": "german_analyzer"
-            }
-        })
-    
-    # Location search (city or postcode)
-    if location:
-        filter_queries.append({
             "bool": {
                 "should": [
-                    {"match": {"city": {"query": location, "fuzziness": "AUTO"}}},
-                    {"term": {"postcode": location}}
+                    {
+                        "multi_match": {
+                            "query": keyword,
+                            "fields": ["name^2", "branches"],
+                            "fuzziness": "AUTO",
+                            "analyzer": "german_analyzer"
+                        }
+                    },
+                    {"match": {"name_key": {"query": normalize_key(keyword), "fuzziness": "AUTO"}}}
                 ],
                 "minimum_should_match": 1
             }
         })
     
+    # Location search (city or postcode)
+    if location:
+        filter_queries.append(_location_filter(location))
+    
     # Geo-distance filter (if coordinates provided)
     if lat and lon:
         filter_queries.append({
@@ -184,10 +331,9 @@ def search_businesses_es(
         }
     }
     
-    # Sort by relevance, then by geo-distance if coordinates provided
-    sort_criteria = ["_score"]
-    if lat and lon:
-        sort_criteria.append({
+    # id breaks ties so search_after never skips or repeats a document
+    if sort_by == "distance" and lat and lon:
+        sort_criteria = [{
             "_geo_distance": {
                 "location": {
                     "lat": lat,
@@ -196,17 +342,51 @@ def search_businesses_es(
                 "order": "asc",
                 "unit": "km"
             }
-        })
+        }]
+    elif sort_by == "name":
+        sort_criteria = [{"name.keyword": "asc"}]
+    else:
+        # Relevance: _score already includes distance decay and completeness
+        query = es_function_score(query, lat, lon)
+        sort_criteria = ["_score"]
+    sort_criteria.append({"id": "asc"})
     
-    # Execute search
-    result = es_client.search(
-        index=BUSINESS_INDEX,
+    search_args = dict(
         query=query,
-        from_=(page - 1) * page_size,
         size=page_size,
-        sort=sort_criteria
+        sort=sort_criteria,
+        track_total_hits=settings.ELASTICSEARCH_TRACK_TOTAL_HITS,
+        source=LIST_SOURCE_FIELDS
     )
     
+    pit_id = None
+    if cursor:
+        # The first page is served from the live index; the point-in-time is
+        # only opened once a client actually pages, then reused for every page
+        position = decode_cursor(cursor)
+        pit_id = position.get("pit")
+        if not pit_id:
+            pit_id = await _open_point_in_time()
+        search_args["search_after"] = position["after"]
+        try:
+            result = await async_es_client.search(
+                pit={"id": pit_id, "keep_alive": settings.ELASTICSEARCH_PIT_KEEP_ALIVE}, **search_args
+            )
+        except NotFoundError:
+            # Point-in-time expired: continue from the same position on a fresh one
+            pit_id = await _open_point_in_time()
+            result = await async_es_client.search(
+                pit={"id": pit_id, "keep_alive": settings.ELASTICSEARCH_PIT_KEEP_ALIVE}, **search_args
+            )
+        pit_id = result.get("pit_id", pit_id)
+    else:
+        # Execute search
+        result = await async_es_client.search(
+            index=BUSINESS_INDEX,
+            from_=(page - 1) * page_size,
+            **search_args
+        )
+    
     # Extract results
     hits = result['hits']['hits']
     total = result['hits']['total']['value']
@@ -216,33 +396,45 @@ def search_businesses_es(
         business = hit['_source']
         business['score'] = hit['_score']
         
-        # Add distance if geo-search was performed
-        if lat and lon and 'sort' in hit:
-            business['distance_km'] = round(hit['sort'][-1], 2)
+        # Add distance if results were sorted by it
+        if sort_by == "distance" and lat and lon and 'sort' in hit:
+            business['distance_km'] = round(hit['sort'][0], 2)
         
         businesses.append(business)
     
+    # An unfilled page is the last one; the point-in-time then simply expires
+    next_cursor = None
+    if len(hits) == page_size:
+        next_cursor = encode_cursor(pit_id, hits[-1]['sort'], cursor_context)
+    
     return {
         "total": total,
+        "total_exact": result['hits']['total']['relation'] == "eq",
         "results": businesses,
         "page": page,
-        "page_size": page_size
+        "page_size": page_size,
+        "next_cursor": next_cursor
     }
 
 
-def autocomplete_location(prefix: str, limit: int = 5) -> List[str]:
+async def _open_point_in_time() -> str:
+    result = await async_es_client.open_point_in_time(
+        index=BUSINESS_INDEX,
+        keep_alive=settings.ELASTICSEARCH_PIT_KEEP_ALIVE
+    )
+    return result['id']
+
+
+async def autocomplete_location(prefix: str, limit: int = 5) -> List[str]:
     """Autocomplete for city names"""
-    result = es_client.search(
+    result = await async_es_client.search(
         index=BUSINESS_INDEX,
         query={
-            "match": {
-                "city.autocomplete": {
-                    "query": prefix,
-                    "operator": "and"
-                }
+            "prefix": {
+                "city_key": normalize_key(prefix)
             }
         },
-        _source=["city"],
+        source=["city"],
         size=limit,
         collapse={"field": "city.keyword"}
     )
@@ -250,13 +442,3 @@ def autocomplete_location(prefix: str, limit: int = 5) -> List[str]:
     cities = [hit['_source']['city'] for hit in result['hits']['hits']]
     return cities
 
-
-# Initialize on import
-try:
-    if es_client.ping():
-        print("✅ Connected to Elasticsearch")
-        # init_elasticsearch()  # Uncomment to auto-create index
-    else:
-        print("⚠️  Elasticsearch not available")
-except Exception as e:
-    print(f"⚠️  Elasticsearch connection error: {e}")
@@ -0,0 +1,174 @@
+"""
+Startup warmup and cached health state
+
+Warmup runs in the background right after startup:
+
+    connections  open WARMUP_CONNECTIONS pooled connections per engine
+                 (primary and replicas), so early requests skip connect + TLS
+    queries      representative searches and an autocomplete through the
+                 real service code, which compiles and caches their
+                 statements and loads the keyword → branch dictionary;
+                 each statement is capped at WARMUP_STATEMENT_TIMEOUT_MS, so a
+                 slow cold query cannot hold readiness past the deploy's
+                 health check timeout
+    elasticsearch one search to open the transport connections
+    v1 indexes   map (building if needed) the v1 offset index and snapshot;
+                 runs after readiness, since a first build can take minutes
+                 (the v1 routes answer 503 until their maps are ready)
+
+Step failures are logged and recorded, they do not stop the warmup.
+
+A monitor task checks the primary with SELECT 1 (in a worker thread) every
+HEALTH_CHECK_INTERVAL seconds. The health endpoints only read this cached
+state, so a probe never waits for the database:
+
+    /health/live   the process answers
+    /health/ready  warmup finished and the last database check passed recently
+    /health        readiness plus component details (load balancer check)
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.api.endpoints.search import business_service
+from app.config import settings
+from app.database import SessionLocal, engine, replica_router
+from app.db_pool import statement_timeout_ms
+from app.elasticsearch_client import es_breaker, search_businesses_es
+from app.services.search_service_v2 import SearchServiceV2
+
+logger = logging.getLogger(__name__)
+
+# Typical traffic: text + city, category keyword, near-me by distance
+WARMUP_SEARCHES = [
+    {"keyword": "restaurant", "location": "berlin", "sort_by": "relevance"},
+    {"keyword": "zahnarzt", "location": "10115", "sort_by": "relevance"},
+    {"keyword": "friseur", "lat": 52.52, "lon": 13.405, "radius_km": 10, "sort_by": "distance"},
+]
+
+
+def _open_connections(target_engine, count: int):
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(target_engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()  # back into the pool, still open
+
+
+def _warm_connections():
+    count = min(settings.WARMUP_CONNECTIONS, settings.DB_POOL_SIZE)
+    _open_connections(engine, count)
+    for replica in replica_router.replicas:
+        try:
+            _open_connections(replica.engine, count)
+        except Exception as e:
+            logger.warning(f"Warmup: replica {replica.name} not reachable: {e}")
+
+
+def _warm_queries():
+    async def run():
+        db = replica_router.session()
+        try:
+            service = SearchServiceV2(db, use_elasticsearch=False)
+            for query in WARMUP_SEARCHES:
+                await service.search_businesses(**query)
+            await service.autocomplete_cities("ber")
+        finally:
+            db.close()
+
+    # Runs in a copy of the caller's context, so the budget stays with warmup
+    statement_timeout_ms.set(settings.WARMUP_STATEMENT_TIMEOUT_MS)
+    # PostgreSQL-only searches block; give them this thread's own loop
+    asyncio.run(run())
+
+
+def _warm_v1_indexes():
+    business_service.offset_index.prepare()
+    business_service.snapshot.prepare()
+
+
+class HealthState:
+    """Warmup progress and the last database check, read by the health endpoints"""
+
+    def __init__(self):
+        self.warmup_done = False
+        self.warmup_steps: Dict[str, Any] = {}
+        self.database_ok = False
+        self.database_error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self._tasks = []
+
+    async def _step(self, name: str, step):
+        started = time.monotonic()
+        try:
+            await step()
+            self.warmup_steps[name] = {"ok": True, "ms": round((time.monotonic() - started) * 1000)}
+        except Exception as e:
+            logger.warning(f"Warmup step '{name}' failed: {e}")
+            self.warmup_steps[name] = {"ok": False, "error": str(e)}
+
+    async def warmup(self):
+        started = time.monotonic()
+        await self._step("connections", lambda: run_in_threadpool(_warm_connections))
+        await self._step("queries", lambda: run_in_threadpool(_warm_queries))
+        if settings.USE_ELASTICSEARCH and es_breaker.allow_request():
+            await self._step("elasticsearch", lambda: search_businesses_es(keyword="restaurant", page_size=1))
+        self.warmup_done = True
+        await self._step("v1_indexes", lambda: run_in_threadpool(_warm_v1_indexes))
+        logger.info(f"Warmup finished in {time.monotonic() - started:.1f}s: {self.warmup_steps}")
+
+    def _check_database(self):
+        db = SessionLocal()
+        try:
+            db.execute(text("SELECT 1"))
+        finally:
+            db.close()
+
+    async def monitor(self):
+        while True:
+            try:
+                await run_in_threadpool(self._check_database)
+                self.database_ok, self.database_error = True, None
+            except Exception as e:
+                self.database_ok, self.database_error = False, str(e)
+            self.checked_at = time.time()
+            await asyncio.sleep(settings.HEALTH_CHECK_INTERVAL)
+
+    def start(self):
+        """Begin warmup and database monitoring as background tasks"""
+        self._tasks = [asyncio.create_task(self.monitor())]
+        if settings.WARMUP_ENABLED:
+            self._tasks.append(asyncio.create_task(self.warmup()))
+        else:
+            self.warmup_done = True
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    @property
+    def ready(self) -> bool:
+        # A check older than three intervals means the monitor itself is stuck
+        fresh = self.checked_at is not None and time.time() - self.checked_at < 3 * settings.HEALTH_CHECK_INTERVAL
+        return self.warmup_done and self.database_ok and fresh
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "warmup": {"done": self.warmup_done, "steps": self.warmup_steps},
+            "database": "connected" if self.database_ok else "disconnected",
+            "database_error": self.database_error,
+            "checked_seconds_ago": round(time.time() - self.checked_at, 1) if self.checked_at else None
+        }
+
+
+# Export singleton
+health_state = HealthState()
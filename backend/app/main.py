@@ -3,9 +3,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.api.endpoints import search
 from app.api.endpoints import search_v2
-from app.middleware import RateLimitMiddleware, LoggingMiddleware
-from app.database import SessionLocal
+from app.middleware import RateLimitMiddleware, LoggingMiddleware, StatementTimeoutMiddleware
+from app.database import engine, replica_router
+from app.db_pool import pool_status
 from app.config import settings
+from app.elasticsearch_client import async_es_client, es_breaker
+from app.metrics import metrics
+from app.services.spelling import spelling_service
+from app.services.branch_resolver import branch_resolver
+from app.services.business_stats import business_stats
+from app.health import health_state
 from contextlib import asynccontextmanager
 import logging
 
@@ -23,9 +30,34 @@ async def lifespan(app: FastAPI):
     print("🔍 Search: PostgreSQL + Elasticsearch (if available)")
     print("⚡ Rate Limiting: Enabled")
     print("📝 Logging: Enabled")
+    if settings.USE_ELASTICSEARCH:
+        # Start with the breaker open if ES is down, so no request pays its timeout
+        if await es_breaker.check():
+            print("✅ Connected to Elasticsearch")
+        else:
+            print("⚠️  Elasticsearch not available - searching PostgreSQL until it recovers")
+    # Read-only sessions use the primary until a replica passes its first check
+    replica_router.start()
+    # Served from memory; loaded (and refreshed if stale) in the background
+    business_stats.start()
+    # Keyword → branch filters; keywords are searched by text until loaded
+    branch_resolver.start()
+    if settings.SPELLING_ENABLED:
+        # Built in the background; searches run uncorrected until it is ready
+        spelling_service.start()
+    # Warmup and database checks in the background; /health/ready reports progress
+    health_state.start()
     yield
     # Shutdown
     print("👋 Shutting down...")
+    await health_state.stop()
+    spelling_service.stop()
+    branch_resolver.stop()
+    replica_router.stop()
+    business_stats.stop()
+    await es_breaker.close()
+    if async_es_client is not None:
+        await async_es_client.close()
 
 # Create FastAPI app
 app = FastAPI(
@@ -38,8 +70,17 @@ app = FastAPI(
 )
 
 # Add middleware (order matters!)
+app.add_middleware(StatementTimeoutMiddleware)
 app.add_middleware(LoggingMiddleware)
-app.add_middleware(RateLimitMiddleware, calls=60, period=60)  # 60 requests per minute
+app.add_middleware(
+    RateLimitMiddleware,
+    calls=settings.RATE_LIMIT_PER_MINUTE,
+    period=60,
+    backend=settings.RATE_LIMIT_BACKEND,
+    redis_url=settings.REDIS_URL,
+    route_costs=settings.RATE_LIMIT_ROUTE_COSTS,
+    max_clients=settings.RATE_LIMIT_MAX_CLIENTS
+)
 
 # CORS middleware - using settings from config
 app.add_middleware(
@@ -69,50 +110,53 @@ async def root():
 async def health_check():
     """
     Health check endpoint for AWS load balancer
-    Checks database connectivity
+    Answers from cached state (warmup finished, database reachable);
+    never queries the database itself
     """
-    try:
-        db = SessionLocal()
-        from sqlalchemy import text
-        db.execute(text("SELECT 1"))
-        db.close()
-        
-        return {
-            "status": "healthy",
-            "database": "connected",
-            "version": "2.0.0"
-        }
-    except Exception as e:
-        return JSONResponse(
-            status_code=503,
-            content={
-                "status": "unhealthy",
-                "database": "disconnected",
-                "error": str(e)
-            }
-        )
+    state = health_state.snapshot()
+    body = {
+        "status": "healthy" if state["ready"] else "unhealthy",
+        **state,
+        "replicas": replica_router.snapshot(),
+        "elasticsearch": es_breaker.snapshot() if settings.USE_ELASTICSEARCH else "disabled",
+        "version": "2.0.0"
+    }
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=body)
+
+
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: warmed up and the database answered recently"""
+    state = health_state.snapshot()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """In-process counters and latency percentiles for this worker"""
+    return {**metrics.snapshot(), "db_pool": pool_status(engine)}
 
 
 @app.get("/api/v2/stats")
 async def get_stats():
-    """Database statistics"""
-    try:
-        db = SessionLocal()
-        from sqlalchemy import text
-        
-        total = db.execute(text("SELECT COUNT(*) FROM businesses")).scalar()
-        active = db.execute(text("SELECT COUNT(*) FROM businesses WHERE is_active = true")).scalar()
-        with_coords = db.execute(text("SELECT COUNT(*) FROM businesses WHERE latitude IS NOT NULL AND longitude IS NOT NULL")).scalar()
-        
-        db.close()
-        
-        return {
-            "total_businesses": total,
-            "active_businesses": active,
-            "businesses_with_coords": with_coords,
-            "geocoding_coverage": round((with_coords / total * 100), 2) if total > 0 else 0,
-            "database": "events_db",
-            "search_engine": "postgresql" if not getattr(search_v2, 'USE_ELASTICSEARCH', False) else "elasticsearch"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    """Database statistics (precomputed, see app/services/business_stats.py)"""
+    stats = business_stats.current()
+    if stats is None:
+        raise HTTPException(status_code=503, detail="Statistics are being computed, try again shortly")
+    
+    return {
+        "total_businesses": stats["total_businesses"],
+        "active_businesses": stats["active_businesses"],
+        "businesses_with_coords": stats["businesses_with_location"],
+        "geocoding_coverage": stats["geocoding_coverage"],
+        "refreshed_at": stats["refreshed_at"],
+        "age_seconds": stats["age_seconds"],
+        "database": "events_db",
+        "search_engine": "postgresql" if not getattr(search_v2, 'USE_ELASTICSEARCH', False) else "elasticsearch"
+    }
@@ -0,0 +1,80 @@
+"""
+In-process metrics (counters and latency windows) served by /metrics
+
+Values are per worker process and reset on restart; they are meant for
+quick inspection and scraping, not as a durable time series.
+"""
+
+import math
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Any, Optional
+
+
+class LatencyWindow:
+    """Sliding window of the most recent latency samples (seconds)"""
+
+    def __init__(self, size: int = 1000):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+            self.count += 1
+
+    def percentile(self, p: float, min_samples: int = 1) -> Optional[float]:
+        """p-th percentile (0-100) of the window, or None with too few samples"""
+        with self._lock:
+            if len(self.samples) < max(1, min_samples):
+                return None
+            ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        def ms(value):
+            return round(value * 1000, 2) if value is not None else None
+        return {
+            "count": self.count,
+            "p50_ms": ms(self.percentile(50)),
+            "p95_ms": ms(self.percentile(95)),
+            "p99_ms": ms(self.percentile(99))
+        }
+
+
+class MetricsRegistry:
+    """Named counters and latency windows"""
+
+    def __init__(self):
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.latencies: Dict[str, LatencyWindow] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] += value
+
+    def latency(self, name: str) -> LatencyWindow:
+        window = self.latencies.get(name)
+        if window is None:
+            with self._lock:
+                window = self.latencies.setdefault(name, LatencyWindow())
+        return window
+
+    def observe(self, name: str, seconds: float):
+        self.latency(name).observe(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            latencies = dict(self.latencies)
+        return {
+            "counters": counters,
+            "latencies": {name: window.snapshot() for name, window in latencies.items()}
+        }
+
+
+# Export singleton
+metrics = MetricsRegistry()
@@ -1,85 +1,159 @@
 """
 Production middleware - Rate limiting, logging, error handling
 Best practices for AWS deployment
+
+Rate limit state and backends live in app/rate_limit.py.
+
+Written as plain ASGI callables rather than BaseHTTPMiddleware: they pass
+the request straight through (no extra task, no re-wrapped body stream) and
+only look at the messages they need. scripts/benchmark_middleware.py
+measures the per-request overhead of the stack.
 """
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, Optional
 import time
 import logging
-from collections import defaultdict
-from datetime import datetime, timedelta
+from app.rate_limit import create_limiter
+from app.db_pool import route_statement_timeout, statement_timeout_ms
 
 logger = logging.getLogger(__name__)
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple rate limiting middleware"""
-    
-    def __init__(self, app, calls: int = 60, period: int = 60):
-        super().__init__(app)
+def _client_host(scope: Scope, default: str) -> str:
+    client = scope.get("client")
+    return client[0] if client else default
+
+
+class RateLimitMiddleware:
+    """Sliding-window rate limiting per client, weighted by route cost"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        calls: int = 60,
+        period: int = 60,
+        backend: str = "memory",
+        redis_url: Optional[str] = None,
+        route_costs: Optional[Dict[str, float]] = None,
+        max_clients: int = 100000
+    ):
+        self.app = app
         self.calls = calls
         self.period = period
-        self.clients = defaultdict(list)
-    
-    async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host if request.client else "testclient"
-        now = datetime.now()
-        
-        # Clean old entries
-        self.clients[client_ip] = [
-            req_time for req_time in self.clients[client_ip]
-            if now - req_time < timedelta(seconds=self.period)
-        ]
-        
+        self.limiter = create_limiter(backend, calls, period, max_clients, redis_url)
+        # Longest prefix wins
+        self.route_costs = sorted((route_costs or {}).items(), key=lambda item: -len(item[0]))
+
+    def cost(self, path: str) -> float:
+        for prefix, cost in self.route_costs:
+            if path.startswith(prefix):
+                return cost
+        return 1.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client_ip = _client_host(scope, "testclient")
+
         # Check rate limit
-        if len(self.clients[client_ip]) >= self.calls:
-            return JSONResponse(
+        if not await self.limiter.allow(client_ip, self.cost(scope["path"])):
+            response = JSONResponse(
                 status_code=429,
                 content={"detail": "Too many requests. Please try again later."}
             )
-        
-        # Add current request
-        self.clients[client_ip].append(now)
-        
-        response = await call_next(request)
-        return response
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
 
+class StatementTimeoutMiddleware:
+    """Database statement timeout budget for the request's route"""
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = statement_timeout_ms.set(route_statement_timeout(scope["path"]))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            statement_timeout_ms.reset(token)
+
+
+class LoggingMiddleware:
     """Log all requests"""
-    
-    async def dispatch(self, request: Request, call_next):
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         start_time = time.time()
-        
-        response = await call_next(request)
-        
+        status_code = None
+
+        async def send_with_process_time(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Time until the response starts, as the header always reported
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", str(time.time() - start_time))
+            await send(message)
+
+        await self.app(scope, receive, send_with_process_time)
+
         process_time = time.time() - start_time
-        client_host = request.client.host if request.client else "unknown"
+        client_host = _client_host(scope, "unknown")
         logger.info(
-            f"{request.method} {request.url.path} "
-            f"Status:{response.status_code} "
+            f"{scope['method']} {scope['path']} "
+            f"Status:{status_code} "
             f"Time:{process_time:.3f}s "
             f"Client:{client_host}"
         )
-        
-        response.headers["X-Process-Time"] = str(process_time)
-        return response
 
 
-class ErrorHandlerMiddleware(BaseHTTPMiddleware):
+class ErrorHandlerMiddleware:
     """Global error handler"""
-    
-    async def dispatch(self, request: Request, call_next):
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking_start(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send_tracking_start)
         except Exception as e:
             logger.error(f"Unhandled error: {str(e)}", exc_info=True)
-            return JSONResponse(
+            if response_started:
+                raise  # Too late for a different status
+            response = JSONResponse(
                 status_code=500,
                 content={
                     "detail": "Internal server error",
                     "type": type(e).__name__
                 }
             )
+            await response(scope, receive, send)
@@ -91,3 +91,8 @@ class SearchResponse(BaseModel):
     results: List[BusinessSearchResult]
     page: int
     page_size: int
+    total_exact: bool = True  # False when total is a lower bound or an estimate
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch the following page
+    effective_radius_km: Optional[float] = None  # Radius actually searched (near-me searches)
+    did_you_mean: Optional[str] = None  # Spelling suggestion when the input looks misspelled
+    query_corrected: bool = False  # True when the input found nothing and results are for did_you_mean
@@ -0,0 +1,137 @@
+"""
+Sliding-window-counter rate limiting
+
+Each client has a counter for the current fixed window and the one before
+it. The request rate is estimated as
+
+    previous × (share of the previous window still inside the sliding window) + current
+
+so a check is O(1) and the state per client is three numbers, however high
+the limit. Requests carry a cost (per-route weights, see
+RATE_LIMIT_ROUTE_COSTS), so an expensive search spends more of the budget
+than an autocomplete call.
+
+Backends:
+    memory  per process; clients are kept in least-recently-seen order, so
+            idle ones (windows expired) are dropped from the front and a full
+            table evicts the least recently seen client, both in O(1)
+    redis   one budget shared by all workers (counters with a TTL, checked
+            and incremented atomically by a Lua script); falls back to the
+            in-process limiter while Redis is unreachable, and after a
+            failure skips Redis for retry_after seconds so requests do not
+            each wait for the socket timeout
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import List
+
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SlidingWindowLimiter:
+    """In-process sliding window counter with least-recently-seen eviction"""
+
+    def __init__(self, limit: float, period: float, max_clients: int = 100000):
+        self.limit = float(limit)
+        self.period = period
+        self.max_clients = max_clients
+        # key → [window, current count, previous count], least recently seen first
+        self.clients: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._swept_window = 0
+
+    async def allow(self, key: str, cost: float = 1.0) -> bool:
+        return self.hit(key, cost)
+
+    def hit(self, key: str, cost: float = 1.0, now: float = None) -> bool:
+        """Count the request if it fits the budget; False if it is over the limit"""
+        window, offset = divmod(time.time() if now is None else now, self.period)
+        if window != self._swept_window:
+            self._sweep(window)
+
+        entry = self.clients.get(key)
+        if entry is None:
+            if len(self.clients) >= self.max_clients:
+                self.clients.popitem(last=False)
+            entry = self.clients[key] = [window, 0.0, 0.0]
+        else:
+            self.clients.move_to_end(key)
+        if entry[0] != window:
+            entry[2] = entry[1] if entry[0] == window - 1 else 0.0
+            entry[1] = 0.0
+            entry[0] = window
+
+        if entry[2] * (1 - offset / self.period) + entry[1] + cost > self.limit:
+            return False
+        entry[1] += cost
+        return True
+
+    def _sweep(self, window: float):
+        """Forget clients with no requests in the current or previous window"""
+        self._swept_window = window
+        # Least recently seen first, so the idle clients are a prefix
+        while self.clients and next(iter(self.clients.values()))[0] < window - 1:
+            self.clients.popitem(last=False)
+
+
+# KEYS: current window counter, previous window counter
+# ARGV: previous window weight, cost, limit, counter TTL
+_REDIS_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[1]) + current + tonumber(ARGV[2]) > tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('INCRBYFLOAT', KEYS[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+
+class RedisSlidingWindowLimiter:
+    """Sliding window counter shared by all workers through Redis"""
+
+    def __init__(self, url: str, limit: float, period: float, max_clients: int = 100000, prefix: str = "ratelimit",
+                 retry_after: float = 5.0):
+        import redis.asyncio as redis  # optional dependency, only for this backend
+
+        self.limit = float(limit)
+        self.period = period
+        self.prefix = prefix
+        self.retry_after = retry_after
+        self._skip_until = 0.0  # monotonic time before which Redis is not tried
+        self.client = redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self.script = self.client.register_script(_REDIS_SCRIPT)
+        self.fallback = SlidingWindowLimiter(limit, period, max_clients)
+
+    async def allow(self, key: str, cost: float = 1.0) -> bool:
+        if time.monotonic() < self._skip_until:
+            return self.fallback.hit(key, cost)
+        window, offset = divmod(time.time(), self.period)
+        window = int(window)
+        try:
+            allowed = await self.script(
+                keys=[f"{self.prefix}:{key}:{window}", f"{self.prefix}:{key}:{window - 1}"],
+                args=[1 - offset / self.period, cost, self.limit, int(self.period * 2)]
+            )
+            return bool(allowed)
+        except Exception as e:
+            metrics.increment("ratelimit.redis_errors")
+            logger.debug(f"Redis rate limit check failed, using in-process limiter for {self.retry_after}s: {e}")
+            self._skip_until = time.monotonic() + self.retry_after
+            return self.fallback.hit(key, cost)
+
+
+def create_limiter(backend: str, limit: float, period: float, max_clients: int, redis_url: str = None):
+    """Limiter for the configured backend ("memory" or "redis")"""
+    if backend == "redis":
+        try:
+            return RedisSlidingWindowLimiter(redis_url, limit, period, max_clients)
+        except ImportError as e:
+            raise RuntimeError(
+                "RATE_LIMIT_BACKEND=redis needs the redis package (see requirements-full.txt)"
+            ) from e
+    return SlidingWindowLimiter(limit, period, max_clients)
@@ -0,0 +1,133 @@
+"""
+Read-replica routing for read-only sessions
+
+DATABASE_REPLICA_URLS lists streaming replicas of the primary. Read-only
+request paths (search, business detail, autocomplete, stats) take their
+session from `ReplicaRouter.session()`; everything that writes (imports,
+migrations, sync workers) keeps using SessionLocal on the primary.
+
+A background thread checks every replica each DB_REPLICA_CHECK_INTERVAL
+seconds: it must answer, be in recovery, have a WAL receiver that is
+streaming from the primary, and replay within DB_REPLICA_MAX_LAG_SECONDS of
+the primary. The receiver status is only visible to superusers and members of
+pg_read_all_stats (or pg_monitor), so the replica URL's role needs one of
+them; otherwise the replica never counts as healthy. Sessions go round-robin to the
+replicas that passed their last check, and to the primary when none did
+(including before the first check). Counters: db.read.replica,
+db.read.primary.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.db_pool import apply_statement_timeout, engine_options
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Whether the replica is streaming, and the seconds it is behind; 0 when it
+# has replayed everything it received (an idle primary does not make a
+# caught-up replica look stale). Without a streaming receiver nothing new
+# arrives, so receive = replay proves nothing and the replica is unhealthy.
+LAG_QUERY = text("""
+    SELECT pg_is_in_recovery(),
+           EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming'),
+           CASE
+               WHEN NOT pg_is_in_recovery() THEN 0
+               WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+               ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+           END
+""")
+
+
+class Replica:
+    """One replica: its engine, session factory and last health check"""
+
+    def __init__(self, url: str):
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self.engine = create_engine(url, echo=False, **engine_options(url))
+        self.sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        event.listen(self.sessionmaker, "after_begin", apply_statement_timeout)
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+
+    def check(self, max_lag: float):
+        try:
+            with self.engine.connect() as connection:
+                in_recovery, streaming, lag = connection.execute(LAG_QUERY).one()
+            self.lag_seconds = float(lag)
+            if not in_recovery:
+                self.last_error = "not a replica (not in recovery)"
+            elif not streaming:
+                self.last_error = "WAL receiver not streaming from the primary"
+            else:
+                self.last_error = None
+            healthy = bool(in_recovery) and bool(streaming) and self.lag_seconds <= max_lag
+        except Exception as e:
+            self.last_error = str(e)
+            healthy = False
+        if healthy != self.healthy:
+            logger.warning(f"Replica {self.name} {'healthy' if healthy else 'unhealthy'} "
+                           f"(lag: {self.lag_seconds}, error: {self.last_error})")
+        self.healthy = healthy
+        self.checked_at = time.time()
+
+
+class ReplicaRouter:
+    """Hands out read-only sessions on healthy replicas, else on the primary"""
+
+    def __init__(self, urls: List[str], primary_sessionmaker):
+        self.primary_sessionmaker = primary_sessionmaker
+        self.replicas = [Replica(url) for url in urls]
+        self._next = itertools.count()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def session(self):
+        """New read-only session; the caller closes it"""
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if healthy:
+            metrics.increment("db.read.replica")
+            return healthy[next(self._next) % len(healthy)].sessionmaker()
+        metrics.increment("db.read.primary")
+        return self.primary_sessionmaker()
+
+    def check(self):
+        for replica in self.replicas:
+            replica.check(settings.DB_REPLICA_MAX_LAG_SECONDS)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.check()
+            self._stop.wait(settings.DB_REPLICA_CHECK_INTERVAL)
+
+    def start(self):
+        """Check the replicas in a daemon thread (no-op without replicas)"""
+        if self.replicas and (self._thread is None or not self._thread.is_alive()):
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="replica-health", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "replica": replica.name,
+                "healthy": replica.healthy,
+                "lag_seconds": replica.lag_seconds,
+                "last_error": replica.last_error
+            }
+            for replica in self.replicas
+        ]
@@ -0,0 +1,70 @@
+"""
+Fast serialization path for search responses
+
+Search endpoints build their hits as `SearchHit` (a slots dataclass with the
+same fields, in the same order, as BusinessSearchResult) and return
+`search_response(...)`, which encodes the page with orjson straight to
+bytes. Returning a Response instance makes FastAPI skip the response_model
+validation and re-encoding; the route still declares
+`response_model=SearchResponse`, so the OpenAPI schema is unchanged.
+
+The services construct hits from already-typed values (database columns,
+Elasticsearch documents), which is what the skipped validation used to
+re-check for every row. scripts/benchmark_serialization.py compares both
+paths.
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import orjson
+from fastapi.responses import Response
+
+
+@dataclass(slots=True)
+class SearchHit:
+    """One search result; serializes exactly like BusinessSearchResult"""
+    id: str
+    name: str
+    address: str
+    city: str
+    postcode: str
+    phone: Optional[str] = None
+    website: Optional[str] = None
+    branches: List[str] = field(default_factory=list)
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    distance_km: Optional[float] = None
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded with orjson (dataclasses included)"""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
+def search_response(
+    results: List[SearchHit],
+    total: int,
+    page: int,
+    page_size: int,
+    total_exact: bool = True,
+    next_cursor: Optional[str] = None,
+    effective_radius_km: Optional[float] = None,
+    did_you_mean: Optional[str] = None,
+    query_corrected: bool = False
+) -> FastJSONResponse:
+    """A SearchResponse body, in SearchResponse field order"""
+    return FastJSONResponse({
+        "total": total,
+        "results": results,
+        "page": page,
+        "page_size": page_size,
+        "total_exact": total_exact,
+        "next_cursor": next_cursor,
+        "effective_radius_km": effective_radius_km,
+        "did_you_mean": did_you_mean,
+        "query_corrected": query_corrected
+    })
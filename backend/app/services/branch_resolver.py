@@ -0,0 +1,81 @@
+"""
+Keyword → branch resolution for category-like searches
+
+The branch_keywords table (built by scripts/build_branch_keywords.py from
+the suche keyword lists of the source data) is held in memory. A keyword
+such as "zahnarzt" resolves to its branch ids, and the search filters on
+those ids through an index instead of substring-matching business names.
+
+The dictionary is loaded by a background thread at startup and reloaded
+every BRANCH_KEYWORDS_REFRESH_SECONDS, so resolve() never touches the
+database; until the first load finishes keywords are searched by text.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import BranchKeyword, SessionLocal
+from app.services.normalization import normalize_key
+
+logger = logging.getLogger(__name__)
+
+
+class BranchResolver:
+    """In-memory keyword → branch ids dictionary, reloaded in the background"""
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.branches: Dict[str, List[str]] = {}
+        self.loaded_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self):
+        """(Re)load the dictionary; keeps the previous one if the table is unavailable"""
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(BranchKeyword.keyword, BranchKeyword.branch_id)
+                .order_by(BranchKeyword.keyword, BranchKeyword.business_count.desc())
+            )
+            branches = defaultdict(list)
+            for keyword, branch_id in rows:
+                branches[keyword].append(branch_id)
+            self.branches = dict(branches)
+            logger.info(f"Loaded {len(self.branches)} branch keywords")
+        except Exception as e:
+            logger.warning(f"Branch keywords not loaded: {e}")
+        finally:
+            db.close()
+            self.loaded_at = time.monotonic()
+
+    def resolve(self, keyword: Optional[str]) -> Optional[List[str]]:
+        """Branch ids for a category-like keyword, or None to search by text"""
+        if not keyword:
+            return None
+        return self.branches.get(normalize_key(keyword))
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.load()
+            self._stop.wait(self.refresh_seconds)
+
+    def start(self):
+        """Load the dictionary and keep it current in a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="branch-keywords", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+# Export singleton
+branch_resolver = BranchResolver(settings.BRANCH_KEYWORDS_REFRESH_SECONDS)
@@ -1,9 +1,11 @@
 import json
 import os
 from typing import List, Optional
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut
-from app.models.business import Business, BusinessSearchResult
+from app.models.business import Business
+from app.services.columnar_snapshot import ColumnarSnapshot
+from app.services.coordinate_store import CoordinateStore
+from app.services.ndjson_index import NDJSONOffsetIndex
+from app.serialization import SearchHit
 
 
 class BusinessService:
@@ -11,8 +13,13 @@ class BusinessService:
     
     def __init__(self, data_file_path: str):
         self.data_file_path = data_file_path
-        self.geocoder = Nominatim(user_agent="gelbeseiten_app")
-        self._cache = {}
+        # Built in the background on first use (lookups raise IndexNotReadyError
+        # meanwhile); rebuilt when the data file's size or mtime changes
+        self.offset_index = NDJSONOffsetIndex(data_file_path)
+        self.snapshot = ColumnarSnapshot(data_file_path)
+        # Postcode/city coordinates (scripts/export_coordinates.py), held in memory
+        self.coordinates = CoordinateStore(f"{data_file_path}.coords.db")
+        self.coordinates.load()
     
     def load_businesses(self, max_lines: Optional[int] = None) -> List[Business]:
         """
@@ -46,8 +53,9 @@ class BusinessService:
         keyword: Optional[str] = None,
         location: Optional[str] = None,
         page: int = 1,
-        page_size: int = 20
-    ) -> tuple[List[BusinessSearchResult], int]:
+        page_size: int = 20,
+        branch: Optional[str] = None
+    ) -> tuple[List[SearchHit], int]:
         """
         Search businesses by keyword and/or location
         
@@ -56,47 +64,25 @@ class BusinessService:
             location: City or postcode
             page: Page number (1-indexed)
             page_size: Number of results per page
+            branch: Branch id to filter on
         
         Returns:
             Tuple of (results, total_count)
         """
-        # Load businesses (in production, use a database)
-        businesses = self.load_businesses()
-        
-        # Filter by keyword
-        if keyword:
-            keyword_lower = keyword.lower()
-            businesses = [
-                b for b in businesses
-                if (
-                    keyword_lower in b.verlagsdaten.kontaktinformationen.personListe[0].name.lower()
-                    if b.verlagsdaten.kontaktinformationen.personListe else False
-                )
-            ]
-        
-        # Filter by location
-        if location:
-            location_lower = location.lower()
-            businesses = [
-                b for b in businesses
-                if (
-                    location_lower in b.verlagsdaten.kontaktinformationen.adresse.ortsname.lower()
-                    or location_lower in b.verlagsdaten.kontaktinformationen.adresse.postleitzahl
-                )
-            ]
-        
-        total = len(businesses)
+        # Vectorized scans over the memory-mapped columnar snapshot
+        rows = self.snapshot.search(keyword=keyword, location=location, branch=branch)
+        total = len(rows)
         
         # Pagination
         start = (page - 1) * page_size
         end = start + page_size
-        page_businesses = businesses[start:end]
         
-        # Convert to search results
+        # Convert to search results; coordinates for the whole page in one lookup
+        page_rows = [self.snapshot.row(row) for row in rows[start:end]]
+        coordinates = self.coordinates.lookup_many((r["postcode"], r["city"]) for r in page_rows)
         results = []
-        for business in page_businesses:
-            result = self._business_to_search_result(business)
-            results.append(result)
+        for row in page_rows:
+            results.append(self._row_to_search_result(row, coordinates[(row["postcode"], row["city"])]))
         
         return results, total
     
@@ -110,48 +96,20 @@ class BusinessService:
         Returns:
             Business object or None
         """
-        # Load businesses (in production, use a database)
-        with open(self.data_file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    data = json.loads(line.strip())
-                    if data.get('_id') == business_id:
-                        return Business(**data)
-                except Exception:
-                    continue
-        
-        return None
+        # One probe in the sidecar offset index, then one slice of the mmap'd file
+        data = self.offset_index.get(business_id)
+        return Business(**data) if data is not None else None
     
-    def _business_to_search_result(self, business: Business) -> BusinessSearchResult:
-        """Convert Business to BusinessSearchResult"""
-        kontakt = business.verlagsdaten.kontaktinformationen
-        person_name = kontakt.personListe[0].name if kontakt.personListe else ""
-        address = kontakt.adresse
-        
-        # Build address string
-        address_str = f"{address.postleitzahl} {address.ortsname}"
-        
-        # Geocode if not cached
-        cache_key = f"{address.postleitzahl}_{address.ortsname}"
-        if cache_key not in self._cache:
-            try:
-                location = self.geocoder.geocode(address_str, timeout=5)
-                if location:
-                    self._cache[cache_key] = (location.latitude, location.longitude)
-                else:
-                    self._cache[cache_key] = (None, None)
-            except (GeocoderTimedOut, Exception):
-                self._cache[cache_key] = (None, None)
-        
-        lat, lon = self._cache[cache_key]
-        
-        return BusinessSearchResult(
-            id=business.id,
-            name=person_name,
-            address=address_str,
-            city=address.ortsname,
-            postcode=address.postleitzahl,
-            branches=business.verlagsdaten.branchenIdListe,
+    def _row_to_search_result(self, row: dict, coordinates: tuple) -> SearchHit:
+        """Convert a snapshot row to SearchHit"""
+        lat, lon = coordinates
+        return SearchHit(
+            id=row["id"],
+            name=row["name"],
+            address=f"{row['postcode']} {row['city']}",
+            city=row["city"],
+            postcode=row["postcode"],
+            branches=row["branches"],
             lat=lat,
             lon=lon
         )
@@ -0,0 +1,134 @@
+"""
+Business statistics served from memory
+
+The counts behind /api/v2/stats are computed in one pass over businesses
+and stored in the single-row business_stats table:
+
+- after every import (scripts/import_businesses.py calls refresh_stats)
+- by the API when the stored row is older than BUSINESS_STATS_REFRESH_SECONDS
+  (one worker at a time, guarded by an advisory lock)
+
+Each worker keeps the row in memory and re-reads it every
+BUSINESS_STATS_RELOAD_SECONDS in a background thread, so the endpoints never
+touch the database. Responses carry `refreshed_at` and `age_seconds`.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import SessionLocal, replica_router
+
+logger = logging.getLogger(__name__)
+
+# Any constant works; it only has to be the same in every worker
+REFRESH_LOCK_ID = 4911
+
+REFRESH_SQL = text("""
+    INSERT INTO business_stats (
+        id, total_businesses, active_businesses, businesses_with_location,
+        businesses_with_phone, unique_cities, refreshed_at
+    )
+    SELECT 1,
+           count(*),
+           count(*) FILTER (WHERE is_active),
+           count(*) FILTER (WHERE latitude IS NOT NULL AND longitude IS NOT NULL),
+           count(*) FILTER (WHERE phone IS NOT NULL),
+           count(DISTINCT city),
+           now()
+    FROM businesses
+    ON CONFLICT (id) DO UPDATE SET
+        total_businesses = EXCLUDED.total_businesses,
+        active_businesses = EXCLUDED.active_businesses,
+        businesses_with_location = EXCLUDED.businesses_with_location,
+        businesses_with_phone = EXCLUDED.businesses_with_phone,
+        unique_cities = EXCLUDED.unique_cities,
+        refreshed_at = EXCLUDED.refreshed_at
+""")
+
+
+def refresh_stats(wait: bool = True) -> bool:
+    """Recompute business_stats on the primary; False if another refresh holds the lock"""
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        lock = "pg_advisory_xact_lock" if wait else "pg_try_advisory_xact_lock"
+        locked = db.execute(text(f"SELECT {lock}(:id)"), {"id": REFRESH_LOCK_ID}).scalar()
+        if wait or locked:
+            db.execute(REFRESH_SQL)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    if wait or locked:
+        logger.info(f"Business statistics refreshed in {time.monotonic() - started:.1f}s")
+        return True
+    return False
+
+
+class BusinessStats:
+    """In-memory copy of the business_stats row, reloaded in the background"""
+
+    def __init__(self):
+        self.row: Optional[Dict[str, Any]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def current(self) -> Optional[Dict[str, Any]]:
+        """The counts plus freshness, or None before the first load"""
+        row = self.row
+        if row is None:
+            return None
+        refreshed_at = row["refreshed_at"]
+        total = row["total_businesses"]
+        return {
+            **row,
+            "geocoding_coverage": round((row["businesses_with_location"] / total * 100), 2) if total > 0 else 0,
+            "refreshed_at": refreshed_at.isoformat(),
+            "age_seconds": round((datetime.now(timezone.utc) - refreshed_at).total_seconds(), 1)
+        }
+
+    def load(self):
+        db = replica_router.session()
+        try:
+            row = db.execute(text("""
+                SELECT total_businesses, active_businesses, businesses_with_location,
+                       businesses_with_phone, unique_cities, refreshed_at
+                FROM business_stats WHERE id = 1
+            """)).mappings().first()
+        finally:
+            db.close()
+        self.row = dict(row) if row else None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.load()
+                current = self.current()
+                if current is None or current["age_seconds"] > settings.BUSINESS_STATS_REFRESH_SECONDS:
+                    if refresh_stats(wait=False):
+                        self.load()
+            except Exception as e:
+                logger.warning(f"Business statistics update failed: {e}")
+            self._stop.wait(settings.BUSINESS_STATS_RELOAD_SECONDS)
+
+    def start(self):
+        """Load the statistics and keep them current in a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="business-stats", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+# Export singleton
+business_stats = BusinessStats()
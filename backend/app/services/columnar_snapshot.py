@@ -0,0 +1,318 @@
+"""
+Columnar snapshot of an NDJSON data file for the v1 search
+
+One pass over the data file produces a compact, column-oriented copy of the
+fields the v1 search filters on and returns (<data file>.cols):
+
+    ids, names, name keys   UTF-8 blobs + row start offsets
+    postcodes, cities       one uint32 code per row into an interned vocabulary
+    branch ids              codes into an interned vocabulary, row start offsets
+
+The file is read through mmap and the columns are NumPy views over it, so
+loading is instant and only touched pages are paged in. Filters are scans
+over whole columns: a keyword is one substring search over the name-key
+blob (matches are mapped back to rows with searchsorted), a location is
+matched against the few thousand distinct cities/postcodes and then
+compared as integer codes across all rows.
+
+Layout (little endian):
+    magic(8) header_length(Q) header (JSON: data file stat, vocabularies,
+    column dtype/offset/count), then the columns, each 8-byte aligned.
+
+Like the offset index (app/services/ndjson_index.py) the snapshot records
+the data file's size and mtime and is rebuilt when either changes, in a
+background thread: until it is ready, searches raise IndexNotReadyError.
+The build holds the same kind of cross-process lock (<snapshot file>.lock),
+so one worker parses the data file and the others map its result.
+"""
+
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.business import Business
+from app.services.ndjson_index import IndexNotReadyError, build_lock
+from app.services.normalization import normalize_key
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GSCOLS01"
+PREAMBLE = struct.Struct("<8sQ")
+SEPARATOR = b"\n"  # ends every name key, so a match never runs into the next row
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class _StringColumn:
+    """Variable-length strings as one UTF-8 blob plus row start offsets"""
+
+    def __init__(self, separator: bytes = b""):
+        self.separator = separator
+        self.starts = array("Q", [0])
+        self.data = bytearray()
+
+    def append(self, value: str):
+        self.data += value.encode("utf-8") + self.separator
+        self.starts.append(len(self.data))
+
+
+class _Interned:
+    """Value → code table; each distinct string is stored once"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class _Snapshot:
+    """Opened snapshot file: column views, vocabularies and the data file stat"""
+
+    def __init__(self, buffer: mmap.mmap, header: dict, base: int):
+        self.buffer = buffer
+        self.rows: int = header["rows"]
+        self.cities: List[str] = header["cities"]
+        self.city_keys: List[str] = header["city_keys"]
+        self.postcodes: List[str] = header["postcodes"]
+        self.branches: List[str] = header["branches"]
+        self.stat: Tuple[int, int] = (header["data_size"], header["data_mtime_ns"])
+        self.offsets: Dict[str, int] = {}
+        self.columns: Dict[str, np.ndarray] = {}
+        for name, (dtype, offset, count) in header["columns"].items():
+            self.offsets[name] = base + offset
+            self.columns[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=base + offset)
+
+    def string(self, column: str, row: int) -> str:
+        starts = self.columns[f"{column}_starts"]
+        return self.columns[column][starts[row]:starts[row + 1]].tobytes().decode("utf-8")
+
+
+class ColumnarSnapshot:
+    """Vectorized keyword/location/branch filters over a memory-mapped column file"""
+
+    def __init__(self, data_file: str, snapshot_file: Optional[str] = None):
+        self.data_file = data_file
+        self.snapshot_file = snapshot_file or f"{data_file}.cols"
+        self._lock = threading.Lock()
+        self._builder: Optional[threading.Thread] = None
+        # Swapped as one reference so a rebuild never pulls the map out from under a search
+        self._snapshot: Optional[_Snapshot] = None
+
+    # Queries
+
+    def search(
+        self,
+        keyword: Optional[str] = None,
+        location: Optional[str] = None,
+        branch: Optional[str] = None
+    ) -> np.ndarray:
+        """Matching row numbers in file order"""
+        snapshot = self._ensure_current()
+        mask = np.ones(snapshot.rows, dtype=bool)
+
+        keyword_key = normalize_key(keyword) if keyword else None
+        if keyword_key:
+            mask &= self._keyword_mask(snapshot, keyword_key)
+
+        if location and location.strip():
+            location_key = normalize_key(location)
+            location_raw = location.strip().lower()
+            city_codes = [code for code, key in enumerate(snapshot.city_keys) if location_key and location_key in key]
+            postcode_codes = [code for code, postcode in enumerate(snapshot.postcodes) if location_raw in postcode]
+            mask &= (
+                np.isin(snapshot.columns["cities"], city_codes)
+                | np.isin(snapshot.columns["postcodes"], postcode_codes)
+            )
+
+        if branch:
+            try:
+                code = snapshot.branches.index(branch)
+            except ValueError:
+                return np.empty(0, dtype=np.int64)
+            hits = np.flatnonzero(snapshot.columns["branch_codes"] == code)
+            branch_mask = np.zeros(snapshot.rows, dtype=bool)
+            branch_mask[np.searchsorted(snapshot.columns["branch_starts"], hits, side="right") - 1] = True
+            mask &= branch_mask
+
+        return np.flatnonzero(mask)
+
+    def _keyword_mask(self, snapshot: _Snapshot, keyword_key: str) -> np.ndarray:
+        # One substring scan over the key blob; match offsets → owning rows
+        start = snapshot.offsets["name_keys"]
+        end = start + snapshot.columns["name_keys"].size
+        pattern = re.compile(re.escape(keyword_key.encode("utf-8")))
+        positions = np.fromiter(
+            (match.start() - start for match in pattern.finditer(snapshot.buffer, start, end)),
+            dtype=np.int64
+        )
+        mask = np.zeros(snapshot.rows, dtype=bool)
+        mask[np.searchsorted(snapshot.columns["name_keys_starts"], positions, side="right") - 1] = True
+        return mask
+
+    def row(self, row: int) -> dict:
+        """id, name, postcode, city and branch ids of one row"""
+        snapshot = self._ensure_current()
+        columns = snapshot.columns
+        branch_starts = columns["branch_starts"]
+        return {
+            "id": snapshot.string("ids", row),
+            "name": snapshot.string("names", row),
+            "postcode": snapshot.postcodes[columns["postcodes"][row]],
+            "city": snapshot.cities[columns["cities"][row]],
+            "branches": [
+                snapshot.branches[code]
+                for code in columns["branch_codes"][branch_starts[row]:branch_starts[row + 1]]
+            ]
+        }
+
+    def __len__(self) -> int:
+        return self._ensure_current().rows
+
+    # Building and loading
+
+    def _data_stat(self) -> Tuple[int, int]:
+        stat = os.stat(self.data_file)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _ensure_current(self) -> _Snapshot:
+        stat = self._data_stat()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.stat == stat:
+            return snapshot
+        # Only held to open the map, never for a build
+        with self._lock:
+            if self._snapshot is None or self._snapshot.stat != stat:
+                snapshot = self._open()
+                if snapshot is None or snapshot.stat != stat:
+                    self._start_build()
+                    raise IndexNotReadyError(f"Columnar snapshot is being built: {self.snapshot_file}")
+                self._snapshot = snapshot
+            return self._snapshot
+
+    def _start_build(self):
+        if self._builder is None or not self._builder.is_alive():
+            self._builder = threading.Thread(target=self._build_logged, name="columnar-snapshot-build", daemon=True)
+            self._builder.start()
+
+    def _build_logged(self):
+        try:
+            with build_lock(self.snapshot_file):
+                # Another worker may have built it while this one waited
+                snapshot = self._open()
+                if snapshot is None or snapshot.stat != self._data_stat():
+                    self.build()
+        except Exception as e:
+            logger.error(f"Building the columnar snapshot failed: {e}")
+
+    def prepare(self):
+        """Build the snapshot if needed and map it, blocking (not for the request path)"""
+        try:
+            self._ensure_current()
+        except IndexNotReadyError:
+            self._builder.join()
+            self._ensure_current()
+
+    def _open(self) -> Optional[_Snapshot]:
+        try:
+            with open(self.snapshot_file, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, header_length = PREAMBLE.unpack_from(buffer, 0)
+        except (OSError, ValueError, struct.error):
+            return None
+        if magic != MAGIC:
+            return None
+        header = json.loads(buffer[PREAMBLE.size:PREAMBLE.size + header_length])
+        return _Snapshot(buffer, header, _align(PREAMBLE.size + header_length))
+
+    def build(self):
+        """Scan the data file and write a fresh snapshot (atomically replaced)"""
+        stat = self._data_stat()
+        ids, names, name_keys = _StringColumn(), _StringColumn(), _StringColumn(SEPARATOR)
+        postcodes, cities, branches = array("I"), array("I"), array("I")
+        branch_starts = array("Q", [0])
+        postcode_vocabulary, city_vocabulary, branch_vocabulary = _Interned(), _Interned(), _Interned()
+
+        with open(self.data_file, "rb") as f:
+            for line in f:
+                # Same records the full-parse path accepted
+                try:
+                    business = Business.model_validate(json.loads(line))
+                except ValueError:
+                    continue
+                kontakt = business.verlagsdaten.kontaktinformationen
+                name = kontakt.personListe[0].name if kontakt.personListe else ""
+                ids.append(business.id)
+                names.append(name)
+                name_keys.append(normalize_key(name))
+                postcodes.append(postcode_vocabulary.code(kontakt.adresse.postleitzahl))
+                cities.append(city_vocabulary.code(kontakt.adresse.ortsname))
+                for branch_id in business.verlagsdaten.branchenIdListe:
+                    branches.append(branch_vocabulary.code(branch_id))
+                branch_starts.append(len(branches))
+
+        rows = len(postcodes)
+        logger.info(f"Building columnar snapshot for {rows} records: {self.snapshot_file}")
+        columns = {
+            "ids": np.frombuffer(bytes(ids.data), dtype=np.uint8),
+            "ids_starts": np.asarray(ids.starts, dtype="<u8"),
+            "names": np.frombuffer(bytes(names.data), dtype=np.uint8),
+            "names_starts": np.asarray(names.starts, dtype="<u8"),
+            "name_keys": np.frombuffer(bytes(name_keys.data), dtype=np.uint8),
+            "name_keys_starts": np.asarray(name_keys.starts, dtype="<u8"),
+            "postcodes": np.asarray(postcodes, dtype="<u4"),
+            "cities": np.asarray(cities, dtype="<u4"),
+            "branch_codes": np.asarray(branches, dtype="<u4"),
+            "branch_starts": np.asarray(branch_starts, dtype="<u8")
+        }
+
+        layout = {}
+        offset = 0
+        for name, column in columns.items():
+            layout[name] = (column.dtype.str, offset, column.size)
+            offset = _align(offset + column.nbytes)
+        header = json.dumps({
+            "data_size": stat[0],
+            "data_mtime_ns": stat[1],
+            "rows": rows,
+            "cities": city_vocabulary.values,
+            "city_keys": [normalize_key(city) for city in city_vocabulary.values],
+            "postcodes": postcode_vocabulary.values,
+            "branches": branch_vocabulary.values,
+            "columns": layout
+        }).encode("utf-8")
+
+        # Unique temp file: several workers may rebuild at the same time
+        fd, temp_file = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self.snapshot_file)),
+            prefix=f"{os.path.basename(self.snapshot_file)}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(PREAMBLE.pack(MAGIC, len(header)))
+                f.write(header)
+                base = _align(PREAMBLE.size + len(header))
+                f.write(bytes(base - f.tell()))
+                for name, column in columns.items():
+                    f.write(bytes(base + layout[name][1] - f.tell()))
+                    f.write(column.tobytes())
+            os.replace(temp_file, self.snapshot_file)
+        except BaseException:
+            os.unlink(temp_file)
+            raise
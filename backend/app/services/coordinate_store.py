@@ -0,0 +1,299 @@
+"""
+Postcode/city → coordinates for v1 search results
+
+Coordinates live in a small SQLite file next to the data file
+(<data file>.coords.db). Rows come from two sources:
+
+    table     precomputed from PostgreSQL by scripts/export_coordinates.py
+    geocoder  filled in by the background worker for pairs the table lacks
+
+The whole store is loaded into memory when the service starts, and a result
+page is resolved with one dictionary lookup per distinct pair. The request
+itself never waits for the network and returns lat/lon None until the pair
+is known. "Not found" answers are stored too and retried after
+GEOCODING_RETRY_SECONDS.
+
+Every API worker process runs one background thread that
+- moves the pairs its requests missed into a geocode_queue table in the file
+  (shared by all workers, so a pair is queued and geocoded once)
+- re-reads rows written since its last read every GEOCODING_RELOAD_SECONDS,
+  so geocoded pairs reach every worker (every write takes the next value of
+  the seq column under SQLite's write lock, so "since" never misses a row
+  that another process committed late)
+- geocodes queued pairs only while it holds the geocoder lease (a row in the
+  file, renewed while the holder lives), so there is a single geocoder and
+  Nominatim sees at most GEOCODING_RATE_LIMIT requests per second in total
+
+While the file cannot be opened or written the thread backs off
+exponentially (up to MAX_BACKOFF_SECONDS) and logs once when the store
+becomes unavailable and once when it recovers.
+
+Geocoder rows are capped at GEOCODING_CACHE_MAX_ENTRIES; the least recently
+written ones are evicted first. Table rows are never evicted.
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, Optional, Tuple
+
+from geopy.geocoders import Nominatim
+
+from app.config import settings
+from app.services.normalization import normalize_key
+
+logger = logging.getLogger(__name__)
+
+Coordinates = Tuple[Optional[float], Optional[float]]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS coordinates (
+    postcode TEXT NOT NULL,
+    city_key TEXT NOT NULL,
+    city TEXT NOT NULL,
+    latitude REAL,
+    longitude REAL,
+    source TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (postcode, city_key)
+);
+CREATE INDEX IF NOT EXISTS ix_coordinates_source_updated ON coordinates (source, updated_at);
+DROP INDEX IF EXISTS ix_coordinates_updated;
+CREATE TABLE IF NOT EXISTS geocode_queue (
+    postcode TEXT NOT NULL,
+    city_key TEXT NOT NULL,
+    city TEXT NOT NULL,
+    queued_at REAL NOT NULL,
+    PRIMARY KEY (postcode, city_key)
+);
+CREATE TABLE IF NOT EXISTS geocoder_lease (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+# A lease not renewed for this long is taken over by another worker
+LEASE_SECONDS = 30
+
+# Longest wait between attempts while the store is unavailable
+MAX_BACKOFF_SECONDS = 300
+
+
+def coordinate_key(postcode: str, city: str) -> Tuple[str, str]:
+    return postcode.strip(), normalize_key(city) or ""
+
+
+class CoordinateStore:
+    """Bounded, persisted postcode/city coordinate table with background geocoding"""
+
+    def __init__(self, path: str, max_entries: int = None, retry_seconds: float = None):
+        self.path = path
+        self.max_entries = max_entries or settings.GEOCODING_CACHE_MAX_ENTRIES
+        self.retry_seconds = retry_seconds or settings.GEOCODING_RETRY_SECONDS
+        # key → (lat, lon, updated_at)
+        self._entries: Dict[Tuple[str, str], Tuple[Optional[float], Optional[float], float]] = {}
+        self._loaded_seq = 0  # seq of the newest row read from the file
+        self._pending = set()
+        self._queue: queue.Queue = queue.Queue(maxsize=settings.GEOCODING_QUEUE_SIZE)
+        self._write_lock = threading.Lock()
+        self._owner = uuid.uuid4().hex  # this process's geocoder lease id
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        # Files written before the seq column existed
+        if "seq" not in {row[1] for row in connection.execute("PRAGMA table_info(coordinates)")}:
+            connection.execute("ALTER TABLE coordinates ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+        connection.execute("CREATE INDEX IF NOT EXISTS ix_coordinates_seq ON coordinates (seq)")
+        return connection
+
+    def load(self):
+        """Bulk-load the whole store into memory; starts empty if the file cannot be opened"""
+        try:
+            connection = self._connect()
+            try:
+                self._read_since(connection, -1)
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Coordinate store {self.path} not loaded: {e}")
+            return
+        logger.info(f"Loaded {len(self._entries)} postcode/city coordinates from {self.path}")
+
+    def _read_since(self, connection: sqlite3.Connection, since: int):
+        """Merge rows written after write sequence `since` (by any process) into memory"""
+        rows = connection.execute(
+            "SELECT postcode, city_key, latitude, longitude, updated_at, seq FROM coordinates WHERE seq > ?",
+            (since,)
+        ).fetchall()
+        for postcode, city_key, lat, lon, updated_at, seq in rows:
+            self._entries[(postcode, city_key)] = (lat, lon, updated_at)
+            self._loaded_seq = max(self._loaded_seq, seq)
+
+    # Lookups
+
+    def lookup_many(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Coordinates]:
+        """Coordinates for (postcode, city) pairs; unknown pairs are queued and come back as (None, None)"""
+        now = time.time()
+        found = {}
+        for postcode, city in pairs:
+            if (postcode, city) in found:
+                continue
+            key = coordinate_key(postcode, city)
+            entry = self._entries.get(key)
+            if entry is None or (entry[0] is None and now - entry[2] > self.retry_seconds):
+                self._enqueue(key, postcode, city)
+            found[(postcode, city)] = (entry[0], entry[1]) if entry else (None, None)
+        return found
+
+    def _enqueue(self, key: Tuple[str, str], postcode: str, city: str):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="coordinate-geocoder", daemon=True)
+            self._thread.start()
+        if key in self._pending:
+            return
+        try:
+            self._queue.put_nowait((key, postcode, city))
+        except queue.Full:
+            return  # asked again by a later request
+        self._pending.add(key)
+
+    # Writes
+
+    def put_many(self, rows: Iterable[Tuple[str, str, Optional[float], Optional[float]]], source: str):
+        """Store (postcode, city, lat, lon) rows; table rows replace geocoder rows for the same pair"""
+        now = time.time()
+        records = []
+        for postcode, city, lat, lon in rows:
+            key = coordinate_key(postcode, city)
+            records.append((*key, city, lat, lon, source, now))
+            self._entries[key] = (lat, lon, now)
+        with self._write_lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    # Take the write lock before reading max(seq), so concurrent
+                    # writers from other processes get strictly increasing values
+                    connection.execute("BEGIN IMMEDIATE")
+                    seq = connection.execute("SELECT coalesce(max(seq), 0) + 1 FROM coordinates").fetchone()[0]
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO coordinates "
+                        "(postcode, city_key, city, latitude, longitude, source, updated_at, seq) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        [(*record, seq) for record in records]
+                    )
+                    if source == "geocoder":
+                        self._evict(connection)
+            finally:
+                connection.close()
+
+    def _evict(self, connection: sqlite3.Connection):
+        evicted = connection.execute(
+            "SELECT postcode, city_key FROM coordinates WHERE source = 'geocoder' "
+            "ORDER BY updated_at DESC LIMIT -1 OFFSET ?",
+            (self.max_entries,)
+        ).fetchall()
+        if evicted:
+            connection.executemany("DELETE FROM coordinates WHERE postcode = ? AND city_key = ?", evicted)
+            for key in evicted:
+                self._entries.pop(tuple(key), None)
+
+    # Background geocoding
+
+    def _run(self):
+        geocoder = Nominatim(user_agent="gelbeseiten_app")
+        interval = 1.0 / max(settings.GEOCODING_RATE_LIMIT, 1)
+        last_reload = time.monotonic()
+        connection = None
+        failures = 0
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                if connection is None:
+                    connection = self._connect()
+                self._flush_misses(connection)
+                if started - last_reload >= settings.GEOCODING_RELOAD_SECONDS:
+                    self._read_since(connection, self._loaded_seq)
+                    last_reload = started
+                if self._hold_lease(connection):
+                    self._geocode_next(connection, geocoder)
+                if failures:
+                    logger.info(f"Coordinate store {self.path} available again")
+                    failures = 0
+            except sqlite3.Error as e:
+                if not failures:
+                    logger.warning(f"Coordinate store {self.path} unavailable, retrying with backoff: {e}")
+                failures += 1
+                if connection is not None:
+                    connection.close()
+                    connection = None
+            delay = min(interval * 2 ** min(failures, 16), MAX_BACKOFF_SECONDS) if failures else interval
+            self._stop.wait(max(0.0, delay - (time.monotonic() - started)))
+        if connection is not None:
+            connection.close()
+
+    def _flush_misses(self, connection: sqlite3.Connection):
+        """Move this worker's misses into the shared queue, skipping pairs queued or answered meanwhile"""
+        misses = []
+        while True:
+            try:
+                misses.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not misses:
+            return
+        for key, _, _ in misses:
+            self._pending.discard(key)
+        queued = connection.execute("SELECT count(*) FROM geocode_queue").fetchone()[0]
+        now = time.time()
+        with connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO geocode_queue (postcode, city_key, city, queued_at) "
+                "SELECT ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM coordinates "
+                "WHERE postcode = ? AND city_key = ? AND (latitude IS NOT NULL OR updated_at > ?))",
+                [(*key, city, now, *key, now - self.retry_seconds)
+                 for key, _, city in misses[:max(0, self._queue.maxsize - queued)]]
+            )
+
+    def _hold_lease(self, connection: sqlite3.Connection) -> bool:
+        """Take or renew the geocoder lease; True if this process is the geocoder"""
+        now = time.time()
+        with connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO geocoder_lease (id, owner, expires_at) VALUES (1, ?, 0)", (self._owner,)
+            )
+            renewed = connection.execute(
+                "UPDATE geocoder_lease SET owner = ?, expires_at = ? WHERE id = 1 AND (owner = ? OR expires_at < ?)",
+                (self._owner, now + LEASE_SECONDS, self._owner, now)
+            )
+        return renewed.rowcount == 1
+
+    def _geocode_next(self, connection: sqlite3.Connection, geocoder):
+        """Geocode the oldest queued pair and store the answer"""
+        row = connection.execute(
+            "SELECT postcode, city_key, city FROM geocode_queue ORDER BY queued_at LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return
+        postcode, city_key, city = row
+        try:
+            location = geocoder.geocode(f"{postcode} {city}", country_codes="de", timeout=5)
+            coordinates = (location.latitude, location.longitude) if location else (None, None)
+            self.put_many([(postcode, city, *coordinates)], source="geocoder")
+        except Exception as e:
+            # Not stored, so the pair is retried when it is requested again
+            logger.warning(f"Geocoding {postcode} {city} failed: {e}")
+        with connection:
+            connection.execute("DELETE FROM geocode_queue WHERE postcode = ? AND city_key = ?", (postcode, city_key))
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,132 @@
+"""
+Location input resolver for the PostgreSQL search path
+
+Classifies the free-text location field once and turns it into a single
+sargable predicate, instead of `city ILIKE '%loc%' OR postal_code LIKE 'loc%'`
+(leading wildcard + OR = sequential scan):
+
+    "10115", "10115 Berlin"  → postcode        postal_code = '10115'
+    "101"                    → postcode prefix postal_code BETWEEN '10100' AND '10199'
+    "München", "Muenchen"    → city            city_key = 'munchen'
+    "Ber"                    → city prefix     city_key LIKE 'ber%'
+    "standort"               → current position (coordinates carry the filter)
+    "!!!"                    → no filter (nothing left to match on)
+
+Whether a word is a known city is looked up with the same index and cached
+per process. There is no district kind: the importer stores the KGS code in
+`district`, not a place name.
+"""
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session
+
+from app.database import Business
+from app.services.normalization import normalize_key
+
+POSTCODE = "postcode"
+POSTCODE_PREFIX = "postcode_prefix"
+CITY = "city"
+CITY_PREFIX = "city_prefix"
+STANDORT = "standort"
+
+POSTCODE_LENGTH = 5
+_POSTCODE_RE = re.compile(r"^(\d{5})(?:\s|,|$)")
+_PREFIX_RE = re.compile(r"^\d{1,4}$")
+
+
+@dataclass
+class ResolvedLocation:
+    """Classified location input"""
+    kind: str
+    value: str
+
+    def predicate(self):
+        """SQLAlchemy filter for this location (None for standort)"""
+        if self.kind == POSTCODE:
+            return Business.postal_code == self.value
+        if self.kind == POSTCODE_PREFIX:
+            padding = POSTCODE_LENGTH - len(self.value)
+            return Business.postal_code.between(self.value + "0" * padding, self.value + "9" * padding)
+        if self.kind == CITY:
+            return Business.city_key == self.value
+        if self.kind == CITY_PREFIX:
+            return Business.city_key.like(_escape_like(self.value) + "%", escape="\\")
+        return None
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def normalize_location(location: str) -> str:
+    """Lowercase and collapse whitespace"""
+    return " ".join(location.lower().split())
+
+
+class _PlaceCache:
+    """Small TTL cache of known city names"""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            return None
+        return entry[0]
+
+    def put(self, key, kind: str):
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._entries.clear()
+            self._entries[key] = (kind, time.monotonic())
+
+
+_place_cache = _PlaceCache()
+
+
+class LocationResolver:
+    """Turn the location search field into an indexed predicate"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def resolve(self, location: Optional[str]) -> Optional[ResolvedLocation]:
+        if not location or not location.strip():
+            return None
+
+        value = normalize_location(location)
+        if value == STANDORT:
+            return ResolvedLocation(STANDORT, value)
+
+        # "10115" or "10115 Berlin": the postcode alone is the most selective
+        match = _POSTCODE_RE.match(value)
+        if match:
+            return ResolvedLocation(POSTCODE, match.group(1))
+        if _PREFIX_RE.match(value):
+            return ResolvedLocation(POSTCODE_PREFIX, value)
+
+        key = normalize_key(value)
+        if not key:
+            # Only punctuation: an empty prefix would match every row
+            return None
+        return ResolvedLocation(self._place_kind(key), key)
+
+    def _place_kind(self, key: str) -> str:
+        kind = _place_cache.get(key)
+        if kind is None:
+            kind = CITY if self._exists(Business.city_key == key) else CITY_PREFIX
+            _place_cache.put(key, kind)
+        return kind
+
+    def _exists(self, predicate) -> bool:
+        return self.db.execute(select(exists().where(predicate))).scalar()
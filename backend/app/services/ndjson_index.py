@@ -0,0 +1,237 @@
+"""
+Byte-offset index for NDJSON data files
+
+A sidecar file (<data file>.idx) maps each record's `_id` to the byte offset
+and length of its line. It is an open-addressing hash table stored as three
+flat arrays and read through mmap, so a lookup is one hash probe plus one
+slice of the memory-mapped data file - independent of the file size.
+
+Layout (little endian):
+    header   magic(8) data_size(Q) data_mtime_ns(Q) slots(Q) entries(Q)
+    hashes   slots × Q   64-bit id hash, 0 = empty slot
+    offsets  slots × Q   byte offset of the line
+    lengths  slots × I   line length in bytes
+
+The header records the data file's size and mtime; the index is rebuilt
+automatically when either changes. Hash collisions are resolved by probing
+on and comparing the record's `_id`.
+
+A build scans the whole data file, so lookups never wait for one: a missing
+or stale index starts a build in a background thread and the lookup raises
+IndexNotReadyError until it is done. prepare() builds and maps in the
+calling thread (startup warmup, scripts).
+
+Only one process builds: the build runs under an exclusive lock on
+<index file>.lock (build_lock), and a worker that gets the lock after
+another one finished finds the index current and just maps it.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process build lock
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GSNDIDX1"
+HEADER = struct.Struct("<8sQQQQ")
+
+
+class IndexNotReadyError(RuntimeError):
+    """The sidecar file is being (re)built; try again shortly"""
+
+
+@contextmanager
+def build_lock(path: str):
+    """Hold an exclusive lock on <path>.lock, shared by all worker processes"""
+    with open(f"{path}.lock", "ab") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _hash_id(business_id: str) -> int:
+    value = int.from_bytes(hashlib.blake2b(business_id.encode("utf-8"), digest_size=8).digest(), "little")
+    return value or 1  # 0 marks an empty slot
+
+
+class NDJSONOffsetIndex:
+    """`_id` → record lookups in an NDJSON file via a memory-mapped sidecar index"""
+
+    def __init__(self, data_file: str, index_file: Optional[str] = None):
+        self.data_file = data_file
+        self.index_file = index_file or f"{data_file}.idx"
+        self._lock = threading.Lock()
+        self._builder: Optional[threading.Thread] = None
+        # (index mmap, data mmap, slots, data file stat), swapped as one reference
+        # so a rebuild never pulls the maps out from under a running lookup
+        self._state: Optional[tuple] = None
+
+    # Lookups
+
+    def get_raw(self, business_id: str) -> Optional[bytes]:
+        """The record's line as bytes, or None if the id is unknown"""
+        index, data, slots, _ = self._ensure_current()
+
+        # The index stores ids as strings, whatever type `_id` has in the file
+        business_id = str(business_id)
+        key = _hash_id(business_id)
+        hashes_base = HEADER.size
+        offsets_base = hashes_base + slots * 8
+        lengths_base = offsets_base + slots * 8
+        slot = key & (slots - 1)
+        while True:
+            (stored,) = struct.unpack_from("<Q", index, hashes_base + slot * 8)
+            if stored == 0:
+                return None
+            if stored == key:
+                (offset,) = struct.unpack_from("<Q", index, offsets_base + slot * 8)
+                (length,) = struct.unpack_from("<I", index, lengths_base + slot * 4)
+                line = data[offset:offset + length]
+                if str(json.loads(line).get("_id")) == business_id:
+                    return line
+            slot = (slot + 1) & (slots - 1)
+
+    def get(self, business_id: str) -> Optional[dict]:
+        """The parsed record, or None if the id is unknown"""
+        line = self.get_raw(business_id)
+        return json.loads(line) if line is not None else None
+
+    def __len__(self) -> int:
+        index = self._ensure_current()[0]
+        return HEADER.unpack_from(index, 0)[4]
+
+    # Building and loading
+
+    def _data_stat(self) -> Tuple[int, int]:
+        stat = os.stat(self.data_file)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _ensure_current(self) -> tuple:
+        stat = self._data_stat()
+        state = self._state
+        if state is not None and state[3] == stat:
+            return state
+        # Only held to open the maps, never for a build
+        with self._lock:
+            if self._state is None or self._state[3] != stat:
+                if not self._index_matches(stat):
+                    self._start_build()
+                    raise IndexNotReadyError(f"Offset index is being built: {self.index_file}")
+                self._state = self._open(stat)
+            return self._state
+
+    def _start_build(self):
+        if self._builder is None or not self._builder.is_alive():
+            self._builder = threading.Thread(target=self._build_logged, name="ndjson-index-build", daemon=True)
+            self._builder.start()
+
+    def _build_logged(self):
+        try:
+            with build_lock(self.index_file):
+                # Another worker may have built it while this one waited
+                if not self._index_matches(self._data_stat()):
+                    self.build()
+        except Exception as e:
+            logger.error(f"Building the offset index failed: {e}")
+
+    def prepare(self):
+        """Build the index if needed and map it, blocking (not for the request path)"""
+        try:
+            self._ensure_current()
+        except IndexNotReadyError:
+            self._builder.join()
+            self._ensure_current()
+
+    def _index_matches(self, stat: Tuple[int, int]) -> bool:
+        try:
+            with open(self.index_file, "rb") as f:
+                magic, size, mtime_ns, _, _ = HEADER.unpack(f.read(HEADER.size))
+        except (OSError, struct.error):
+            return False
+        return magic == MAGIC and (size, mtime_ns) == stat
+
+    def _open(self, stat: Tuple[int, int]) -> tuple:
+        # Previous maps are released once no lookup references them any more
+        with open(self.index_file, "rb") as f:
+            index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = None
+        if stat[0]:
+            with open(self.data_file, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return index, data, HEADER.unpack_from(index, 0)[3], stat
+
+    def _scan(self) -> Iterator[Tuple[str, int, int]]:
+        """(id, offset, length) of every parseable line"""
+        offset = 0
+        with open(self.data_file, "rb") as f:
+            for line in f:
+                try:
+                    business_id = json.loads(line).get("_id")
+                except ValueError:
+                    business_id = None
+                if business_id:
+                    yield str(business_id), offset, len(line)
+                offset += len(line)
+
+    def build(self):
+        """Scan the data file and write a fresh index (atomically replaced)"""
+        stat = self._data_stat()
+        # Compact columns (20 bytes per record) until the table size is known
+        keys, entry_offsets, entry_lengths = array("Q"), array("Q"), array("I")
+        for business_id, offset, length in self._scan():
+            keys.append(_hash_id(business_id))
+            entry_offsets.append(offset)
+            entry_lengths.append(length)
+        entries = len(keys)
+        logger.info(f"Building NDJSON offset index for {entries} records: {self.index_file}")
+
+        # Power of two with load factor <= 0.5
+        slots = 1
+        while slots < max(2, entries * 2):
+            slots *= 2
+        hashes = array("Q", bytes(8 * slots))
+        offsets = array("Q", bytes(8 * slots))
+        lengths = array("I", bytes(4 * slots))
+
+        for key, offset, length in zip(keys, entry_offsets, entry_lengths):
+            slot = key & (slots - 1)
+            while hashes[slot]:
+                slot = (slot + 1) & (slots - 1)
+            hashes[slot] = key
+            offsets[slot] = offset
+            lengths[slot] = length
+
+        # Unique temp file: several workers may rebuild at the same time
+        fd, temp_file = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self.index_file)),
+            prefix=f"{os.path.basename(self.index_file)}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(HEADER.pack(MAGIC, stat[0], stat[1], slots, entries))
+                for column in (hashes, offsets, lengths):
+                    if sys.byteorder == "big":
+                        column.byteswap()
+                    f.write(column.tobytes())
+            os.replace(temp_file, self.index_file)
+        except BaseException:
+            os.unlink(temp_file)
+            raise
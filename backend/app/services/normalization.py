@@ -0,0 +1,51 @@
+"""
+Search key normalization shared by data and queries
+
+The same function builds the stored name_key/city_key/street_key columns,
+the Elasticsearch *_key fields and the search-side values compared against
+them, so "München", "Muenchen" and "munchen" all become "munchen":
+
+1. lowercase; ä/ö/ü → a/o/u, ß → ss, other diacritics dropped (é → e)
+2. transcribed umlauts folded too: ae/oe/ue → a/o/u
+3. punctuation → space, whitespace collapsed
+
+Step 2 also folds a few genuine vowel pairs ("Michael" → "michal"), which
+is harmless because both sides of every comparison are folded the same way.
+"""
+
+import re
+import unicodedata
+from typing import Dict, Optional
+
+_UMLAUTS = str.maketrans({"ä": "a", "ö": "o", "ü": "u", "ß": "ss"})
+_TRANSCRIBED = re.compile(r"([aou])e")
+_NON_WORD = re.compile(r"[\W_]+")
+_STRASSE = re.compile(r"(strasse|str)\b")
+
+
+def normalize_key(value: Optional[str]) -> Optional[str]:
+    """Folded search key for a name, city or free-text query (None stays None)"""
+    if value is None:
+        return None
+    value = value.lower().translate(_UMLAUTS)
+    # Drop remaining combining marks (é, è, ç, ...)
+    value = "".join(c for c in unicodedata.normalize("NFKD", value) if not unicodedata.combining(c))
+    value = _TRANSCRIBED.sub(r"\1", value)
+    return " ".join(_NON_WORD.sub(" ", value).split())
+
+
+def normalize_street(value: Optional[str]) -> Optional[str]:
+    """Street key: like normalize_key, with "Straße"/"Str." folded to "str" """
+    key = normalize_key(value)
+    if key is None:
+        return None
+    return _STRASSE.sub("str", key)
+
+
+def search_keys(name: Optional[str], city: Optional[str], street: Optional[str]) -> Dict[str, Optional[str]]:
+    """Key column values for a business row"""
+    return {
+        "name_key": normalize_key(name),
+        "city_key": normalize_key(city),
+        "street_key": normalize_street(street)
+    }
@@ -0,0 +1,80 @@
+"""
+Blended relevance ranking shared by the Elasticsearch and PostgreSQL search
+
+    score = text * (1 + DISTANCE_WEIGHT * gauss(distance) + COMPLETENESS_WEIGHT * completeness)
+
+- text:         keyword relevance (ES _score, pg_trgm similarity in PostgreSQL);
+                1 when there is no keyword
+- gauss:        1 within OFFSET of the user, DECAY at OFFSET + SCALE, ~0 far away
+- completeness: share of phone/website present
+
+Multiplying keeps a poor text match from winning on proximity alone, while
+a good match around the corner beats a perfect match 49 km away.
+"""
+
+import math
+from typing import Any, Dict, Optional
+
+from app.config import settings
+
+
+def gauss_decay(distance_km: Optional[float]) -> float:
+    """Gaussian distance decay, same curve as Elasticsearch's `gauss` function"""
+    if distance_km is None:
+        return 0.0
+    scale = settings.RANKING_DECAY_SCALE_KM
+    sigma_squared = -scale ** 2 / (2 * math.log(settings.RANKING_DECAY))
+    distance = max(0.0, distance_km - settings.RANKING_DECAY_OFFSET_KM)
+    return math.exp(-distance ** 2 / (2 * sigma_squared))
+
+
+def completeness(phone: Optional[str], website: Optional[str]) -> float:
+    """Share of the optional contact fields that are filled in"""
+    return (bool(phone) + bool(website)) / 2
+
+
+def blended_score(
+    text_score: float,
+    distance_km: Optional[float],
+    phone: Optional[str],
+    website: Optional[str]
+) -> float:
+    """Final ranking score for one candidate (PostgreSQL re-rank)"""
+    boost = 1 + settings.RANKING_COMPLETENESS_WEIGHT * completeness(phone, website)
+    if distance_km is not None:
+        boost += settings.RANKING_DISTANCE_WEIGHT * gauss_decay(distance_km)
+    return (text_score or 0.0) * boost
+
+
+def es_function_score(query: Dict[str, Any], lat: Optional[float], lon: Optional[float]) -> Dict[str, Any]:
+    """Wrap an Elasticsearch query so its _score is the blended score"""
+    # score_mode=sum adds up the boost terms, boost_mode=multiply applies them to _score
+    functions = [{"weight": 1}]
+    if lat and lon:
+        functions.append({
+            # Decay functions score documents without the field as 1, so restrict it
+            "filter": {"exists": {"field": "location"}},
+            "gauss": {
+                "location": {
+                    "origin": {"lat": lat, "lon": lon},
+                    "scale": f"{settings.RANKING_DECAY_SCALE_KM}km",
+                    "offset": f"{settings.RANKING_DECAY_OFFSET_KM}km",
+                    "decay": settings.RANKING_DECAY
+                }
+            },
+            "weight": settings.RANKING_DISTANCE_WEIGHT
+        })
+    for field in ("phone", "website"):
+        functions.append({
+            "filter": {"exists": {"field": field}},
+            "weight": settings.RANKING_COMPLETENESS_WEIGHT / 2
+        })
+
+    return {
+        "function_score": {
+            "query": query,
+            "functions": functions,
+            "score_mode": "sum",
+            "boost_mode": "multiply"
+        }
+    }
@@ -5,13 +5,28 @@ Replaces the basic NDJSON file-based search
 
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy import func, or_, literal, cast, String
+from sqlalchemy.dialects.postgresql import JSONB, array
 from geoalchemy2.functions import ST_DWithin, ST_GeogFromText, ST_Distance
-from app.database import Business
+from starlette.concurrency import run_in_threadpool
+from app.database import Business, replica_router
+from app.config import settings
+from app.metrics import metrics
+from app.services.ranking import blended_score
+from app.services.location_resolver import LocationResolver, STANDORT
+from app.services.branch_resolver import branch_resolver
+from app.services.normalization import normalize_key
+from app.services.spelling import spelling_service
+import asyncio
+import hashlib
 import json
 import math
-from app.elasticsearch_client import search_businesses_es, autocomplete_location
-from app.models.business import BusinessSearchResult
+import time
+from elasticsearch import ApiError
+from app.elasticsearch_client import (
+    search_businesses_es, autocomplete_location, es_breaker, is_availability_error, decode_cursor
+)
+from app.serialization import SearchHit
 
 
 def clean_street_address(street_address: str) -> str:
@@ -61,6 +76,36 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return round(distance, 1)  # Round to 1 decimal place
 
 
+def hedge_delay() -> float:
+    """
+    Seconds to wait for Elasticsearch before hedging to PostgreSQL
+    
+    Uses the configured percentile of recent ES latencies, clamped to the
+    min/max delay; the max applies until enough samples are collected.
+    """
+    max_delay = settings.SEARCH_HEDGE_MAX_DELAY_MS / 1000
+    observed = metrics.latency("search.elasticsearch").percentile(
+        settings.SEARCH_HEDGE_PERCENTILE, settings.SEARCH_HEDGE_MIN_SAMPLES
+    )
+    if observed is None:
+        return max_delay
+    return min(max_delay, max(settings.SEARCH_HEDGE_MIN_DELAY_MS / 1000, observed))
+
+
+class CursorMismatchError(ValueError):
+    """The cursor was issued for a different query or sort"""
+
+
+class CursorUnavailableError(RuntimeError):
+    """Elasticsearch cannot continue the cursor right now (PostgreSQL cannot page by cursor)"""
+
+
+def cursor_key(**request) -> str:
+    """Fingerprint of the request parameters a cursor belongs to"""
+    payload = json.dumps(request, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
 class SearchServiceV2:
     """Advanced search service with PostgreSQL + Elasticsearch"""
     
@@ -68,7 +113,7 @@ class SearchServiceV2:
         self.db = db
         self.use_elasticsearch = use_elasticsearch
     
-    def search_businesses(
+    async def search_businesses(
         self,
         keyword: Optional[str] = None,
         location: Optional[str] = None,
@@ -77,8 +122,9 @@ class SearchServiceV2:
         radius_km: float = 50,
         page: int = 1,
         page_size: int = 20,
-        sort_by: str = "relevance"  # relevance, distance, rating, name
-    ) -> tuple[List[BusinessSearchResult], int]:
+        sort_by: str = "relevance",  # relevance, distance, rating, name
+        cursor: Optional[str] = None
+    ) -> tuple[List[SearchHit], int, Dict[str, Any]]:
         """
         Search businesses with advanced features
         
@@ -86,100 +132,351 @@ class SearchServiceV2:
             keyword: Search term (business name, category)
             location: City or postcode
             lat/lon: Coordinates for geo-search
-            radius_km: Search radius in kilometers
+            radius_km: Maximum search radius in kilometers; with coordinates the
+                       search starts smaller and widens until the page is full
             page: Page number
             page_size: Results per page
             sort_by: Sort criteria
+            cursor: next_cursor of the previous page, for the same parameters
+                    (Elasticsearch only)
         
         Returns:
-            Tuple of (results, total_count)
+            Tuple of (results, total_count, meta) where meta holds
+            `total_exact`, `next_cursor`, `effective_radius_km`, `did_you_mean`
+            and `query_corrected` (results are for did_you_mean)
+        
+        Raises:
+            CursorMismatchError: The cursor belongs to a different query or sort
+            CursorUnavailableError: Elasticsearch cannot serve the cursor now
         """
+        # Cursors are bound to the request they were issued for; serving one
+        # for another query would page through a different result set
+        context = {"q": cursor_key(
+            keyword=keyword, location=location, lat=lat, lon=lon,
+            radius_km=radius_km, sort_by=sort_by, page_size=page_size
+        )}
+        position = (decode_cursor(cursor).get("ctx") or {}) if cursor else {}
+        if cursor and position.get("q") != context["q"]:
+            raise CursorMismatchError("Cursor belongs to a different query or sort; start again from page 1")
+        
+        # Typos: the query runs as typed, and the spelling suggestion is only
+        # searched instead when that finds nothing at all - a rare surname or
+        # small town missing from the capped vocabulary is not a typo.
+        # Otherwise the suggestion is just a did_you_mean hint. A cursor
+        # carries the corrected query its first page ran.
+        suggestion = None
+        corrected = "keyword" in position
+        if corrected:
+            keyword, location = position["keyword"], position["location"]
+            context = dict(context, keyword=keyword, location=location)
+            suggestion = (keyword, location)
+        elif settings.SPELLING_ENABLED and not cursor:
+            suggestion = self._spelling_suggestion(keyword, location)
+        
+        # Near-me searches start with a small radius and widen only while the
+        # first page is not full, so dense areas never touch 50 km of rows.
+        # Later pages must stay on that result set: a cursor carries the
+        # radius, and offset pages use `radius_km` as sent (the client passes
+        # page 1's effective_radius_km back).
+        radii = [radius_km]
+        if cursor:
+            radii = [position.get("radius_km", radius_km)]
+        elif lat and lon and page == 1:
+            radii = [step for step in settings.SEARCH_RADIUS_STEPS_KM if step < radius_km] + [radius_km]
+        
+        query = self._query(keyword, location, lat, lon, page, page_size, sort_by)
+        results, total, meta, radius = await self._search_radii(query, radii, cursor, context)
+        
+        # An empty page 1 means no hits at all; a later empty page may just be past the end
+        if suggestion and not corrected and not results and (page == 1 or not await self._has_hits(query, context)):
+            corrected_keyword, corrected_location = suggestion
+            query = self._query(corrected_keyword, corrected_location, lat, lon, page, page_size, sort_by)
+            context = dict(context, keyword=corrected_keyword, location=corrected_location)
+            results, total, meta, radius = await self._search_radii(query, radii, cursor, context)
+            corrected = True
+        
+        meta["effective_radius_km"] = radius if lat and lon else None
+        meta["did_you_mean"] = " ".join(filter(None, suggestion)) if suggestion else None
+        meta["query_corrected"] = corrected
+        return results, total, meta
+    
+    def _spelling_suggestion(self, keyword: Optional[str], location: Optional[str]) -> Optional[tuple]:
+        """(keyword, location) with typos fixed against the data vocabulary; None if nothing changed"""
+        corrected_keyword = spelling_service.correct(keyword)
+        corrected_location = spelling_service.correct(location) if location and location.lower() != STANDORT else location
+        if corrected_keyword == keyword and corrected_location == location:
+            return None
+        return corrected_keyword, corrected_location
+    
+    def _query(self, keyword, location, lat, lon, page, page_size, sort_by) -> Dict[str, Any]:
+        return dict(
+            keyword=keyword,
+            location=location,
+            lat=lat,
+            lon=lon,
+            radius_km=None,  # set per radius step
+            page=page,
+            page_size=page_size,
+            sort_by=sort_by,
+            # Category-like keywords ("zahnarzt") become a branch filter
+            branch_ids=branch_resolver.resolve(keyword)
+        )
+    
+    async def _search_radii(self, query: Dict[str, Any], radii: List[float], cursor: Optional[str], context: Dict[str, Any]):
+        """Search each radius in turn until one fills the page; (results, total, meta, radius)"""
+        page_size = query["page_size"]
+        for radius in radii:
+            query["radius_km"] = radius
+            # A step that does not fill the page is discarded, so it skips the count
+            min_results = page_size if radius != radii[-1] else 0
+            results, total, meta = await self._search(query, cursor, dict(context, radius_km=radius), min_results)
+            if len(results) >= page_size:
+                break
+            if radius != radii[-1]:
+                metrics.increment("search.radius_expansions")
+        return results, total, meta, radius
+    
+    async def _has_hits(self, query: Dict[str, Any], context: Dict[str, Any]) -> bool:
+        results, _, _ = await self._search(dict(query, page=1, page_size=1), None, context)
+        return bool(results)
+    
+    async def _search(self, query: Dict[str, Any], cursor: Optional[str], context: Dict[str, Any], min_results: int = 0):
+        """One search with fixed parameters on the best available backend"""
+        if cursor:
+            return await self._continue_cursor(query, cursor, context)
         
-        # Use Elasticsearch if available and enabled
-        if self.use_elasticsearch:
+        # Use Elasticsearch if enabled and its circuit breaker is not open
+        if self.use_elasticsearch and es_breaker.allow_request():
+            if settings.SEARCH_HEDGING_ENABLED:
+                return await self._hedged_search(query, context, min_results)
             try:
-                es_results = search_businesses_es(
-                    keyword=keyword,
-                    location=location,
-                    lat=lat,
-                    lon=lon,
-                    radius_km=radius_km,
-                    page=page,
-                    page_size=page_size
-                )
-                
-                # Convert to BusinessSearchResult
-                results = []
-                for business in es_results['results']:
-                    # Build full address with street
-                    address_parts = []
-                    if business.get('street'):
-                        address_parts.append(business['street'])
-                    if business.get('postcode'):
-                        address_parts.append(business['postcode'])
-                    if business.get('city'):
-                        address_parts.append(business['city'])
-                    
-                    full_address = ", ".join(filter(None, address_parts)) if address_parts else ""
-                    
-                    # Calculate distance if search center coordinates are provided
-                    business_lat = business.get('location', {}).get('lat')
-                    business_lon = business.get('location', {}).get('lon')
-                    distance_km = None
-                    if lat and lon and business_lat and business_lon:
-                        distance_km = haversine_distance(lat, lon, business_lat, business_lon)
-                    
-                    result = BusinessSearchResult(
-                        id=business['id'],
-                        name=business['name'],
-                        address=full_address,
-                        city=business['city'],
-                        postcode=business['postcode'],
-                        phone=business.get('phone'),
-                        website=business.get('website'),
-                        branches=business.get('branch_ids', []),
-                        lat=business_lat,
-                        lon=business_lon,
-                        distance_km=distance_km
-                    )
-                    results.append(result)
-                
-                return results, es_results['total']
-            
+                return await self._search_elasticsearch(cursor_context=context, **query)
             except Exception as e:
-                # Silently fall back to PostgreSQL if Elasticsearch is unavailable
-                # Connection errors are expected if Elasticsearch is not running, so we don't log them
-                error_type = type(e).__name__
-                if "Connection" not in error_type and "NewConnectionError" not in str(e):
-                    print(f"Elasticsearch search failed, falling back to PostgreSQL: {e}")
+                self._record_es_failure(e)
                 # Fall through to PostgreSQL search
         
         # PostgreSQL search (fallback or if ES disabled)
-        query = self.db.query(Business)
+        return self._search_postgres(self.db, min_results=min_results, **query)
+    
+    async def _continue_cursor(self, query: Dict[str, Any], cursor: str, context: Dict[str, Any]):
+        """
+        Next page of a cursor, from Elasticsearch only
         
-        # Keyword filter (fuzzy match with trigram similarity)
-        if keyword:
-            keyword_lower = f"%{keyword.lower()}%"
+        PostgreSQL has no cursor paging and would silently serve page 1
+        again, so a failure here is an error instead of a fallback.
+        """
+        if not (self.use_elasticsearch and es_breaker.allow_request()):
+            raise CursorUnavailableError("Search is temporarily degraded; start again from page 1")
+        try:
+            return await self._search_elasticsearch(cursor=cursor, cursor_context=context, **query)
+        except Exception as e:
+            if is_availability_error(e):
+                es_breaker.record_failure(e)
+            elif isinstance(e, ApiError) and e.meta.status == 400:
+                # search_after values that do not fit the query's sort
+                raise CursorMismatchError(f"Cursor does not match the query: {e}") from e
+            raise CursorUnavailableError(f"Cursor could not be continued: {e}") from e
+    
+    async def _hedged_search(self, query: Dict[str, Any], context: Dict[str, Any], min_results: int = 0):
+        """
+        Ask Elasticsearch; if it is slower than usual, also ask PostgreSQL
+        
+        The first successful answer wins and the other request is cancelled
+        (the asyncio task for ES, a server-side cancel for PostgreSQL).
+        """
+        metrics.increment("search.hedge.requests")
+        started = time.monotonic()
+        primary = asyncio.ensure_future(self._search_elasticsearch(cursor_context=context, **query))
+        
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay())
+        if done:
+            try:
+                return primary.result()
+            except Exception as e:
+                # ES failed before the hedge was due - plain fallback
+                self._record_es_failure(e)
+                return self._search_postgres(self.db, min_results=min_results, **query)
+        
+        metrics.increment("search.hedge.fired")
+        handle: Dict[str, Any] = {}
+        secondary = asyncio.ensure_future(
+            run_in_threadpool(self._search_postgres_isolated, handle, query, min_results)
+        )
+        
+        pending = {primary, secondary}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # On a tie prefer ES, whose relevance ranking is better
+                for task in sorted(done, key=lambda t: t is not primary):
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        if task is primary:
+                            self._record_es_failure(e)
+                        error = e
+                        continue
+                    winner = "primary" if task is primary else "secondary"
+                    metrics.increment(f"search.hedge.{winner}_wins")
+                    return result
+            raise error
+        finally:
+            if primary in pending:
+                primary.cancel()
+                # Keep the slow tail in the latency window, or the hedge delay drifts down
+                metrics.observe("search.elasticsearch", time.monotonic() - started)
+            if secondary in pending:
+                secondary.cancel()
+                connection = handle.get("connection")
+                if connection is not None:
+                    asyncio.get_running_loop().run_in_executor(None, connection.cancel)
+    
+    def _record_es_failure(self, e: Exception):
+        # Availability errors count towards the breaker, so a slow or dead
+        # cluster stops costing every request its timeout
+        if is_availability_error(e):
+            es_breaker.record_failure(e)
+        else:
+            print(f"Elasticsearch search failed, falling back to PostgreSQL: {e}")
+    
+    async def _search_elasticsearch(
+        self,
+        keyword: Optional[str],
+        location: Optional[str],
+        lat: Optional[float],
+        lon: Optional[float],
+        radius_km: float,
+        page: int,
+        page_size: int,
+        sort_by: str,
+        branch_ids: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        cursor_context: Optional[Dict[str, Any]] = None
+    ) -> tuple[List[SearchHit], int, Dict[str, Any]]:
+        """Search the Elasticsearch index; raises on any failure"""
+        started = time.monotonic()
+        es_results = await search_businesses_es(
+            keyword=keyword,
+            location=location,
+            lat=lat,
+            lon=lon,
+            radius_km=radius_km,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            sort_by=sort_by,
+            branch_ids=branch_ids,
+            cursor_context=cursor_context
+        )
+        metrics.observe("search.elasticsearch", time.monotonic() - started)
+        es_breaker.record_success()
+        
+        # Convert to SearchHit
+        results = []
+        for business in es_results['results']:
+            # Build full address with street
+            address_parts = []
+            if business.get('street'):
+                address_parts.append(business['street'])
+            if business.get('postcode'):
+                address_parts.append(business['postcode'])
+            if business.get('city'):
+                address_parts.append(business['city'])
+            
+            full_address = ", ".join(filter(None, address_parts)) if address_parts else ""
+            
+            # Calculate distance if search center coordinates are provided
+            business_lat = business.get('location', {}).get('lat')
+            business_lon = business.get('location', {}).get('lon')
+            distance_km = None
+            if lat and lon and business_lat and business_lon:
+                distance_km = haversine_distance(lat, lon, business_lat, business_lon)
+            
+            result = SearchHit(
+                id=business['id'],
+                name=business['name'],
+                address=full_address,
+                city=business['city'],
+                postcode=business['postcode'],
+                phone=business.get('phone'),
+                website=business.get('website'),
+                branches=business.get('branch_ids', []),
+                lat=business_lat,
+                lon=business_lon,
+                distance_km=distance_km
+            )
+            results.append(result)
+        
+        meta = {"total_exact": es_results['total_exact'], "next_cursor": es_results['next_cursor']}
+        return results, es_results['total'], meta
+    
+    def _search_postgres_isolated(self, handle: Dict[str, Any], query: Dict[str, Any], min_results: int = 0):
+        """
+        PostgreSQL search on its own session, for use from a worker thread
+        
+        The request session is not shared across threads, and a hedge that
+        loses may still be running after the request finished. The raw
+        connection is published in `handle` so the caller can cancel it.
+        """
+        db = replica_router.session()
+        try:
+            handle["connection"] = db.connection().connection.dbapi_connection
+            return self._search_postgres(db, min_results=min_results, **query)
+        finally:
+            db.close()
+    
+    def _search_postgres(
+        self,
+        db: Session,
+        keyword: Optional[str],
+        location: Optional[str],
+        lat: Optional[float],
+        lon: Optional[float],
+        radius_km: float,
+        page: int,
+        page_size: int,
+        sort_by: str,
+        branch_ids: Optional[List[str]] = None,
+        min_results: int = 0
+    ) -> tuple[List[SearchHit], int, Dict[str, Any]]:
+        """
+        Search PostgreSQL directly
+        
+        With fewer than `min_results` hits the total is not counted (None):
+        the caller discards the result and widens the radius.
+        """
+        started = time.monotonic()
+        query = db.query(Business)
+        
+        # Branch filter via the GIN index on categories::jsonb
+        if branch_ids:
             query = query.filter(
-                or_(
-                    Business.name.ilike(keyword_lower),
-                    Business.city.ilike(keyword_lower)
-                )
+                cast(Business.categories, JSONB).op("?|")(array(branch_ids, type_=String))
             )
+            # Every match is a full category match, not a partial name hit
+            keyword = None
         
-        # Location filter (skip if location is "standort" and we have coordinates)
-        # "standort" is a placeholder for geolocation-based search
-        if location and location.lower() != "standort":
-            location_lower = f"%{location.lower()}%"
+        # Keyword filter on the folded keys ("muenchen" finds "München"),
+        # served by their trigram indexes
+        if keyword:
+            keyword = normalize_key(keyword)
+            keyword_pattern = f"%{keyword}%"
             query = query.filter(
                 or_(
-                    Business.city.ilike(location_lower),
-                    Business.postal_code.like(f"{location}%")
+                    Business.name_key.like(keyword_pattern),
+                    Business.city_key.like(keyword_pattern)
                 )
             )
+        
+        # Location filter: one indexed predicate chosen by the resolver
+        # "standort" is a placeholder for geolocation-based search
+        resolved = LocationResolver(db).resolve(location)
+        if resolved is not None and resolved.kind != STANDORT:
+            query = query.filter(resolved.predicate())
         # If location is "standort" but no coordinates provided, return empty results
-        elif location and location.lower() == "standort" and not (lat and lon):
-            return [], 0
+        elif resolved is not None and not (lat and lon):
+            return [], 0, {"total_exact": True, "next_cursor": None}
         
         # Geo-distance filter (if coordinates provided)
         if lat and lon and Business.geometry is not None:
@@ -197,19 +494,24 @@ class SearchServiceV2:
         if sort_by == "name":
             query = query.order_by(Business.name)
         
+        # Pagination
+        if sort_by == "relevance":
+            results = self._rank_candidates(query, keyword, lat, lon, page, page_size)
+        else:
+            results = query.offset((page - 1) * page_size).limit(page_size).all()
+        
         # Get total count (only for first page to avoid expensive COUNT on every request)
         # For subsequent pages, frontend can use the total from page 1
-        if page == 1:
+        if len(results) < min_results:
+            total = None
+        elif page == 1:
             total = query.count()
         else:
             # For page > 1, estimate or return a large number
             # Frontend already has the total from page 1
             total = page * page_size  # Rough estimate
         
-        # Pagination
-        results = query.offset((page - 1) * page_size).limit(page_size).all()
-        
-        # Convert to BusinessSearchResult
+        # Convert to SearchHit
         search_results = []
         for business in results:
             # Use latitude/longitude fields directly (no need to extract from geometry)
@@ -241,7 +543,7 @@ class SearchServiceV2:
             if lat and lon and lat_val and lon_val:
                 distance_km = haversine_distance(lat, lon, lat_val, lon_val)
             
-            result = BusinessSearchResult(
+            result = SearchHit(
                 id=str(business.id),
                 name=business.name,
                 address=full_address,
@@ -256,25 +558,82 @@ class SearchServiceV2:
             )
             search_results.append(result)
         
-        return search_results, total
+        metrics.observe("search.postgresql", time.monotonic() - started)
+        return search_results, total, {"total_exact": page == 1, "next_cursor": None}
+    
+    def _rank_candidates(
+        self,
+        query,
+        keyword: Optional[str],
+        lat: Optional[float],
+        lon: Optional[float],
+        page: int,
+        page_size: int
+    ) -> List[Business]:
+        """
+        Blended relevance ranking over a bounded candidate set
+        
+        `query` already holds the text filter and, with coordinates, the
+        ST_DWithin radius. Candidates are index-ordered scans over it limited
+        to RANKING_CANDIDATES rows each, and only those are scored and
+        sorted, so relevance never needs a full sort of all matches:
+        
+        - keyword: the closest names (pg_trgm distance), plus with
+          coordinates the nearest matches (GiST KNN), so neither a strong
+          text match a few km out nor a decent one around the corner is
+          cut off by the other order
+        - coordinates only: the nearest matches (text scores are all equal)
+        - neither: primary key order, so the page is deterministic
+        """
+        limit = max(settings.RANKING_CANDIDATES, page * page_size)
+        
+        text_score = func.similarity(Business.name_key, keyword) if keyword else literal(1.0)
+        candidates = query.add_columns(text_score.label("text_score"))
+        orders = []
+        if keyword:
+            orders.append(Business.name_key.op("<->")(keyword))
+        if lat and lon:
+            point = func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326)
+            orders.append(Business.geometry.op("<->")(point))
+        if not orders:
+            orders.append(Business.id)
+        
+        scored = []
+        seen = set()
+        for order in orders:
+            for business, score in candidates.order_by(order).limit(limit).all():
+                if business.id in seen:
+                    continue
+                seen.add(business.id)
+                distance_km = None
+                if lat and lon and business.latitude and business.longitude:
+                    distance_km = haversine_distance(lat, lon, business.latitude, business.longitude)
+                scored.append((blended_score(score, distance_km, business.phone, business.website), business))
+        
+        # Stable sort: equal scores keep the scan order (closest name/nearest/id first)
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [business for _, business in scored[(page - 1) * page_size:page * page_size]]
     
     def get_business_by_id(self, business_id: str) -> Optional[Business]:
         """Get business by ID from PostgreSQL"""
         return self.db.query(Business).filter(Business.id == business_id).first()
     
-    def autocomplete_cities(self, prefix: str, limit: int = 10) -> List[str]:
+    async def autocomplete_cities(self, prefix: str, limit: int = 10) -> List[str]:
         """Get city autocomplete suggestions"""
         
         # Try Elasticsearch first
-        if self.use_elasticsearch:
+        if self.use_elasticsearch and es_breaker.allow_request():
             try:
-                return autocomplete_location(prefix, limit)
-            except:
-                pass
+                cities = await autocomplete_location(prefix, limit)
+                es_breaker.record_success()
+                return cities
+            except Exception as e:
+                if is_availability_error(e):
+                    es_breaker.record_failure(e)
         
-        # PostgreSQL fallback
+        # PostgreSQL fallback (prefix range on the city_key index)
         results = self.db.query(Business.city).filter(
-            Business.city.ilike(f"{prefix}%")
+            Business.city_key.like(f"{normalize_key(prefix)}%")
         ).distinct().limit(limit).all()
         
         return [r[0] for r in results]
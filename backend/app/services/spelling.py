@@ -0,0 +1,309 @@
+"""
+Query spelling correction (SymSpell symmetric-delete)
+
+The vocabulary is the set of words that actually occur in the data (business
+names, cities, branch keywords), keyed by their folded form
+(app/services/normalization.py). For every word, all variants with up to
+MAX_EDIT_DISTANCE characters deleted from its prefix are precomputed. A
+lookup only generates the deletes of the query word and intersects them
+with that table, then verifies the few candidates with an edit distance, so
+correcting a word takes microseconds instead of scanning the vocabulary.
+
+"Zahnartz Muenchn" → "zahnarzt münchen", returned as a did-you-mean hint.
+The vocabulary is capped, so a word it does not know may still be correct
+(a rare surname, a small town): the search service only runs the corrected
+query when the query as typed finds nothing.
+
+The vocabulary (words and frequencies) is aggregated once and stored in the
+spelling_vocabulary table; workers only read that table:
+
+- after every import (scripts/import_businesses.py calls refresh_vocabulary)
+- by the API when the businesses/branch_keywords tables changed and then
+  stayed quiet for one check interval (one worker at a time, guarded by an
+  advisory lock)
+
+The aggregation over all names and cities reads from a replica when one is
+healthy; only the result is written to the primary. Each worker loads the
+table in a background thread at startup and again whenever its
+refreshed_at changes.
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import SessionLocal, replica_router
+from app.services.normalization import normalize_key
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+MIN_WORD_LENGTH = 3
+
+# Any constant works; it only has to be the same in every worker
+REFRESH_LOCK_ID = 4912
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance (transpositions count 1); max_distance + 1 if larger"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+            row_min = min(row_min, current[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SymSpell:
+    """Symmetric-delete dictionary over folded words"""
+
+    def __init__(self, max_edit_distance: int = 2, prefix_length: int = 6):
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        self.words: Dict[str, int] = {}  # folded word → frequency
+        self.display: Dict[str, str] = {}  # folded word → most common spelling
+        self.deletes: Dict[str, List[str]] = defaultdict(list)
+
+    def add(self, word: str, count: int, display: str):
+        if word in self.words:
+            self.words[word] += count
+            return
+        self.words[word] = count
+        self.display[word] = display
+        for variant in self._deletes(word[:self.prefix_length]):
+            self.deletes[variant].append(word)
+
+    def _deletes(self, word: str) -> set:
+        """The word and every variant with up to max_edit_distance characters removed"""
+        variants = {word}
+        frontier = {word}
+        for _ in range(self.max_edit_distance):
+            frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+            variants |= frontier
+        return variants
+
+    def lookup(self, word: str) -> Optional[Tuple[str, int]]:
+        """(closest vocabulary word, distance), preferring frequent words; None if nothing is close"""
+        if word in self.words:
+            return word, 0
+        best = None
+        best_key = None
+        seen = set()
+        for variant in self._deletes(word[:self.prefix_length]):
+            for candidate in self.deletes.get(variant, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                distance = edit_distance(word, candidate, self.max_edit_distance)
+                if distance > self.max_edit_distance:
+                    continue
+                key = (distance, -self.words[candidate])
+                if best_key is None or key < best_key:
+                    best, best_key = candidate, key
+        return (best, best_key[0]) if best else None
+
+
+def source_signature(db) -> str:
+    """Write counters of the source tables on the primary; changes after every import"""
+    rows = db.execute(text("""
+        SELECT relname, n_tup_ins + n_tup_upd + n_tup_del
+        FROM pg_stat_user_tables
+        WHERE relname IN ('businesses', 'branch_keywords')
+        ORDER BY relname
+    """)).fetchall()
+    return json.dumps([list(row) for row in rows])
+
+
+def _vocabulary_rows(db) -> List[Tuple[str, int]]:
+    """Raw lowercase words with their frequency, folded when the dictionary is built
+    so the most common spelling ("münchen") is what users see"""
+    rows = db.execute(text("""
+        SELECT word, count(*) AS frequency FROM (
+            SELECT regexp_split_to_table(lower(name), '[^[:alnum:]]+') AS word
+            FROM businesses WHERE is_active
+            UNION ALL
+            SELECT regexp_split_to_table(lower(city), '[^[:alnum:]]+')
+            FROM businesses WHERE is_active
+        ) words
+        WHERE length(word) >= :min_length
+        GROUP BY word
+        HAVING count(*) >= :min_count
+        ORDER BY count(*) DESC
+        LIMIT :max_terms
+    """), {
+        "min_length": MIN_WORD_LENGTH,
+        "min_count": settings.SPELLING_MIN_COUNT,
+        "max_terms": settings.SPELLING_MAX_TERMS
+    }).fetchall()
+    try:
+        rows += db.execute(text("""
+            SELECT word, sum(business_count) FROM (
+                SELECT regexp_split_to_table(keyword, ' ') AS word, business_count FROM branch_keywords
+            ) words
+            WHERE length(word) >= :min_length
+            GROUP BY word
+        """), {"min_length": MIN_WORD_LENGTH}).fetchall()
+    except Exception:
+        db.rollback()  # branch_keywords not created yet
+    return rows
+
+
+def refresh_vocabulary(wait: bool = True) -> bool:
+    """Recompute spelling_vocabulary; False if another refresh holds the lock"""
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        lock = "pg_advisory_xact_lock" if wait else "pg_try_advisory_xact_lock"
+        if not db.execute(text(f"SELECT {lock}(:id)"), {"id": REFRESH_LOCK_ID}).scalar() and not wait:
+            db.commit()
+            return False
+        signature = source_signature(db)
+        reader = replica_router.session()
+        try:
+            rows = _vocabulary_rows(reader)
+        finally:
+            reader.close()
+        frequencies: Dict[str, int] = defaultdict(int)
+        for word, frequency in rows:
+            frequencies[word] += int(frequency)
+        db.execute(text("DELETE FROM spelling_vocabulary"))
+        if frequencies:
+            db.execute(
+                text("INSERT INTO spelling_vocabulary (word, frequency) VALUES (:word, :frequency)"),
+                [{"word": word, "frequency": frequency} for word, frequency in frequencies.items()]
+            )
+        db.execute(text("""
+            INSERT INTO spelling_vocabulary_state (id, source_signature, refreshed_at)
+            VALUES (1, :signature, now())
+            ON CONFLICT (id) DO UPDATE SET
+                source_signature = EXCLUDED.source_signature,
+                refreshed_at = EXCLUDED.refreshed_at
+        """), {"signature": signature})
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    logger.info(f"Spelling vocabulary refreshed: {len(frequencies)} words in {time.monotonic() - started:.1f}s")
+    return True
+
+
+class SpellingService:
+    """Holds the current dictionary, loaded from spelling_vocabulary in the background"""
+
+    def __init__(self):
+        self.dictionary: Optional[SymSpell] = None
+        self.loaded_at = None  # refreshed_at of the loaded vocabulary
+        self.last_signature = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.dictionary is not None
+
+    def correct(self, query: Optional[str]) -> Optional[str]:
+        """Query with misspelled words replaced; unchanged when nothing needs correcting"""
+        dictionary = self.dictionary
+        if not query or dictionary is None:
+            return query
+
+        changed = False
+        parts = []
+        for token in _TOKEN_RE.findall(query):
+            key = normalize_key(token)
+            if len(key) < MIN_WORD_LENGTH or key.isdigit():
+                parts.append(token)
+                continue
+            match = dictionary.lookup(key)
+            if match and match[1] > 0:
+                parts.append(dictionary.display[match[0]])
+                changed = True
+            else:
+                parts.append(token)
+        return " ".join(parts) if changed else query
+
+    # Loading
+
+    def load(self):
+        """Build a dictionary from the stored vocabulary and swap it in"""
+        started = time.monotonic()
+        db = replica_router.session()
+        try:
+            # Same snapshot for both, so loaded_at describes the words read
+            db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            refreshed_at = db.execute(text("SELECT refreshed_at FROM spelling_vocabulary_state WHERE id = 1")).scalar()
+            rows = db.execute(text("SELECT word, frequency FROM spelling_vocabulary")).fetchall()
+        finally:
+            db.close()
+
+        dictionary = SymSpell(settings.SPELLING_MAX_EDIT_DISTANCE, settings.SPELLING_PREFIX_LENGTH)
+        # Most frequent first, so each folded word keeps its most common spelling
+        for word, frequency in sorted(rows, key=lambda row: -row[1]):
+            key = normalize_key(word)
+            if key and not key.isdigit():
+                dictionary.add(key, int(frequency), word)
+
+        self.dictionary = dictionary
+        self.loaded_at = refreshed_at
+        logger.info(f"Spelling dictionary loaded: {len(dictionary.words)} words, "
+                    f"{len(dictionary.deletes)} deletes in {time.monotonic() - started:.1f}s")
+
+    def _check(self):
+        db = SessionLocal()
+        try:
+            state = db.execute(text(
+                "SELECT source_signature, refreshed_at FROM spelling_vocabulary_state WHERE id = 1"
+            )).first()
+            signature = source_signature(db)
+        finally:
+            db.close()
+        # Refresh once writes have stopped (no change since the last check)
+        if state is None or (signature != state[0] and signature == self.last_signature):
+            if refresh_vocabulary(wait=False):
+                self.load()
+                state = None
+        self.last_signature = signature
+        if state is not None and state[1] != self.loaded_at:
+            self.load()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._check()
+            except Exception as e:
+                logger.warning(f"Spelling dictionary update failed: {e}")
+            self._stop.wait(settings.SPELLING_CHECK_INTERVAL)
+
+    def start(self):
+        """Load the dictionary and keep it current in a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="spelling-dictionary", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+# Export singleton
+spelling_service = SpellingService()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Parallel, resumable migration of the businesses table between two databases
+
+Replaces the single long-running stream of migrate_to_supabase.py:
+- The source is split into id ranges of roughly equal row counts
+- Ranges are copied in parallel with binary COPY (source → temp table → INSERT)
+- Batch size adapts to the observed statement latency on the target
+- Failed ranges are retried with exponential backoff and reconnects
+- Progress is kept in a JSON manifest, so a rerun copies only missing ranges
+
+Usage:
+    python migrate_parallel.py --source postgresql://... --target postgresql://... --workers 4
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from app.services.normalization import search_keys
+
+# search_vector is maintained by a trigger on the target
+BUSINESS_COLUMNS = [
+    'id', 'name', 'street_address', 'postal_code', 'city', 'district',
+    'categories', 'phone', 'email', 'website', 'latitude', 'longitude',
+    'geometry', 'is_active', 'embedding', 'opening_hours'
+]
+
+# Folded search keys are derived from name/city/street_address, not copied:
+# COPY bypasses the ORM listener that fills them, and the source may predate them
+KEY_COLUMNS = ['name_key', 'city_key', 'street_key']
+
+
+def describe_dsn(dsn: str) -> str:
+    """host:port/dbname without credentials, for logs and the manifest"""
+    parsed = urlparse(dsn)
+    return f"{parsed.hostname}:{parsed.port or 5432}{parsed.path}"
+
+
+class Manifest:
+    """
+    Thread-safe record of which id ranges are done
+
+    Each range is stored as {"lo", "hi", "after", "done"}: ids in
+    [lo, hi] belong to the range and everything <= "after" is committed.
+    The file is replaced atomically on every update.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data = None
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            self.data = json.load(f)
+        return True
+
+    def create(self, source: str, target: str, boundaries: list):
+        self.data = {
+            'source': source,
+            'target': target,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'ranges': [
+                {'lo': lo, 'hi': hi, 'after': lo - 1, 'done': False}
+                for lo, hi in boundaries
+            ]
+        }
+        self._write()
+
+    def pending(self) -> list:
+        return [(i, r) for i, r in enumerate(self.data['ranges']) if not r['done']]
+
+    def update(self, index: int, after: int = None, done: bool = None):
+        with self._lock:
+            if after is not None:
+                self.data['ranges'][index]['after'] = after
+            if done is not None:
+                self.data['ranges'][index]['done'] = done
+            self._write()
+
+    def _write(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class AdaptiveBatchSize:
+    """
+    Batch size shared by all workers, steered towards a target statement latency
+
+    Slow batches shrink it proportionally, fast batches let it double,
+    so the copy backs off before the target's statement_timeout is hit.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, target_seconds: float):
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self._lock = threading.Lock()
+
+    def current(self) -> int:
+        with self._lock:
+            return self.size
+
+    def record(self, rows: int, seconds: float):
+        with self._lock:
+            if seconds > self.target_seconds:
+                self.size = max(self.minimum, int(rows * self.target_seconds / seconds * 0.8))
+            elif seconds < self.target_seconds / 2 and rows >= self.size:
+                self.size = min(self.maximum, self.size * 2)
+
+    def shrink(self):
+        """Halve after a failed (e.g. timed out) batch"""
+        with self._lock:
+            self.size = max(self.minimum, self.size // 2)
+
+
+def fill_search_keys(cur, stage: str):
+    """Compute the key columns of the rows staged from the source (same folding as the ORM)"""
+    cur.execute(f"SELECT id, name, city, street_address FROM {stage}")
+    rows = []
+    for business_id, name, city, street in cur.fetchall():
+        keys = search_keys(name, city, street)
+        rows.append((business_id, *(keys[column] for column in KEY_COLUMNS)))
+    assignments = ', '.join(f"{c} = v.{c}" for c in KEY_COLUMNS)
+    execute_values(
+        cur,
+        f"UPDATE {stage} s SET {assignments} "
+        f"FROM (VALUES %s) AS v (id, {', '.join(KEY_COLUMNS)}) WHERE s.id = v.id",
+        rows,
+        page_size=1000
+    )
+
+
+def compute_boundaries(source_dsn: str, range_rows: int) -> list:
+    """Split the source ids into ranges of ~range_rows rows (inclusive [lo, hi])"""
+    conn = psycopg2.connect(source_dsn)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM businesses")
+            total = cur.fetchone()[0]
+            buckets = max(1, -(-total // range_rows))
+            cur.execute("""
+                SELECT MIN(id), MAX(id)
+                FROM (SELECT id, ntile(%s) OVER (ORDER BY id) AS bucket FROM businesses) t
+                GROUP BY bucket
+                ORDER BY 1
+            """, (buckets,))
+            return [(lo, hi) for lo, hi in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+class RangeCopier:
+    """Copy id ranges from source to target in adaptive, committed batches"""
+
+    def __init__(self, source_dsn: str, target_dsn: str, manifest: Manifest, batch: AdaptiveBatchSize,
+                 statement_timeout_ms: int, copy_format: str, max_retries: int):
+        self.source_dsn = source_dsn
+        self.target_dsn = target_dsn
+        self.manifest = manifest
+        self.batch = batch
+        self.statement_timeout_ms = statement_timeout_ms
+        self.copy_format = copy_format
+        self.max_retries = max_retries
+        self.columns = ', '.join(BUSINESS_COLUMNS)
+        self.target_columns = ', '.join(BUSINESS_COLUMNS + KEY_COLUMNS)
+        self.rows_copied = 0
+        self._lock = threading.Lock()
+
+    def copy_range_with_retry(self, index: int) -> int:
+        """
+        Copy one range, retrying with exponential backoff; returns rows inserted
+
+        Statement timeouts surface as QueryCanceled (an OperationalError) and
+        are retried like dropped connections, with a smaller batch size.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._copy_range(index)
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                if attempt == self.max_retries:
+                    raise
+                self.batch.shrink()
+                delay = min(60, 2 ** attempt) + random.uniform(0, 1)
+                r = self.manifest.data['ranges'][index]
+                print(f"⚠️  Range {index} ({r['lo']}..{r['hi']}) failed: {str(e).strip()[:100]} - retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+        return 0
+
+    def _copy_range(self, index: int) -> int:
+        r = self.manifest.data['ranges'][index]
+        after, hi = r['after'], r['hi']
+        inserted = 0
+
+        source = psycopg2.connect(self.source_dsn)
+        target = psycopg2.connect(self.target_dsn)
+        try:
+            while after < hi:
+                size = self.batch.current()
+
+                # Row count and upper id of this batch via an index-only probe,
+                # so COPY can select a plain id range
+                with source.cursor() as cur:
+                    cur.execute(
+                        "SELECT COUNT(*), MAX(id) FROM ("
+                        "SELECT id FROM businesses WHERE id > %s AND id <= %s ORDER BY id LIMIT %s) t",
+                        (after, hi, size)
+                    )
+                    rows, upper = cur.fetchone()
+                if not rows:
+                    break
+
+                buffer = io.BytesIO()
+                with source.cursor() as cur:
+                    cur.copy_expert(
+                        cur.mogrify(
+                            f"COPY (SELECT {self.columns} FROM businesses WHERE id > %s AND id <= %s) "
+                            f"TO STDOUT WITH (FORMAT {self.copy_format})",
+                            (after, upper)
+                        ).decode(),
+                        buffer
+                    )
+                source.rollback()
+                buffer.seek(0)
+
+                started = time.monotonic()
+                with target.cursor() as cur:
+                    cur.execute(f"SET LOCAL statement_timeout = {int(self.statement_timeout_ms)}")
+                    cur.execute(
+                        f"CREATE TEMP TABLE IF NOT EXISTS _migrate_stage ON COMMIT DROP AS "
+                        f"SELECT {self.target_columns} FROM businesses WITH NO DATA"
+                    )
+                    cur.copy_expert(
+                        f"COPY _migrate_stage ({self.columns}) FROM STDIN WITH (FORMAT {self.copy_format})", buffer
+                    )
+                    fill_search_keys(cur, "_migrate_stage")
+                    cur.execute(
+                        f"INSERT INTO businesses ({self.target_columns}) SELECT {self.target_columns} FROM _migrate_stage "
+                        f"ON CONFLICT (id) DO NOTHING"
+                    )
+                    inserted += max(cur.rowcount, 0)
+                target.commit()
+                self.batch.record(rows, time.monotonic() - started)
+
+                after = upper
+                self.manifest.update(index, after=after)
+                with self._lock:
+                    self.rows_copied += rows
+
+            self.manifest.update(index, done=True)
+            return inserted
+        finally:
+            source.close()
+            target.close()
+
+
+def migrate(args):
+    source_dsn = args.source or os.getenv('SOURCE_DATABASE_URL')
+    target_dsn = args.target or os.getenv('TARGET_DATABASE_URL')
+    if not source_dsn or not target_dsn:
+        print("❌ Source and target are required (--source/--target or SOURCE_DATABASE_URL/TARGET_DATABASE_URL)")
+        sys.exit(1)
+
+    print("=" * 70)
+    print("Parallel Migration: businesses")
+    print(f"   {describe_dsn(source_dsn)} → {describe_dsn(target_dsn)}")
+    print("=" * 70)
+
+    manifest = Manifest(args.manifest)
+    if manifest.load() and not args.fresh:
+        if manifest.data['source'] != describe_dsn(source_dsn) or manifest.data['target'] != describe_dsn(target_dsn):
+            print(f"❌ Manifest {args.manifest} belongs to another source/target - use --fresh or --manifest")
+            sys.exit(1)
+        print(f"\n♻️  Resuming from manifest {args.manifest}")
+    else:
+        print(f"\n📐 Computing id ranges of ~{args.range_rows:,} rows...")
+        boundaries = compute_boundaries(source_dsn, args.range_rows)
+        manifest.create(describe_dsn(source_dsn), describe_dsn(target_dsn), boundaries)
+        print(f"   {len(boundaries)} ranges written to {args.manifest}")
+
+    pending = manifest.pending()
+    total_ranges = len(manifest.data['ranges'])
+    print(f"\n📦 Ranges pending: {len(pending)} / {total_ranges}")
+    print(f"👷 Workers: {args.workers} | COPY format: {args.format} | target latency: {args.target_seconds}s")
+    print("=" * 70)
+
+    batch = AdaptiveBatchSize(args.batch_size, args.min_batch_size, args.max_batch_size, args.target_seconds)
+    copier = RangeCopier(
+        source_dsn, target_dsn, manifest, batch,
+        statement_timeout_ms=args.statement_timeout * 1000,
+        copy_format=args.format,
+        max_retries=args.retries
+    )
+
+    started = time.monotonic()
+    inserted = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(copier.copy_range_with_retry, index): index for index, _ in pending}
+        for done_count, future in enumerate(as_completed(futures), 1):
+            index = futures[future]
+            try:
+                inserted += future.result()
+                elapsed = time.monotonic() - started
+                rate = copier.rows_copied / elapsed if elapsed else 0
+                print(f"✅ Range {index} done ({done_count}/{len(pending)}) | rows copied: {copier.rows_copied:,} "
+                      f"| {rate:,.0f} rows/s | batch size: {batch.current():,}")
+            except Exception as e:
+                failed.append(index)
+                print(f"❌ Range {index} gave up: {str(e).strip()[:200]}")
+
+    print("\n" + "=" * 70)
+    print("📊 Migration Summary")
+    print("=" * 70)
+    print(f"Rows copied:   {copier.rows_copied:,}")
+    print(f"Rows inserted: {inserted:,} (others already existed)")
+    print(f"Ranges done:   {total_ranges - len(manifest.pending())} / {total_ranges}")
+    print(f"Duration:      {time.monotonic() - started:.1f}s")
+    if failed:
+        print(f"⚠️  {len(failed)} ranges failed - rerun the same command to continue them")
+        sys.exit(2)
+    print("\n🎉 Migration completed successfully!")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Parallel, resumable migration of the businesses table')
+    parser.add_argument('--source', type=str, default=None, help='Source DSN (default: $SOURCE_DATABASE_URL)')
+    parser.add_argument('--target', type=str, default=None, help='Target DSN (default: $TARGET_DATABASE_URL)')
+    parser.add_argument('--workers', type=int, default=4, help='Ranges copied in parallel (default: 4)')
+    parser.add_argument('--range-rows', type=int, default=50000, help='Rows per id range / manifest entry (default: 50000)')
+    parser.add_argument('--batch-size', type=int, default=2000, help='Initial rows per COPY batch (default: 2000)')
+    parser.add_argument('--min-batch-size', type=int, default=100, help='Smallest adaptive batch (default: 100)')
+    parser.add_argument('--max-batch-size', type=int, default=50000, help='Largest adaptive batch (default: 50000)')
+    parser.add_argument('--target-seconds', type=float, default=2.0, help='Target latency per batch on the target (default: 2.0)')
+    parser.add_argument('--statement-timeout', type=int, default=60, help='statement_timeout on the target in seconds (default: 60)')
+    parser.add_argument('--retries', type=int, default=5, help='Retries per range before giving up (default: 5)')
+    parser.add_argument('--format', choices=['binary', 'text'], default='binary', help='COPY format; use text if column types differ')
+    parser.add_argument('--manifest', type=str, default='migration_manifest.json', help='Progress manifest path')
+    parser.add_argument('--fresh', action='store_true', help='Ignore an existing manifest and recompute ranges')
+
+    migrate(parser.parse_args())
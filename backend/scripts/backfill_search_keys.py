@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Backfill the normalized search keys (name_key, city_key, street_key)
+
+Walks businesses in id order, computes the keys with the same function the
+API and importers use (app/services/normalization.py) and writes them back
+in batches with one UPDATE ... FROM (VALUES ...) per batch. Only rows whose
+keys actually change are written. Re-run it after changing the
+normalization rules.
+
+The updates go through the business_changes triggers, so a running sync
+worker (scripts/sync_elasticsearch.py) also re-indexes the documents with
+their new *_key fields.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from psycopg2.extras import execute_values
+from app.database import SessionLocal
+from app.services.normalization import search_keys
+
+
+def backfill(batch_size: int, missing_only: bool):
+    print("=" * 60)
+    print("Search Key Backfill")
+    print("=" * 60)
+
+    db = SessionLocal()
+    raw = db.connection().connection.dbapi_connection
+    last_id = 0
+    scanned = 0
+    updated = 0
+    started = time.monotonic()
+    where = "AND name_key IS NULL" if missing_only else ""
+
+    try:
+        while True:
+            with raw.cursor() as cur:
+                cur.execute(
+                    f"SELECT id, name, city, street_address, name_key, city_key, street_key "
+                    f"FROM businesses WHERE id > %s {where} ORDER BY id LIMIT %s",
+                    (last_id, batch_size)
+                )
+                rows = cur.fetchall()
+                if not rows:
+                    break
+
+                changes = []
+                for business_id, name, city, street, *current in rows:
+                    keys = search_keys(name, city, street)
+                    values = (keys['name_key'], keys['city_key'], keys['street_key'])
+                    if tuple(current) != values:
+                        changes.append((business_id, *values))
+
+                if changes:
+                    execute_values(cur, """
+                        UPDATE businesses AS b
+                        SET name_key = v.name_key, city_key = v.city_key, street_key = v.street_key
+                        FROM (VALUES %s) AS v (id, name_key, city_key, street_key)
+                        WHERE b.id = v.id
+                    """, changes, page_size=len(changes))
+            raw.commit()
+
+            last_id = rows[-1][0]
+            scanned += len(rows)
+            updated += len(changes)
+            rate = scanned / (time.monotonic() - started)
+            print(f"✅ Scanned: {scanned:,} | Updated: {updated:,} | Last id: {last_id} ({rate:,.0f} rows/s)")
+
+        print(f"\n🎉 Backfill complete: {updated:,} of {scanned:,} rows updated in {time.monotonic() - started:.1f}s")
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def main():
+    """Run backfill"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compute normalized search keys for existing businesses')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Rows per UPDATE (default: 5000)')
+    parser.add_argument('--missing-only', action='store_true', help='Only rows without keys (e.g. after a bulk copy)')
+
+    args = parser.parse_args()
+    backfill(args.batch_size, args.missing_only)
+
+
+if __name__ == "__main__":
+    main()
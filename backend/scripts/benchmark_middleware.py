@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-request overhead of the middleware stack
+
+Sends requests straight into the ASGI app (no server, no sockets) for a
+trivial endpoint behind:
+
+    none   no middleware
+    base   logging + rate limiting as BaseHTTPMiddleware (the previous implementation)
+    asgi   app/middleware.py (pure ASGI)
+
+and reports microseconds per request. Every request comes from a different
+client address, so none is rate limited and the limiter's bookkeeping stays
+constant; the difference is the middleware mechanics.
+"""
+
+import sys
+import time
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+from app.middleware import LoggingMiddleware, RateLimitMiddleware
+
+logger = logging.getLogger(__name__)
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/ping",
+    "raw_path": b"/ping",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"localhost")],
+    "server": ("localhost", 8000),
+}
+
+
+class BaseLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        logger.info(f"{request.method} {request.url.path} Status:{response.status_code} Time:{process_time:.3f}s")
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+
+class BaseRateLimitMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, calls: int = 60, period: int = 60):
+        super().__init__(app)
+        self.calls = calls
+        self.period = period
+        self.clients = defaultdict(list)
+
+    async def dispatch(self, request, call_next):
+        client_ip = request.client.host if request.client else "testclient"
+        now = datetime.now()
+        self.clients[client_ip] = [t for t in self.clients[client_ip] if now - t < timedelta(seconds=self.period)]
+        if len(self.clients[client_ip]) >= self.calls:
+            return JSONResponse(status_code=429, content={"detail": "Too many requests. Please try again later."})
+        self.clients[client_ip].append(now)
+        return await call_next(request)
+
+
+async def ping(request):
+    return PlainTextResponse("pong")
+
+
+def build_app(stack: str, calls: int = 60) -> Starlette:
+    middleware = []
+    if stack == "base":
+        middleware = [Middleware(BaseLoggingMiddleware), Middleware(BaseRateLimitMiddleware, calls=calls)]
+    elif stack == "asgi":
+        middleware = [Middleware(LoggingMiddleware), Middleware(RateLimitMiddleware, calls=calls)]
+    return Starlette(routes=[Route("/ping", ping)], middleware=middleware)
+
+
+async def request(app: Starlette, index: int):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    # A different client per request keeps the limiter's per-client state small
+    await app(dict(SCOPE, client=(f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}", 50000)), receive, send)
+
+
+async def measure(app: Starlette, number: int) -> float:
+    for i in range(min(number, 500)):
+        await request(app, i)  # warm up
+    started = time.perf_counter()
+    for i in range(number):
+        await request(app, i)
+    return (time.perf_counter() - started) / number * 1e6
+
+
+def run(number: int):
+    print("=" * 60)
+    print("Middleware Overhead")
+    print("=" * 60)
+
+    timings = {}
+    for stack in ("none", "base", "asgi"):
+        app = build_app(stack)
+        timings[stack] = asyncio.run(measure(app, number))
+        print(f"⏱️  {stack:<5} {timings[stack]:8.1f} µs per request")
+
+    print(f"\n📊 Middleware overhead: base {timings['base'] - timings['none']:.1f} µs, "
+          f"asgi {timings['asgi'] - timings['none']:.1f} µs per request")
+
+
+def main():
+    """Run benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure middleware overhead per request')
+    parser.add_argument('--number', type=int, default=5000, help='Requests per stack (default: 5000)')
+
+    args = parser.parse_args()
+    run(args.number)
+
+
+if __name__ == "__main__":
+    main()
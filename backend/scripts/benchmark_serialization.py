@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark search response serialization
+
+Builds a page of synthetic hits and times, per page:
+
+    pydantic  BusinessSearchResult models, then what FastAPI does for a
+              response_model route: dump, validate into SearchResponse,
+              serialize in JSON mode and json.dumps
+    fast      SearchHit dataclasses encoded by search_response() (orjson)
+
+Both bodies are checked to decode to the same JSON before timing.
+No database or network needed.
+"""
+
+import sys
+import json
+import timeit
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pydantic import TypeAdapter
+from app.models.business import BusinessSearchResult, SearchResponse
+from app.serialization import SearchHit, search_response
+
+RESPONSE_ADAPTER = TypeAdapter(SearchResponse)
+
+
+def sample_rows(page_size: int) -> list:
+    return [
+        {
+            "id": str(1000000 + i),
+            "name": f"Zahnarztpraxis Dr. Müller {i}",
+            "address": f"Friedrichstraße {i}, 10117 Berlin",
+            "city": "Berlin",
+            "postcode": "10117",
+            "phone": "+49 30 1234567" if i % 2 else None,
+            "website": "https://example.de" if i % 3 else None,
+            "branches": ["12345", "67890"],
+            "lat": 52.5200 + i / 1000,
+            "lon": 13.4050 + i / 1000,
+            "distance_km": i / 10
+        }
+        for i in range(page_size)
+    ]
+
+
+def pydantic_page(rows: list) -> bytes:
+    results = [BusinessSearchResult(**row) for row in rows]
+    response = SearchResponse(total=12345, results=results, page=1, page_size=len(rows))
+    # fastapi.routing.serialize_response for a response_model route
+    content = RESPONSE_ADAPTER.validate_python(response.model_dump(by_alias=True))
+    data = RESPONSE_ADAPTER.dump_python(content, mode="json", by_alias=True)
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fast_page(rows: list) -> bytes:
+    results = [SearchHit(**row) for row in rows]
+    return search_response(total=12345, results=results, page=1, page_size=len(rows)).body
+
+
+def run(page_size: int, number: int):
+    print("=" * 60)
+    print("Search Response Serialization")
+    print("=" * 60)
+
+    rows = sample_rows(page_size)
+    if json.loads(pydantic_page(rows)) != json.loads(fast_page(rows)):
+        raise SystemExit("❌ Bodies differ")
+
+    timings = {}
+    for name, encode in (("pydantic", pydantic_page), ("fast", fast_page)):
+        best = min(timeit.repeat(lambda: encode(rows), number=number, repeat=5))
+        timings[name] = best / number * 1e6
+        print(f"⏱️  {name:<9} {timings[name]:8.1f} µs per page of {page_size}")
+
+    print(f"\n🚀 Speedup: {timings['pydantic'] / timings['fast']:.1f}x")
+
+
+def main():
+    """Run benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare search response serialization paths')
+    parser.add_argument('--page-size', type=int, default=50, help='Hits per page (default: 50)')
+    parser.add_argument('--number', type=int, default=2000, help='Pages per timing run (default: 2000)')
+
+    args = parser.parse_args()
+    run(args.page_size, args.number)
+
+
+if __name__ == "__main__":
+    main()
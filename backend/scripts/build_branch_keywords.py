@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Build the branch_keywords dictionary from the NDJSON source data
+
+Every gsbestand record lists its branches (verlagsdaten.branchenIdListe)
+and the search keywords it is found under (suche.keywortKategorieListe and
+suche.ttfKeywortListe). Counting how often each keyword appears together
+with each branch gives a keyword → branch mapping. The search path uses it
+to turn "zahnarzt" into an indexed branch filter (app/services/branch_resolver.py).
+
+Pairs below --min-count records or --min-share of the keyword's records
+are dropped as noise. The table is replaced in one transaction.
+"""
+
+import io
+import sys
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.services.normalization import normalize_key
+from app.services.import_checkpoint import iter_ndjson_lines
+
+
+def record_keywords(data: dict) -> tuple:
+    """(normalized keywords, branch ids) of one NDJSON record"""
+    verlagsdaten = data.get('verlagsdaten', {})
+    suche = verlagsdaten.get('suche', {}) or {}
+    keywords = set()
+    for keyword in (suche.get('keywortKategorieListe') or []) + (suche.get('ttfKeywortListe') or []):
+        # Keywords of punctuation only fold to "", which would match nothing
+        key = normalize_key(keyword) if isinstance(keyword, str) else None
+        if key:
+            keywords.add(key)
+    branch_ids = {str(b) for b in verlagsdaten.get('branchenIdListe') or []}
+    return keywords, branch_ids
+
+
+def count_pairs(ndjson_file: str, max_records: int = None) -> tuple:
+    """Count keyword/branch co-occurrences across the file"""
+    pair_counts = Counter()
+    keyword_counts = Counter()
+    processed = 0
+    started = time.monotonic()
+
+    for line_num, _, line in iter_ndjson_lines(ndjson_file):
+        if max_records and processed >= max_records:
+            break
+        try:
+            keywords, branch_ids = record_keywords(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+        processed += 1
+        if not branch_ids:
+            continue
+        for keyword in keywords:
+            keyword_counts[keyword] += 1
+            for branch_id in branch_ids:
+                pair_counts[(keyword, branch_id)] += 1
+
+        if processed % 100000 == 0:
+            print(f"✅ Scanned: {processed:,} records | {len(keyword_counts):,} keywords "
+                  f"({processed / (time.monotonic() - started):,.0f} records/s)")
+
+    return pair_counts, keyword_counts, processed
+
+
+def build(ndjson_file: str, min_count: int, min_share: float, max_branches: int, max_records: int = None):
+    print("=" * 60)
+    print("Branch Keyword Dictionary")
+    print("=" * 60)
+
+    pair_counts, keyword_counts, processed = count_pairs(ndjson_file, max_records)
+
+    # Keep the strongest branches per keyword
+    per_keyword = {}
+    for (keyword, branch_id), count in pair_counts.items():
+        if count >= min_count and count / keyword_counts[keyword] >= min_share:
+            per_keyword.setdefault(keyword, []).append((count, branch_id))
+
+    buffer = io.StringIO()
+    rows = 0
+    for keyword, branches in per_keyword.items():
+        for count, branch_id in sorted(branches, reverse=True)[:max_branches]:
+            # Normalized keywords are alphanumerics and single spaces, safe for COPY text format
+            buffer.write(f"{keyword}\t{branch_id}\t{count}\n")
+            rows += 1
+    buffer.seek(0)
+
+    db = SessionLocal()
+    try:
+        raw = db.connection().connection.dbapi_connection
+        with raw.cursor() as cur:
+            cur.execute("DELETE FROM branch_keywords")
+            cur.copy_expert("COPY branch_keywords (keyword, branch_id, business_count) FROM STDIN", buffer)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    print(f"\n📊 Records scanned: {processed:,}")
+    print(f"🔑 Keywords kept:   {len(per_keyword):,} of {len(keyword_counts):,}")
+    print(f"🔗 Pairs written:   {rows:,}")
+    print("\n🎉 branch_keywords rebuilt - API workers pick it up on their next refresh")
+
+
+def main():
+    """Run dictionary build"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build the keyword → branch dictionary from NDJSON data')
+    parser.add_argument('--file', type=str, required=True, help='NDJSON file path')
+    parser.add_argument('--min-count', type=int, default=3, help='Minimum records per keyword/branch pair (default: 3)')
+    parser.add_argument('--min-share', type=float, default=0.05,
+                        help="Minimum share of the keyword's records listing the branch (default: 0.05)")
+    parser.add_argument('--max-branches', type=int, default=20, help='Branches kept per keyword (default: 20)')
+    parser.add_argument('--limit', type=int, default=None, help='Limit number of records (for testing)')
+
+    args = parser.parse_args()
+    build(args.file, args.min_count, args.min_share, args.max_branches, args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Export postcode/city coordinates for the v1 search
+
+The v1 endpoint serves coordinates from a SQLite sidecar next to its NDJSON
+data file (app/services/coordinate_store.py). This script fills it with one
+row per (postal_code, city) pair of the geocoded businesses in PostgreSQL -
+the average of their coordinates - so v1 results rarely need the
+background geocoder. Existing rows for the same pairs are replaced.
+
+The API loads the store at startup; restart it after an export.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from app.database import SessionLocal
+from app.services.coordinate_store import CoordinateStore
+
+
+def export(data_file: str, store_file: str = None):
+    print("=" * 60)
+    print("Postcode/City Coordinate Export")
+    print("=" * 60)
+
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        rows = db.execute(text("""
+            SELECT postal_code, city, avg(latitude), avg(longitude)
+            FROM businesses
+            WHERE is_active AND latitude IS NOT NULL AND longitude IS NOT NULL
+              AND postal_code IS NOT NULL AND city IS NOT NULL
+            GROUP BY postal_code, city
+        """)).fetchall()
+    finally:
+        db.close()
+
+    store = CoordinateStore(store_file or f"{data_file}.coords.db")
+    store.put_many(((postcode, city, lat, lon) for postcode, city, lat, lon in rows), source="table")
+
+    print(f"\n📍 Pairs exported: {len(rows):,} → {store.path}")
+    print(f"🎉 Export complete in {time.monotonic() - started:.1f}s - restart the API to load it")
+
+
+def main():
+    """Run export"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export postcode/city coordinates for the v1 search')
+    parser.add_argument('--file', type=str, required=True, help='NDJSON data file the v1 API serves')
+    parser.add_argument('--store', type=str, default=None, help='Coordinate store path (default: <file>.coords.db)')
+
+    args = parser.parse_args()
+    export(args.file, args.store)
+
+
+if __name__ == "__main__":
+    main()
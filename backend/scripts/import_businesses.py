@@ -8,18 +8,44 @@ Matches the new database.py Business model
 import json
 import sys
 import os
+import hashlib
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from geoalchemy2 import WKTElement
-from app.database import engine, Business, SessionLocal
+from app.database import engine, Business, BusinessContentHash, SessionLocal
+from app.services.import_checkpoint import CheckpointStore, iter_ndjson_lines
+from app.services.normalization import search_keys
+from app.services.business_stats import refresh_stats
+from app.services.spelling import refresh_vocabulary
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut
 import time
-from sqlalchemy import text
+from sqlalchemy import text, select, func
+
+
+# Columns that make up a record's content hash (coordinates are derived, not source data)
+HASHED_FIELDS = (
+    'name', 'street_address', 'postal_code', 'city', 'district',
+    'categories', 'phone', 'email', 'website'
+)
+
+
+# Derived from the hashed fields, written alongside them
+SEARCH_KEY_FIELDS = ('name_key', 'city_key', 'street_key')
+
+# Lines read between batch commits (and checkpoints) in the full import
+CHECKPOINT_LINES = 100
+
+
+def content_hash(row: dict) -> str:
+    """Stable hash of a parsed record, used to detect changed rows in delta imports"""
+    payload = json.dumps([row.get(field) for field in HASHED_FIELDS], ensure_ascii=False, separators=(',', ':'))
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
 
 
 class BusinessImporter:
@@ -58,8 +84,46 @@ class BusinessImporter:
             self.geocode_cache[cache_key] = (None, None)
             return (None, None)
     
-    def import_data(self, max_records: int = None):
-        """Main import function"""
+    def parse_record(self, data: dict) -> dict:
+        """Map one NDJSON record to businesses column values (without coordinates)"""
+        business_id = data.get('_id')
+        verlagsdaten = data.get('verlagsdaten', {})
+        kontakt = verlagsdaten.get('kontaktinformationen', {})
+        person_list = kontakt.get('personListe', [])
+        adresse = kontakt.get('adresse', {})
+        
+        # Get address components
+        street = adresse.get('strasse', '')
+        house_number = adresse.get('hausnummer', '')
+        
+        # Get categories/branches
+        branch_ids = verlagsdaten.get('branchenIdListe', [])
+        
+        row = {
+            'id': business_id,
+            'name': person_list[0]['name'] if person_list else f"Business_{business_id}",
+            'street_address': f"{street} {house_number}".strip() if street or house_number else None,
+            'postal_code': adresse.get('postleitzahl', ''),
+            'city': adresse.get('ortsname', ''),
+            'district': adresse.get('kgs', ''),  # Using KGS as district
+            'categories': json.dumps(branch_ids) if branch_ids else None,
+            'phone': kontakt.get('telefon'),
+            'email': kontakt.get('email'),
+            'website': kontakt.get('website'),
+        }
+        # Derived search keys (not part of the content hash)
+        row.update(search_keys(row['name'], row['city'], row['street_address']))
+        return row
+    
+    def import_data(self, max_records: int = None, resume: bool = False, job_name: str = None):
+        """
+        Main import function
+        
+        Every CHECKPOINT_LINES lines read, the batch is committed together
+        with a checkpoint (byte offset, batch number, counters), so with
+        resume=True the import seeks straight to the first uncommitted line
+        instead of starting over.
+        """
         
         print("=" * 60)
         print("Gelbe Seiten Data Import")
@@ -74,73 +138,62 @@ class BusinessImporter:
         total_inserted = 0
         total_skipped = 0
         
+        checkpoints = CheckpointStore(db, job_name or f"import_businesses:{Path(self.ndjson_file).name}", self.ndjson_file)
+        start_offset = 0
+        line_num = 0
+        
+        if resume:
+            checkpoint = checkpoints.load()
+            if checkpoint and checkpoint.completed:
+                print(f"\n✅ Job '{checkpoints.job_name}' already completed - nothing to resume")
+                db.close()
+                return
+            if checkpoint:
+                counters = checkpoint.counters or {}
+                total_processed = counters.get('processed', 0)
+                total_inserted = counters.get('inserted', 0)
+                total_skipped = counters.get('skipped', 0)
+                start_offset = checkpoint.byte_offset
+                line_num = checkpoint.line_number
+                print(f"\n♻️  Resuming '{checkpoints.job_name}' at line {line_num + 1} (byte {start_offset:,}, batch {checkpoint.batch_number})")
+            else:
+                print(f"\nℹ️  No checkpoint for '{checkpoints.job_name}' - starting from the beginning")
+        else:
+            checkpoints.clear()
+        
+        offset = start_offset
+        
         print(f"\n📖 Reading data from: {self.ndjson_file}")
         print("=" * 60)
         
         try:
-            with open(self.ndjson_file, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    if max_records and total_processed >= max_records:
-                        break
+            for next_line_num, next_offset, line in iter_ndjson_lines(self.ndjson_file, start_offset, line_num):
+                if max_records and total_processed >= max_records:
+                    break
+                line_num, offset = next_line_num, next_offset
+                
+                try:
+                    data = json.loads(line.strip())
+                    row = self.parse_record(data)
+                    business_id = row['id']
                     
-                    try:
-                        data = json.loads(line.strip())
-                        
-                        # Extract data from NDJSON structure
-                        business_id = data.get('_id')
-                        verlagsdaten = data.get('verlagsdaten', {})
-                        kontakt = verlagsdaten.get('kontaktinformationen', {})
-                        person_list = kontakt.get('personListe', [])
-                        adresse = kontakt.get('adresse', {})
-                        
-                        # Get business name
-                        name = person_list[0]['name'] if person_list else f"Business_{business_id}"
-                        
-                        # Get address components
-                        street = adresse.get('strasse', '')
-                        house_number = adresse.get('hausnummer', '')
-                        street_address = f"{street} {house_number}".strip() if street or house_number else None
-                        
-                        postal_code = adresse.get('postleitzahl', '')
-                        city = adresse.get('ortsname', '')
-                        district = adresse.get('kgs', '')  # Using KGS as district
-                        
-                        # Get contact info
-                        phone = kontakt.get('telefon')
-                        email = kontakt.get('email')
-                        website = kontakt.get('website')
-                        
-                        # Get categories/branches
-                        branch_ids = verlagsdaten.get('branchenIdListe', [])
-                        categories_json = json.dumps(branch_ids) if branch_ids else None
-                        
-                        # Geocode
-                        lat, lon = self.geocode_address(street_address, postal_code, city) if postal_code and city else (None, None)
-                        
-                        # Create PostGIS point
-                        geometry_wkt = None
-                        if lat and lon:
-                            geometry_wkt = WKTElement(f'POINT({lon} {lat})', srid=4326)
-                        
-                        # Check if business already exists
-                        existing = db.query(Business).filter(Business.id == business_id).first()
-                        
-                        if existing:
-                            total_skipped += 1
-                            continue
-                        
+                    # Geocode
+                    lat, lon = self.geocode_address(row['street_address'], row['postal_code'], row['city']) if row['postal_code'] and row['city'] else (None, None)
+                    
+                    # Create PostGIS point
+                    geometry_wkt = None
+                    if lat and lon:
+                        geometry_wkt = WKTElement(f'POINT({lon} {lat})', srid=4326)
+                    
+                    # Check if business already exists
+                    existing = db.query(Business).filter(Business.id == business_id).first()
+                    
+                    if existing:
+                        total_skipped += 1
+                    else:
                         # Create Business object matching new schema
                         business = Business(
-                            id=business_id,
-                            name=name,
-                            street_address=street_address,
-                            postal_code=postal_code,
-                            city=city,
-                            district=district,
-                            categories=categories_json,  # JSON array as text
-                            phone=phone,
-                            email=email,
-                            website=website,
+                            **row,  # categories is a JSON array as text
                             latitude=lat,
                             longitude=lon,
                             geometry=geometry_wkt,
@@ -154,18 +207,29 @@ class BusinessImporter:
                         
                         total_inserted += 1
                         total_processed += 1
-                        
-                        # Commit in batches
-                        if total_processed % 100 == 0:
-                            db.commit()
-                            print(f"✅ Processed: {total_processed} | Inserted: {total_inserted} | Skipped: {total_skipped}")
-                        
-                    except Exception as e:
-                        print(f"❌ Error on line {line_num}: {e}")
-                        total_skipped += 1
-                        continue
+                    
+                except Exception as e:
+                    print(f"❌ Error on line {line_num}: {e}")
+                    total_skipped += 1
+                
+                # Commit every CHECKPOINT_LINES lines read, whatever happened to
+                # them, so a re-run over existing rows still advances the
+                # checkpoint (it goes into the same transaction as the batch)
+                if line_num % CHECKPOINT_LINES == 0:
+                    checkpoints.stage(offset, line_num, {
+                        'processed': total_processed,
+                        'inserted': total_inserted,
+                        'skipped': total_skipped
+                    })
+                    db.commit()
+                    print(f"✅ Line {line_num} | Processed: {total_processed} | Inserted: {total_inserted} | Skipped: {total_skipped}")
             
             # Final commit
+            checkpoints.stage(offset, line_num, {
+                'processed': total_processed,
+                'inserted': total_inserted,
+                'skipped': total_skipped
+            }, completed=not (max_records and total_processed >= max_records))
             db.commit()
             
             print("\n" + "=" * 60)
@@ -186,6 +250,189 @@ class BusinessImporter:
         finally:
             db.close()
 
+    
+    def import_delta(self, max_records: int = None, resume: bool = False, job_name: str = None, batch_size: int = 5000):
+        """
+        Incremental import: only write records that are new or changed
+        
+        Each chunk of records is hashed and compared in bulk against
+        business_content_hashes. New and changed rows are upserted, unchanged
+        rows are not touched. Every id in the dump is remembered in
+        delta_import_seen_ids; after a complete pass, active businesses that
+        were not seen are marked is_active = false.
+        
+        Only one delta import should run at a time (they share the seen-id table).
+        """
+        
+        print("=" * 60)
+        print("Gelbe Seiten Delta Import")
+        print("NDJSON → PostgreSQL (changed records only)")
+        print("=" * 60)
+        
+        db: Session = SessionLocal()
+        counters = {'processed': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'deactivated': 0}
+        
+        checkpoints = CheckpointStore(db, job_name or f"import_delta:{Path(self.ndjson_file).name}", self.ndjson_file)
+        start_offset = 0
+        line_num = 0
+        
+        if resume:
+            checkpoint = checkpoints.load()
+            if checkpoint and checkpoint.completed:
+                print(f"\n✅ Job '{checkpoints.job_name}' already completed - nothing to resume")
+                db.close()
+                return
+            if checkpoint:
+                counters.update(checkpoint.counters or {})
+                start_offset = checkpoint.byte_offset
+                line_num = checkpoint.line_number
+                print(f"\n♻️  Resuming '{checkpoints.job_name}' at line {line_num + 1} (byte {start_offset:,}, batch {checkpoint.batch_number})")
+            else:
+                print(f"\nℹ️  No checkpoint for '{checkpoints.job_name}' - starting from the beginning")
+        
+        if not resume or start_offset == 0:
+            checkpoints.clear()
+            db.execute(text("TRUNCATE delta_import_seen_ids"))
+            db.commit()
+        
+        offset = start_offset
+        limit_reached = False
+        chunk = {}
+        
+        print(f"\n📖 Reading data from: {self.ndjson_file}")
+        print("=" * 60)
+        
+        try:
+            for next_line_num, next_offset, line in iter_ndjson_lines(self.ndjson_file, start_offset, line_num):
+                if max_records and counters['processed'] >= max_records:
+                    limit_reached = True
+                    break
+                line_num, offset = next_line_num, next_offset
+                
+                try:
+                    row = self.parse_record(json.loads(line.strip()))
+                    row['id'] = int(row['id'])
+                    chunk[row['id']] = row
+                    counters['processed'] += 1
+                except Exception as e:
+                    print(f"❌ Error on line {line_num}: {e}")
+                    counters['skipped'] += 1
+                    continue
+                
+                if len(chunk) >= batch_size:
+                    self._apply_delta_chunk(db, chunk, counters)
+                    checkpoints.stage(offset, line_num, counters)
+                    db.commit()
+                    chunk = {}
+                    print(f"✅ Processed: {counters['processed']:,} | Inserted: {counters['inserted']:,} | "
+                          f"Updated: {counters['updated']:,} | Unchanged: {counters['unchanged']:,}")
+            
+            if chunk:
+                self._apply_delta_chunk(db, chunk, counters)
+            
+            if limit_reached:
+                print("\n⚠️  Record limit reached - skipping deactivation of vanished businesses")
+            else:
+                # Anything active that the dump no longer contains has vanished
+                result = db.execute(text("""
+                    UPDATE businesses b
+                    SET is_active = false
+                    WHERE b.is_active
+                    AND NOT EXISTS (
+                        SELECT 1 FROM delta_import_seen_ids s WHERE s.business_id = b.id
+                    )
+                """))
+                counters['deactivated'] = result.rowcount
+                db.execute(text("TRUNCATE delta_import_seen_ids"))
+            
+            checkpoints.stage(offset, line_num, counters, completed=not limit_reached)
+            db.commit()
+            
+            print("\n" + "=" * 60)
+            print("📊 Delta Import Summary")
+            print("=" * 60)
+            print(f"Total Processed: {counters['processed']:,}")
+            print(f"Inserted:        {counters['inserted']:,}")
+            print(f"Updated:         {counters['updated']:,}")
+            print(f"Unchanged:       {counters['unchanged']:,}")
+            print(f"Deactivated:     {counters['deactivated']:,}")
+            print(f"Skipped:         {counters['skipped']:,}")
+            print("=" * 60)
+            print("✅ Delta import completed successfully!")
+            
+        except Exception as e:
+            print(f"\n❌ Delta import failed: {e}")
+            import traceback
+            traceback.print_exc()
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def _apply_delta_chunk(self, db: Session, chunk: dict, counters: dict):
+        """Diff one chunk of parsed records against the stored hashes and write the changes"""
+        ids = list(chunk.keys())
+        
+        # One round trip for the whole chunk: which ids exist, and with which hash
+        existing = {
+            r.id: (r.content_hash, r.is_active)
+            for r in db.execute(
+                select(Business.id, Business.is_active, BusinessContentHash.content_hash)
+                .outerjoin(BusinessContentHash, BusinessContentHash.business_id == Business.id)
+                .where(Business.id.in_(ids))
+            )
+        }
+        
+        db.execute(
+            text("INSERT INTO delta_import_seen_ids (business_id) SELECT unnest(CAST(:ids AS BIGINT[])) ON CONFLICT DO NOTHING"),
+            {'ids': ids}
+        )
+        
+        changed_rows = []
+        changed_hashes = []
+        for business_id, row in chunk.items():
+            digest = content_hash(row)
+            stored = existing.get(business_id)
+            
+            if stored is None:
+                counters['inserted'] += 1
+            elif stored == (digest, True):
+                counters['unchanged'] += 1
+                continue
+            else:
+                # Changed content, a business without a stored hash yet, or a reappearing one
+                counters['updated'] += 1
+            
+            lat, lon = self.geocode_address(row['street_address'], row['postal_code'], row['city']) if row['postal_code'] and row['city'] else (None, None)
+            changed_rows.append({
+                **row,
+                'latitude': lat,
+                'longitude': lon,
+                'geometry': WKTElement(f'POINT({lon} {lat})', srid=4326) if lat and lon else None,
+                'is_active': True
+            })
+            changed_hashes.append({'business_id': business_id, 'content_hash': digest})
+        
+        if not changed_rows:
+            return
+        
+        stmt = pg_insert(Business).values(changed_rows)
+        update_columns = {field: stmt.excluded[field] for field in HASHED_FIELDS + SEARCH_KEY_FIELDS}
+        update_columns.update({
+            # Keep known coordinates when the new record could not be geocoded
+            'latitude': func.coalesce(stmt.excluded.latitude, Business.latitude),
+            'longitude': func.coalesce(stmt.excluded.longitude, Business.longitude),
+            'geometry': func.coalesce(stmt.excluded.geometry, Business.geometry),
+            'is_active': True
+        })
+        db.execute(stmt.on_conflict_do_update(index_elements=[Business.id], set_=update_columns))
+        
+        hash_stmt = pg_insert(BusinessContentHash).values(changed_hashes)
+        db.execute(hash_stmt.on_conflict_do_update(
+            index_elements=[BusinessContentHash.business_id],
+            set_={'content_hash': hash_stmt.excluded.content_hash, 'updated_at': func.now()}
+        ))
+
 
 def main():
     """Run import"""
@@ -195,6 +442,10 @@ def main():
     parser.add_argument('--file', type=str, required=True, help='NDJSON file path')
     parser.add_argument('--limit', type=int, default=None, help='Limit number of records (for testing)')
     parser.add_argument('--skip-geocoding', action='store_true', help='Skip geocoding (faster, no coordinates)')
+    parser.add_argument('--resume', action='store_true', help='Continue from the last committed checkpoint')
+    parser.add_argument('--job-name', type=str, default=None, help='Checkpoint name (default: derived from the file name)')
+    parser.add_argument('--delta', action='store_true', help='Only write new/changed records and deactivate vanished ones')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Records compared per round trip in --delta mode (default: 5000)')
     
     args = parser.parse_args()
     
@@ -215,7 +466,16 @@ def main():
         print(f"⚠️  Geocoding disabled - coordinates will be NULL")
     
     importer = BusinessImporter(str(file_path), skip_geocoding=args.skip_geocoding)
-    importer.import_data(max_records=args.limit)
+    if args.delta:
+        importer.import_delta(max_records=args.limit, resume=args.resume, job_name=args.job_name, batch_size=args.batch_size)
+    else:
+        importer.import_data(max_records=args.limit, resume=args.resume, job_name=args.job_name)
+    
+    # API workers pick the new counts and vocabulary up on their next reload
+    refresh_stats()
+    print("📊 Statistics refreshed")
+    refresh_vocabulary()
+    print("🔤 Spelling vocabulary refreshed")
 
 
 if __name__ == "__main__":
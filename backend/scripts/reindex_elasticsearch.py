@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Zero-downtime Elasticsearch reindex from PostgreSQL
+
+Builds a fresh versioned index (e.g. businesses_v20261019093000) next to
+the live one and swaps the search alias over atomically when it is done:
+
+1. Create the new index with refresh disabled and no replicas
+2. Stream active businesses from PostgreSQL with a server-side cursor
+3. Index them through parallel_bulk
+4. Restore refresh/replicas, refresh, and verify the document count
+   against the PostgreSQL row count; rejected documents (more than
+   --max-failures, default 0) or a count mismatch stop here and keep the
+   new index for inspection
+5. Atomically move the alias (or replace a legacy concrete index)
+6. Re-queue changes logged since the load started, so the sync worker
+   (scripts/sync_elasticsearch.py) applies them to the new index
+7. Delete older versions beyond --keep
+
+Live searches keep hitting the old index until step 5, so a full rebuild
+does not affect search latency or availability.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from elasticsearch.helpers import parallel_bulk
+from sqlalchemy import text
+from app.database import Business, SessionLocal
+from app.elasticsearch_client import es_client, BUSINESS_INDEX, build_index_body, business_to_document
+
+
+def stream_documents(fetch_size: int, limit: int = None, source: dict = None):
+    """Yield bulk actions for all active businesses using a server-side cursor
+
+    The row count is taken in the same REPEATABLE READ snapshot as the rows
+    and stored in source["rows"] before the first document is yielded.
+    """
+    db = SessionLocal()
+    try:
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        rows = db.query(Business).filter(Business.is_active == True).count()
+        if source is not None:
+            source["rows"] = min(rows, limit) if limit else rows
+        query = (
+            db.query(Business)
+            .filter(Business.is_active == True)
+            .order_by(Business.id)
+            .execution_options(stream_results=True)
+            .yield_per(fetch_size)
+        )
+        if limit:
+            query = query.limit(limit)
+
+        for business in query:
+            yield {
+                "_id": str(business.id),
+                "_source": business_to_document(business)
+            }
+    finally:
+        db.close()
+
+
+def current_targets(alias: str) -> tuple:
+    """Return (indices behind the alias, whether alias is a legacy concrete index)"""
+    if es_client.indices.exists_alias(name=alias):
+        return list(es_client.indices.get_alias(name=alias).keys()), False
+    if es_client.indices.exists(index=alias):
+        return [alias], True
+    return [], False
+
+
+def reindex(threads: int, chunk_size: int, fetch_size: int, replicas: int, keep: int, limit: int = None,
+            max_failures: int = 0):
+    alias = BUSINESS_INDEX
+    new_index = f"{alias}_v{time.strftime('%Y%m%d%H%M%S')}"
+    client = es_client.options(request_timeout=120)
+
+    print("=" * 60)
+    print("Elasticsearch Reindex (PostgreSQL → versioned index → alias)")
+    print("=" * 60)
+
+    old_indices, legacy_index = current_targets(alias)
+    print(f"\n🔗 Alias '{alias}' currently → {', '.join(old_indices) or 'nothing'}")
+
+    # 1. Create the new index tuned for bulk loading
+    body = build_index_body()
+    body["settings"]["refresh_interval"] = "-1"
+    body["settings"]["number_of_replicas"] = 0
+    client.indices.create(index=new_index, settings=body["settings"], mappings=body["mappings"])
+    print(f"✅ Created {new_index} (refresh disabled, 0 replicas)")
+
+    # Changes committed after this point may be missing from the snapshot
+    db = SessionLocal()
+    load_started_at = db.execute(text("SELECT now()")).scalar()
+    db.close()
+
+    # 2 + 3. Stream from PostgreSQL into parallel_bulk
+    indexed = 0
+    failed = 0
+    source = {}
+    started = time.monotonic()
+    try:
+        actions = ({**action, "_index": new_index} for action in stream_documents(fetch_size, limit, source))
+        for ok, info in parallel_bulk(client, actions, thread_count=threads, chunk_size=chunk_size, raise_on_error=False):
+            if ok:
+                indexed += 1
+            else:
+                failed += 1
+                if failed <= 10:
+                    print(f"❌ Failed: {info}")
+            if indexed and indexed % 100000 == 0:
+                rate = indexed / (time.monotonic() - started)
+                print(f"✅ Indexed: {indexed:,} ({rate:,.0f} docs/s)")
+    except Exception:
+        print(f"\n❌ Load failed - deleting {new_index}, alias untouched")
+        client.indices.delete(index=new_index)
+        raise
+
+    print(f"\n📦 Indexed {indexed:,} documents in {time.monotonic() - started:.1f}s ({failed:,} failed)")
+    if failed > max_failures:
+        print(f"❌ {failed:,} documents rejected (--max-failures {max_failures}) - alias untouched, "
+              f"{new_index} kept for inspection")
+        sys.exit(1)
+
+    # 4. Make the index searchable and durable
+    client.indices.put_settings(index=new_index, settings={
+        "index": {"refresh_interval": "1s", "number_of_replicas": replicas}
+    })
+    client.indices.refresh(index=new_index)
+    count = client.count(index=new_index)["count"]
+    if count != indexed or count != source["rows"] - failed:
+        print(f"❌ Count mismatch ({count:,} in index, {indexed:,} indexed, {source['rows']:,} rows in PostgreSQL, "
+              f"{failed:,} rejected) - alias untouched, {new_index} kept for inspection")
+        sys.exit(1)
+
+    # 5. Atomic alias swap
+    actions = [{"add": {"index": new_index, "alias": alias}}]
+    if legacy_index:
+        actions.insert(0, {"remove_index": {"index": alias}})
+    else:
+        actions = [{"remove": {"index": index, "alias": alias}} for index in old_indices] + actions
+    client.indices.update_aliases(actions=actions)
+    print(f"🔀 Alias '{alias}' → {new_index}")
+
+    # 6. Replay changes that happened during the load against the new index
+    db = SessionLocal()
+    try:
+        requeued = db.execute(
+            text("UPDATE business_changes SET processed_at = NULL, attempts = 0, next_attempt_at = NULL "
+                 "WHERE changed_at >= :started"),
+            {"started": load_started_at}
+        ).rowcount
+        db.commit()
+        print(f"♻️  Re-queued {requeued:,} changes made during the load for the sync worker")
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️  Could not re-queue changes ({e}); run the sync worker or reindex again if edits were made")
+    finally:
+        db.close()
+
+    # 7. Drop old versions, keeping the newest `keep` for rollback
+    versions = sorted(
+        index for index in client.indices.get(index=f"{alias}_v*").keys()
+        if index != new_index
+    )
+    for index in versions[:max(0, len(versions) - keep)]:
+        client.indices.delete(index=index)
+        print(f"🗑️  Deleted old index {index}")
+
+    print("\n🎉 Reindex completed successfully!")
+
+
+def main():
+    """Run reindex"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Rebuild the Elasticsearch index from PostgreSQL without downtime')
+    parser.add_argument('--threads', type=int, default=4, help='parallel_bulk worker threads (default: 4)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Documents per bulk request (default: 1000)')
+    parser.add_argument('--fetch-size', type=int, default=5000, help='Rows per PostgreSQL cursor fetch (default: 5000)')
+    parser.add_argument('--replicas', type=int, default=0, help='Replicas to restore after loading (default: 0)')
+    parser.add_argument('--keep', type=int, default=1, help='Previous index versions to keep for rollback (default: 1)')
+    parser.add_argument('--limit', type=int, default=None, help='Limit number of records (for testing)')
+    parser.add_argument('--max-failures', type=int, default=0,
+                        help='Rejected documents tolerated before the alias swap (default: 0)')
+
+    args = parser.parse_args()
+    reindex(args.threads, args.chunk_size, args.fetch_size, args.replicas, args.keep, args.limit, args.max_failures)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Incremental PostgreSQL → Elasticsearch sync worker
+
+Triggers on businesses append every inserted, updated or deleted id to
+business_changes and NOTIFY 'business_changes'. This worker LISTENs on
+that channel, claims pending entries in batches (FOR UPDATE SKIP LOCKED),
+re-reads the current rows and applies them through the bulk API:
+- active rows are (re)indexed
+- deleted or deactivated rows are removed from the index
+
+Several workers can run: each write carries the newest claimed change id of
+its business as an external version, so a worker that read the row before
+a later change can never overwrite the document written for that change
+(Elasticsearch answers 409, which counts as done).
+
+Entries are only marked processed after Elasticsearch accepted their
+document, so a crash or a rejected document (mapping error, 429 after
+retries) replays them instead of losing them. A rejected entry is retried
+with exponential backoff (next_attempt_at) and, after --max-attempts, left
+pending as a dead letter that is no longer claimed, so documents that always
+fail cannot block the queue. A polling fallback keeps the worker going if a
+notification is missed.
+"""
+
+import select
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import psycopg2
+from elasticsearch.helpers import bulk
+from sqlalchemy import text
+from app.database import Business, SessionLocal, DATABASE_URL
+from app.elasticsearch_client import es_client, BUSINESS_INDEX, business_to_document
+
+
+class ChangeSyncWorker:
+    """Apply business_changes entries to the Elasticsearch index"""
+
+    def __init__(self, batch_size: int = 1000, poll_interval: float = 5.0, debounce: float = 0.2,
+                 retention_hours: int = 24, max_attempts: int = 10):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.retention_hours = retention_hours
+        self.max_attempts = max_attempts
+        self.last_purge = 0.0
+
+    def sync_batch(self) -> int:
+        """Claim and apply one batch of pending changes; returns entries marked processed"""
+        db = SessionLocal()
+        try:
+            claimed = db.execute(text("""
+                SELECT id, business_id, changed_at
+                FROM business_changes
+                WHERE processed_at IS NULL
+                  AND attempts < :max_attempts
+                  AND (next_attempt_at IS NULL OR next_attempt_at <= now())
+                ORDER BY id
+                LIMIT :limit
+                FOR UPDATE SKIP LOCKED
+            """), {"limit": self.batch_size, "max_attempts": self.max_attempts}).fetchall()
+
+            if not claimed:
+                db.rollback()
+                return 0
+
+            # The newest claimed change per business is the document's version
+            versions = {}
+            for row in claimed:
+                versions[row.business_id] = max(row.id, versions.get(row.business_id, 0))
+            business_ids = set(versions)
+            oldest_change = min(row.changed_at for row in claimed)
+
+            businesses = {
+                b.id: b for b in db.query(Business).filter(Business.id.in_(business_ids))
+            }
+
+            actions = []
+            for business_id in business_ids:
+                business = businesses.get(business_id)
+                if business is not None and business.is_active:
+                    actions.append({
+                        "_op_type": "index",
+                        "_index": BUSINESS_INDEX,
+                        "_id": str(business_id),
+                        "_version": versions[business_id],
+                        "_version_type": "external",
+                        "_source": business_to_document(business)
+                    })
+                else:
+                    actions.append({
+                        "_op_type": "delete",
+                        "_index": BUSINESS_INDEX,
+                        "_id": str(business_id),
+                        "_version": versions[business_id],
+                        "_version_type": "external"
+                    })
+
+            # Deleting a document that was never indexed is fine (404), and a
+            # version conflict (409) means a newer change is already indexed;
+            # with raise_on_error=False both still come back as errors
+            success, errors = bulk(es_client, actions, raise_on_error=False, max_retries=3)
+            errors = [error for error in errors
+                      if not any(item.get("status") in (404, 409) for item in error.values())]
+            failed_ids = {item["_id"] for error in errors for item in error.values()}
+            if errors:
+                print(f"⚠️  {len(errors)} bulk errors, retried later, e.g. {errors[0]}")
+
+            # Only entries whose document Elasticsearch accepted are done
+            processed = [row.id for row in claimed if str(row.business_id) not in failed_ids]
+            failed = [row.id for row in claimed if str(row.business_id) in failed_ids]
+            db.execute(
+                text("UPDATE business_changes SET processed_at = now() WHERE id = ANY(:ids)"),
+                {"ids": processed}
+            )
+            if failed:
+                # 10s, 20s, 40s ... capped at an hour
+                db.execute(text("""
+                    UPDATE business_changes
+                    SET attempts = attempts + 1,
+                        next_attempt_at = now() + least(make_interval(secs => 10 * power(2, attempts)),
+                                                        interval '1 hour')
+                    WHERE id = ANY(:ids)
+                """), {"ids": failed})
+            db.commit()
+
+            lag = (datetime.now(timezone.utc) - oldest_change).total_seconds()
+            indexed = sum(1 for a in actions if a["_op_type"] == "index")
+            print(f"✅ Synced {len(processed)} changes ({indexed} indexed, {len(actions) - indexed} removed, "
+                  f"{len(failed_ids)} failed) | lag {lag:.1f}s")
+            return len(processed)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def purge_processed(self):
+        """Drop processed entries older than the retention window (kept for reindex replay)"""
+        if time.monotonic() - self.last_purge < 600:
+            return
+        self.last_purge = time.monotonic()
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                text("DELETE FROM business_changes WHERE processed_at < now() - make_interval(hours => :hours)"),
+                {"hours": self.retention_hours}
+            )
+            db.commit()
+            if result.rowcount:
+                print(f"🗑️  Purged {result.rowcount} processed changes")
+            dead = db.execute(
+                text("SELECT count(*) FROM business_changes WHERE processed_at IS NULL AND attempts >= :max_attempts"),
+                {"max_attempts": self.max_attempts}
+            ).scalar()
+            if dead:
+                print(f"☠️  {dead} changes were rejected {self.max_attempts} times and are no longer retried "
+                      f"(reset attempts to 0 to retry them)")
+        finally:
+            db.close()
+
+    def run(self):
+        """Listen for notifications and sync until interrupted"""
+        listener = psycopg2.connect(DATABASE_URL)
+        listener.autocommit = True
+        with listener.cursor() as cur:
+            cur.execute("LISTEN business_changes")
+
+        print(f"👂 Listening for business changes → index '{BUSINESS_INDEX}'")
+
+        try:
+            while True:
+                # Drain the backlog first, then wait for the next notification
+                while self.sync_batch() >= self.batch_size:
+                    pass
+                self.purge_processed()
+
+                if select.select([listener], [], [], self.poll_interval) != ([], [], []):
+                    listener.poll()
+                    listener.notifies.clear()
+                    # Let a burst of small transactions coalesce into one batch
+                    time.sleep(self.debounce)
+        except KeyboardInterrupt:
+            print("\n👋 Stopping sync worker")
+        finally:
+            listener.close()
+
+
+def main():
+    """Run the sync worker"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Sync PostgreSQL business changes to Elasticsearch')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Changes applied per bulk request (default: 1000)')
+    parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds between polls without notifications (default: 5)')
+    parser.add_argument('--retention-hours', type=int, default=24, help='Hours to keep processed changes (default: 24)')
+    parser.add_argument('--max-attempts', type=int, default=10, help='Rejections before a change is given up on (default: 10)')
+    parser.add_argument('--once', action='store_true', help='Sync the current backlog and exit')
+
+    args = parser.parse_args()
+    worker = ChangeSyncWorker(args.batch_size, args.poll_interval, retention_hours=args.retention_hours,
+                              max_attempts=args.max_attempts)
+
+    if args.once:
+        total = 0
+        while True:
+            processed = worker.sync_batch()
+            total += processed
+            if processed < args.batch_size:
+                break
+        print(f"📊 Synced {total} changes")
+    else:
+        worker.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Differential sync of the businesses table between two databases
+
+Tops up a target (e.g. Supabase) from a source for any SQL predicate,
+transferring only rows that are missing or different on the target:
+
+1. Both sides stream (id, md5 of the row) for the predicate, sorted by id,
+   through server-side cursors - ~40 bytes per row instead of the full row
+2. The two sorted streams are merge-joined in constant memory
+3. Only missing/changed ids are fetched from the source and upserted
+   on the target via COPY into a temp table
+
+Unlike a Bloom filter of target ids, the merge is exact: a false positive
+would silently skip a missing row, and the id stream costs the same bandwidth.
+
+Usage:
+    python sync_diff.py --where "city = 'Berlin'" --source postgresql://... --target postgresql://...
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import psycopg2
+
+from migrate_parallel import BUSINESS_COLUMNS, KEY_COLUMNS, describe_dsn, fill_search_keys
+
+# Columns compared by the row digest (id is the merge key). The search keys
+# are left out: they follow name/city/street_address, which are compared,
+# and a source without backfilled keys would otherwise never match
+DIGEST_COLUMNS = [c for c in BUSINESS_COLUMNS if c != 'id']
+
+# Columns replaced on the target, search keys recomputed from the source row
+UPSERT_COLUMNS = DIGEST_COLUMNS + KEY_COLUMNS
+
+
+def stream_digests(conn, where: str, fetch_size: int, compare_content: bool):
+    """Yield (id, digest) for matching rows in id order from a server-side cursor"""
+    digest = f"md5(ROW({', '.join(DIGEST_COLUMNS)})::text)" if compare_content else "NULL"
+    cur = conn.cursor(name='sync_diff_digests')
+    cur.itersize = fetch_size
+    cur.execute(f"SELECT id, {digest} FROM businesses WHERE {where} ORDER BY id")
+    try:
+        for row in cur:
+            yield row
+    finally:
+        cur.close()
+
+
+def diff_sorted(source_rows, target_rows, stats: dict):
+    """
+    Merge-join two id-sorted (id, digest) streams
+
+    Yields ids that are missing on the target or whose digest differs,
+    and counts target-only rows in stats['extra'].
+    """
+    target_iter = iter(target_rows)
+    target = next(target_iter, None)
+
+    for source_id, source_digest in source_rows:
+        stats['source'] += 1
+        while target is not None and target[0] < source_id:
+            stats['extra'] += 1
+            target = next(target_iter, None)
+
+        if target is None or target[0] != source_id:
+            stats['missing'] += 1
+            yield source_id
+        else:
+            if target[1] != source_digest:
+                stats['changed'] += 1
+                yield source_id
+            else:
+                stats['unchanged'] += 1
+            target = next(target_iter, None)
+
+    while target is not None:
+        stats['extra'] += 1
+        target = next(target_iter, None)
+
+
+def transfer(source_conn, target_conn, ids: list, stats: dict):
+    """Copy the given source rows to the target, replacing existing versions"""
+    columns = ', '.join(BUSINESS_COLUMNS)
+    target_columns = ', '.join(BUSINESS_COLUMNS + KEY_COLUMNS)
+    updates = ', '.join(f"{c} = EXCLUDED.{c}" for c in UPSERT_COLUMNS)
+
+    buffer = io.BytesIO()
+    with source_conn.cursor() as cur:
+        cur.copy_expert(
+            cur.mogrify(
+                f"COPY (SELECT {columns} FROM businesses WHERE id = ANY(%s)) TO STDOUT WITH (FORMAT binary)",
+                (ids,)
+            ).decode(),
+            buffer
+        )
+    source_conn.rollback()
+    stats['bytes'] += buffer.tell()
+    buffer.seek(0)
+
+    with target_conn.cursor() as cur:
+        cur.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS _sync_stage ON COMMIT DROP AS "
+            f"SELECT {target_columns} FROM businesses WITH NO DATA"
+        )
+        cur.copy_expert(f"COPY _sync_stage ({columns}) FROM STDIN WITH (FORMAT binary)", buffer)
+        fill_search_keys(cur, "_sync_stage")
+        cur.execute(
+            f"INSERT INTO businesses ({target_columns}) SELECT {target_columns} FROM _sync_stage "
+            f"ON CONFLICT (id) DO UPDATE SET {updates}"
+        )
+    target_conn.commit()
+    stats['transferred'] += len(ids)
+
+
+def sync(args):
+    source_dsn = args.source or os.getenv('SOURCE_DATABASE_URL')
+    target_dsn = args.target or os.getenv('TARGET_DATABASE_URL')
+    if not source_dsn or not target_dsn:
+        print("❌ Source and target are required (--source/--target or SOURCE_DATABASE_URL/TARGET_DATABASE_URL)")
+        sys.exit(1)
+
+    print("=" * 70)
+    print("Differential Sync: businesses")
+    print(f"   {describe_dsn(source_dsn)} → {describe_dsn(target_dsn)}")
+    print(f"   WHERE {args.where}")
+    print("=" * 70)
+
+    # Streaming cursors and writers need their own connections
+    source_stream = psycopg2.connect(source_dsn)
+    target_stream = psycopg2.connect(target_dsn)
+    source_rows = psycopg2.connect(source_dsn)
+    target_writer = psycopg2.connect(target_dsn)
+
+    stats = {'source': 0, 'missing': 0, 'changed': 0, 'unchanged': 0, 'extra': 0, 'transferred': 0, 'bytes': 0}
+    started = time.monotonic()
+
+    try:
+        compare_content = not args.ids_only
+        pending = []
+        for business_id in diff_sorted(
+            stream_digests(source_stream, args.where, args.fetch_size, compare_content),
+            stream_digests(target_stream, args.where, args.fetch_size, compare_content),
+            stats
+        ):
+            if args.dry_run:
+                continue
+            pending.append(business_id)
+            if len(pending) >= args.batch_size:
+                transfer(source_rows, target_writer, pending, stats)
+                pending = []
+                print(f"✅ Compared: {stats['source']:,} | Missing: {stats['missing']:,} | "
+                      f"Changed: {stats['changed']:,} | Transferred: {stats['transferred']:,}")
+
+        if pending:
+            transfer(source_rows, target_writer, pending, stats)
+
+        print("\n" + "=" * 70)
+        print("📊 Sync Summary" + (" (dry run)" if args.dry_run else ""))
+        print("=" * 70)
+        print(f"Source rows compared: {stats['source']:,}")
+        print(f"Missing on target:    {stats['missing']:,}")
+        print(f"Changed on target:    {stats['changed']:,}")
+        print(f"Unchanged:            {stats['unchanged']:,}")
+        print(f"Only on target:       {stats['extra']:,} (left untouched)")
+        print(f"Rows transferred:     {stats['transferred']:,} ({stats['bytes'] / 1024**2:.1f} MB)")
+        print(f"Duration:             {time.monotonic() - started:.1f}s")
+        print("=" * 70)
+
+    except Exception as e:
+        print(f"\n❌ Sync failed: {e}")
+        import traceback
+        traceback.print_exc()
+        target_writer.rollback()
+        sys.exit(1)
+    finally:
+        for conn in (source_stream, target_stream, source_rows, target_writer):
+            conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Transfer only missing or changed businesses between two databases')
+    parser.add_argument('--where', type=str, default='true', help="SQL predicate on businesses, e.g. \"city = 'Berlin'\"")
+    parser.add_argument('--source', type=str, default=None, help='Source DSN (default: $SOURCE_DATABASE_URL)')
+    parser.add_argument('--target', type=str, default=None, help='Target DSN (default: $TARGET_DATABASE_URL)')
+    parser.add_argument('--batch-size', type=int, default=2000, help='Rows per transfer batch (default: 2000)')
+    parser.add_argument('--fetch-size', type=int, default=50000, help='Rows per cursor round trip while diffing (default: 50000)')
+    parser.add_argument('--ids-only', action='store_true', help='Only transfer missing ids, skip content comparison')
+    parser.add_argument('--dry-run', action='store_true', help='Report the difference without writing')
+
+    sync(parser.parse_args())
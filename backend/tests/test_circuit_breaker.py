@@ -0,0 +1,63 @@
+"""State transitions of the circuit breaker (app/circuit_breaker.py)"""
+
+import asyncio
+
+from app.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("es", failure_threshold=3)
+
+    breaker.record_failure(RuntimeError("timeout"))
+    breaker.record_failure(RuntimeError("timeout"))
+    assert breaker.state == CLOSED and breaker.allow_request()
+
+    breaker.record_failure(RuntimeError("timeout"))
+    assert breaker.state == OPEN and not breaker.allow_request()
+    assert breaker.trips == 1
+    assert breaker.last_error == "RuntimeError: timeout"
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker("es", failure_threshold=2)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CLOSED
+
+
+def test_probe_half_opens_and_the_next_request_decides():
+    async def scenario():
+        breaker = CircuitBreaker("es", failure_threshold=1, probe_interval=0, probe=probe)
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        await asyncio.wait_for(breaker._probe_task, 1)
+        assert breaker.state == HALF_OPEN and breaker.allow_request()
+
+        # A failure while half-open re-opens at once
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        await asyncio.wait_for(breaker._probe_task, 1)
+        breaker.record_success()
+        assert breaker.state == CLOSED and breaker.opened_at is None
+
+    async def probe():
+        return True
+
+    asyncio.run(scenario())
+
+
+def test_startup_check_trips_when_the_backend_is_down():
+    async def probe():
+        raise ConnectionError("refused")
+
+    async def scenario():
+        breaker = CircuitBreaker("es", probe_interval=60, probe=probe)
+        assert await breaker.check() is False
+        assert breaker.state == OPEN
+        assert breaker.last_error == "ConnectionError: refused"
+        await breaker.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,34 @@
+"""Opaque search cursors (app/elasticsearch_client.py)"""
+
+import base64
+
+import pytest
+
+from app.elasticsearch_client import decode_cursor, encode_cursor
+
+
+def test_round_trip_keeps_pit_sort_values_and_context():
+    cursor = encode_cursor("pit-1", [12.5, "bäckerei", 42], {"q": "abc", "radius_km": 10})
+
+    assert decode_cursor(cursor) == {
+        "pit": "pit-1",
+        "after": [12.5, "bäckerei", 42],
+        "ctx": {"q": "abc", "radius_km": 10}
+    }
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(None, ["?" * 30, "/" * 30])
+
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_=")
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(b'["a list"]').decode(),
+    base64.urlsafe_b64encode(b'{"pit": "p", "after": "not a list"}').decode(),
+])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,79 @@
+"""Resume offsets of NDJSON imports (app/services/import_checkpoint.py)"""
+
+import os
+
+import pytest
+
+from app.services.import_checkpoint import CheckpointStore, iter_ndjson_lines
+
+
+class FakeSession:
+    """Just the two Session calls CheckpointStore makes on load and stage"""
+
+    def __init__(self):
+        self.rows = {}
+
+    def get(self, model, key):
+        return self.rows.get(key)
+
+    def merge(self, checkpoint):
+        self.rows[checkpoint.job_name] = checkpoint
+
+
+@pytest.fixture
+def ndjson(tmp_path):
+    path = tmp_path / "data.ndjson"
+    path.write_text('{"_id": "1"}\n{"_id": "2", "name": "Bäckerei"}\n{"_id": "3"}\n', encoding="utf-8")
+    return path
+
+
+def test_lines_carry_number_and_offset_after_the_line(ndjson):
+    lines = list(iter_ndjson_lines(str(ndjson)))
+
+    assert [number for number, _, _ in lines] == [1, 2, 3]
+    assert lines[-1][1] == os.path.getsize(ndjson)
+    # Offsets count bytes, not characters (ä is two bytes)
+    assert lines[1][1] - lines[0][1] == len(lines[1][2].encode("utf-8"))
+
+
+def test_reading_from_a_yielded_offset_continues_with_the_next_line(ndjson):
+    number, offset, _ = list(iter_ndjson_lines(str(ndjson)))[0]
+
+    resumed = list(iter_ndjson_lines(str(ndjson), offset, number))
+
+    assert [(n, line.strip()) for n, _, line in resumed] == [
+        (2, '{"_id": "2", "name": "Bäckerei"}'),
+        (3, '{"_id": "3"}')
+    ]
+
+
+def test_resume_returns_the_staged_position(ndjson):
+    db = FakeSession()
+    store = CheckpointStore(db, "job", str(ndjson))
+    number, offset, _ = list(iter_ndjson_lines(str(ndjson)))[1]
+    store.stage(offset, number, {"processed": 2})
+    store.stage(offset, number, {"processed": 2})
+
+    resumed = CheckpointStore(db, "job", str(ndjson))
+    checkpoint = resumed.load()
+
+    assert (checkpoint.byte_offset, checkpoint.line_number) == (offset, 2)
+    assert checkpoint.counters == {"processed": 2}
+    # Batch numbers continue after a resume
+    resumed.stage(offset, number, {})
+    assert db.rows["job"].batch_number == 3
+
+
+def test_resume_refuses_a_modified_file(ndjson):
+    db = FakeSession()
+    CheckpointStore(db, "job", str(ndjson)).stage(10, 1, {})
+
+    with open(ndjson, "a", encoding="utf-8") as f:
+        f.write('{"_id": "4"}\n')
+
+    with pytest.raises(ValueError, match="refusing to resume"):
+        CheckpointStore(db, "job", str(ndjson)).load()
+
+
+def test_no_checkpoint_means_start_over(ndjson):
+    assert CheckpointStore(FakeSession(), "job", str(ndjson)).load() is None
@@ -0,0 +1,68 @@
+"""Offset index lookups (app/services/ndjson_index.py)"""
+
+import json
+import os
+
+import pytest
+
+from app.services.ndjson_index import IndexNotReadyError, NDJSONOffsetIndex
+
+
+def write_records(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "data.ndjson"
+    write_records(path, [{"_id": f"id-{n}", "n": n} for n in range(500)] + [{"_id": 777, "name": "Müller"}])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("not json\n")
+    return str(path)
+
+
+def test_lookup_finds_every_record(data_file):
+    index = NDJSONOffsetIndex(data_file)
+    index.prepare()
+
+    assert len(index) == 501
+    assert all(index.get(f"id-{n}") == {"_id": f"id-{n}", "n": n} for n in range(500))
+
+
+def test_numeric_ids_are_found_as_strings(data_file):
+    index = NDJSONOffsetIndex(data_file)
+    index.prepare()
+
+    assert index.get("777") == {"_id": 777, "name": "Müller"}
+    assert index.get(777) == {"_id": 777, "name": "Müller"}
+
+
+def test_unknown_id_returns_none(data_file):
+    index = NDJSONOffsetIndex(data_file)
+    index.prepare()
+
+    assert index.get("missing") is None
+
+
+def test_lookup_before_the_build_raises_not_ready(data_file):
+    index = NDJSONOffsetIndex(data_file)
+
+    with pytest.raises(IndexNotReadyError):
+        index.get("id-1")
+    index._builder.join()
+    assert index.get("id-1") == {"_id": "id-1", "n": 1}
+
+
+def test_changed_data_file_is_reindexed(data_file):
+    index = NDJSONOffsetIndex(data_file)
+    index.prepare()
+
+    write_records(data_file, [{"_id": "new"}])
+    stat = os.stat(data_file)
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    index.prepare()
+
+    assert index.get("new") == {"_id": "new"}
+    assert index.get("id-1") is None
@@ -0,0 +1,31 @@
+"""Search key folding (app/services/normalization.py)"""
+
+import pytest
+
+from app.services.normalization import normalize_key, search_keys
+
+
+@pytest.mark.parametrize("value", ["München", "Muenchen", "munchen", "  MÜNCHEN "])
+def test_spellings_of_a_city_share_one_key(value):
+    assert normalize_key(value) == "munchen"
+
+
+def test_search_keys_fold_each_column():
+    assert search_keys("Café Größe & Söhne", "Frankfurt am Main", "Hauptstraße 5") == {
+        "name_key": "cafe grosse sohne",
+        "city_key": "frankfurt am main",
+        "street_key": "hauptstr 5"
+    }
+
+
+@pytest.mark.parametrize("street", ["Hauptstraße 5", "Hauptstrasse 5", "Hauptstr. 5"])
+def test_street_spellings_share_one_key(street):
+    assert search_keys(None, None, street)["street_key"] == "hauptstr 5"
+
+
+def test_missing_values_stay_none():
+    assert search_keys(None, None, None) == {"name_key": None, "city_key": None, "street_key": None}
+
+
+def test_punctuation_only_folds_to_empty():
+    assert normalize_key("!!! --") == ""
@@ -0,0 +1,68 @@
+"""Sliding window counter (app/rate_limit.py)"""
+
+import pytest
+
+from app.rate_limit import SlidingWindowLimiter
+
+
+def test_allows_up_to_the_limit_within_a_window():
+    limiter = SlidingWindowLimiter(limit=3, period=60)
+
+    assert [limiter.hit("ip", now=t) for t in (0, 1, 2, 3)] == [True, True, True, False]
+
+
+def test_costs_are_weighted():
+    limiter = SlidingWindowLimiter(limit=3, period=60)
+
+    assert limiter.hit("ip", cost=2, now=0)
+    assert not limiter.hit("ip", cost=2, now=1)
+    assert limiter.hit("ip", cost=1, now=2)
+
+
+def test_previous_window_counts_by_its_remaining_share():
+    limiter = SlidingWindowLimiter(limit=10, period=60)
+    for _ in range(10):
+        assert limiter.hit("ip", now=30)
+
+    # 15 s into the next window, 3/4 of the previous window still counts: 7.5 + cost
+    assert limiter.hit("ip", cost=2, now=75)
+    assert not limiter.hit("ip", cost=1, now=75)
+    # At 45 s only 1/4 (2.5) is left
+    assert limiter.hit("ip", cost=5, now=105)
+
+
+def test_previous_window_is_forgotten_after_a_gap():
+    limiter = SlidingWindowLimiter(limit=2, period=60)
+    limiter.hit("ip", cost=2, now=0)
+
+    assert limiter.hit("ip", cost=2, now=150)
+
+
+def test_full_table_evicts_the_least_recently_seen_client():
+    limiter = SlidingWindowLimiter(limit=2, period=60, max_clients=2)
+    limiter.hit("a", cost=2, now=0)
+    limiter.hit("b", now=1)
+    limiter.hit("a", now=2)  # denied, but "a" was seen last
+
+    limiter.hit("c", now=3)
+
+    assert list(limiter.clients) == ["a", "c"]
+    assert not limiter.hit("a", now=4)  # "a" kept its spent budget
+
+
+def test_idle_clients_are_swept_on_a_new_window():
+    limiter = SlidingWindowLimiter(limit=5, period=60)
+    limiter.hit("old", now=0)
+    limiter.hit("recent", now=70)
+
+    limiter.hit("new", now=130)
+
+    assert list(limiter.clients) == ["recent", "new"]
+
+
+@pytest.mark.parametrize("cost", [0.5, 1.0])
+def test_clients_are_independent(cost):
+    limiter = SlidingWindowLimiter(limit=1, period=60)
+
+    assert limiter.hit("a", cost=cost, now=0)
+    assert limiter.hit("b", cost=cost, now=0)
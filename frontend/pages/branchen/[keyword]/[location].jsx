@@ -20,6 +20,9 @@ export default function BranchenSearch() {
   const [page, setPage] = useState(1)
   const [radius, setRadius] = useState(urlRadius ? Number(urlRadius) : 50) // Default 50km or from URL
   const [searchCenter, setSearchCenter] = useState(null) // [lat, lon]
+  // Radius the backend settled on for page 1; later pages reuse it so they
+  // continue the same result set instead of a wider one
+  const [pinnedRadius, setPinnedRadius] = useState(null) // { search, km }
 
   // API URL - use environment variable
   const API_URL = process.env.NEXT_PUBLIC_API_URL || 'https://gelbeseitanreplica-production.up.railway.app'
@@ -79,7 +82,9 @@ export default function BranchenSearch() {
         // Build API URL
         // If location is "standort" and we have coordinates, don't pass location parameter
         // Otherwise, pass the location parameter
-        let apiUrl = `${API_URL}/api/v2/search?keyword=${encodeURIComponent(searchKeyword)}&page=${page}&page_size=50&radius=${radius}`
+        const searchKey = `${searchKeyword}|${searchLocation}|${radius}|${searchCenter}`
+        const requestRadius = page > 1 && pinnedRadius && pinnedRadius.search === searchKey ? pinnedRadius.km : radius
+        let apiUrl = `${API_URL}/api/v2/search?keyword=${encodeURIComponent(searchKeyword)}&page=${page}&page_size=50&radius=${requestRadius}`
         
         // Only add location if it's not "standort" or if we don't have coordinates
         if (searchLocation && searchLocation.toLowerCase() !== 'standort') {
@@ -104,6 +109,9 @@ export default function BranchenSearch() {
           console.log('Total:', data.total)
           setResults(data.results || [])
           setTotal(data.total || 0)
+          if (page === 1) {
+            setPinnedRadius(data.effective_radius_km ? { search: searchKey, km: data.effective_radius_km } : null)
+          }
         } else {
           console.error('API Error:', response.status, response.statusText)
         }
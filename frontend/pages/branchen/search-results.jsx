@@ -20,6 +20,9 @@ export default function BranchenSearch() {
   const [page, setPage] = useState(1)
   const [radius, setRadius] = useState(50) // Default 50km
   const [searchCenter, setSearchCenter] = useState(null) // [lat, lon]
+  // Radius the backend settled on for page 1; later pages reuse it so they
+  // continue the same result set instead of a wider one
+  const [pinnedRadius, setPinnedRadius] = useState(null) // { search, km }
 
   // API URL - use environment variable
   const API_URL = process.env.NEXT_PUBLIC_API_URL || 'https://gelbeseitanreplica-production.up.railway.app'
@@ -61,7 +64,9 @@ export default function BranchenSearch() {
         const searchLocation = locationTerm.replace(/_/g, ' ')
 
         // Build API URL with lat/lon if available
-        let apiUrl = `${API_URL}/api/v2/search?keyword=${encodeURIComponent(searchKeyword)}&location=${encodeURIComponent(searchLocation)}&page=${page}&page_size=50&radius=${radius}`
+        const searchKey = `${searchKeyword}|${searchLocation}|${radius}|${searchCenter}`
+        const requestRadius = page > 1 && pinnedRadius && pinnedRadius.search === searchKey ? pinnedRadius.km : radius
+        let apiUrl = `${API_URL}/api/v2/search?keyword=${encodeURIComponent(searchKeyword)}&location=${encodeURIComponent(searchLocation)}&page=${page}&page_size=50&radius=${requestRadius}`
         if (searchCenter) {
           apiUrl += `&lat=${searchCenter[0]}&lon=${searchCenter[1]}`
         }
@@ -72,6 +77,9 @@ export default function BranchenSearch() {
           const data = await response.json()
           setResults(data.results || [])
           setTotal(data.total || 0)
+          if (page === 1) {
+            setPinnedRadius(data.effective_radius_km ? { search: searchKey, km: data.effective_radius_km } : null)
+          }
         }
       } catch (error) {
         console.error('Search error:', error)